@@ -0,0 +1,111 @@
+"""
+Benchmark cross-worker fan-out latency through the bus
+
+Starts a ``UnixBus`` broker and several subscriber processes, then publishes relayed
+events from this process and reports how long they took to reach each subscriber.
+
+Events are published in batches of ``per_tick`` events, one batch per millisecond.
+
+Usage::
+
+    python benchmarks/bus.py [subscribers] [events] [per_tick]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+from mara import App, events
+from mara.bus import UnixBus
+
+
+# Seconds between batches
+INTERVAL = 0.001
+
+
+class Ping(events.Event):
+    "Ping"
+
+    __slots__ = ("sent",)
+    relay = True
+    log_level = 0
+
+    def __init__(self, sent: int):
+        super().__init__()
+        self.sent = sent
+
+
+async def connect(bus: UnixBus) -> App:
+    app = App()
+    app.loop = asyncio.get_running_loop()
+    app.bus = UnixBus(path=bus.path)
+    await app.bus.connect(app)
+    return app
+
+
+async def subscribe(bus: UnixBus, count: int, result_fd: int):
+    app = await connect(bus)
+    latencies = []
+    done = asyncio.Event()
+
+    @app.listen(Ping)
+    async def ping(event: Ping):
+        latencies.append(time.monotonic_ns() - event.sent)
+        if len(latencies) == count:
+            done.set()
+
+    os.write(result_fd, b"r")
+    await done.wait()
+    os.write(result_fd, f"{statistics.median(latencies)} {max(latencies)}\n".encode())
+
+
+async def publish(bus: UnixBus, count: int, per_tick: int):
+    app = await connect(bus)
+    for _ in range(count // per_tick):
+        for _ in range(per_tick):
+            await app.events.trigger(Ping(time.monotonic_ns()))
+        await asyncio.sleep(INTERVAL)
+    assert app.bus is not None
+    await app.bus.close()
+
+
+def main(subscribers: int, count: int, per_tick: int):
+    bus = UnixBus()
+    bus.start()
+
+    result_read, result_write = os.pipe()
+    pids = []
+    for _ in range(subscribers):
+        pid = os.fork()
+        if pid == 0:
+            asyncio.run(subscribe(bus, count, result_write))
+            os._exit(0)
+        pids.append(pid)
+
+    # Wait for subscribers to connect
+    with os.fdopen(result_read) as results:
+        ready = 0
+        while ready < subscribers:
+            ready += len(os.read(result_read, subscribers - ready))
+        time.sleep(0.2)
+
+        start = time.perf_counter()
+        asyncio.run(publish(bus, count, per_tick))
+        lines = [results.readline().split() for _ in range(subscribers)]
+        elapsed = time.perf_counter() - start
+
+    for pid in pids:
+        os.waitpid(pid, 0)
+    bus.stop()
+
+    medians = [float(median) / 1000 for median, _ in lines]
+    worst = max(float(slowest) for _, slowest in lines) / 1000
+    print(f"{subscribers} subscribers, {count:,} events, {per_tick} per tick")
+    print(f"median latency {statistics.median(medians):,.0f} us, max {worst:,.0f} us")
+    print(f"{count * subscribers / elapsed:,.0f} deliveries/s")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [3, 10_000, 10][len(args) :]))
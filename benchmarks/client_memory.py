@@ -0,0 +1,114 @@
+"""
+Benchmark memory per idle connection
+
+Opens idle text connections using asyncio streams, then ``BufferedSocketProtocol``
+with lean clients, and reports the Python memory allocated for each connection once
+they have connected.
+
+Connections use a stub transport so that large counts don't need file descriptors.
+This measures what Mara and asyncio allocate; the kernel's socket buffers are extra.
+
+Usage::
+
+    python benchmarks/client_memory.py [connections ...]
+"""
+import asyncio
+import gc
+import logging
+import sys
+import tracemalloc
+
+from mara import App, events
+from mara.servers.protocol import BufferedSocketProtocol
+from mara.servers.socket import TextServer
+
+
+READ_SIZE = 1024
+
+
+class StubTransport(asyncio.Transport):
+    def get_extra_info(self, name, default=None):
+        if name == "peername":
+            return ("127.0.0.1", 1234)
+        return default
+
+    def is_closing(self):
+        return False
+
+    def pause_reading(self):
+        pass
+
+    def resume_reading(self):
+        pass
+
+    def get_write_buffer_size(self):
+        return 0
+
+    def get_write_buffer_limits(self):
+        return (16 * 1024, 64 * 1024)
+
+    def write(self, data):
+        pass
+
+    def close(self):
+        pass
+
+
+def streams_protocol(server):
+    reader = asyncio.StreamReader()
+    return asyncio.StreamReaderProtocol(reader, server.handle_connect)
+
+
+async def measure(label: str, connections: int, lean: bool) -> float:
+    app = App()
+    app.loop = asyncio.get_running_loop()
+    server = TextServer()
+    server.app = app
+    server.read_size = READ_SIZE
+    server.lean_clients = lean
+    protocol_factory = BufferedSocketProtocol if lean else streams_protocol
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    protocols = []
+    for _ in range(connections):
+        protocol = protocol_factory(server)
+        protocol.connection_made(StubTransport())
+        protocols.append(protocol)
+
+    # Let the clients connect
+    while len(server.clients) < connections:
+        await asyncio.sleep(0)
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    for client in server.clients:
+        for task in [client.read_task, client.write_task, client.dispatch_task]:
+            if task is not None:
+                task.cancel()
+    await asyncio.sleep(0)
+
+    per_connection = used / connections
+    print(f"{label:<10}{connections:>10,} {per_connection:>10,.0f} bytes/connection")
+    return per_connection
+
+
+async def main(counts: list[int]):
+    # Quieten per-connection logging
+    events.Event.log_level = 0
+    logging.disable(logging.INFO)
+
+    for connections in counts:
+        await measure("streams", connections, lean=False)
+        await measure("lean", connections, lean=True)
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    asyncio.run(main(counts))
@@ -0,0 +1,66 @@
+"""
+Benchmark the cost of dispatching an event to each handler
+
+Triggers an event with a number of plain function handlers, then with the same number of
+coroutine handlers, and reports the time per handler after subtracting the cost of
+triggering the event with no handlers.
+
+Usage::
+
+    python benchmarks/dispatch.py [handlers] [events]
+"""
+import asyncio
+import sys
+import time
+
+from mara import App, events
+
+
+class Tick(events.Event):
+    "Tick"
+
+    __slots__ = ("count",)
+    log_level = 0
+
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+
+def sync_handler(event: Tick):
+    event.count += 1
+
+
+async def async_handler(event: Tick):
+    event.count += 1
+
+
+async def measure(handler, handlers: int, count: int) -> float:
+    """
+    Return the seconds taken to trigger ``count`` events
+    """
+    app = App()
+    for _ in range(handlers):
+        app.listen(Tick, handler)
+
+    trigger = app.events.trigger
+    event = Tick()
+    await trigger(event)
+    start = time.perf_counter()
+    for _ in range(count):
+        await trigger(event)
+    return time.perf_counter() - start
+
+
+async def main(handlers: int, count: int):
+    baseline = await measure(sync_handler, 0, count)
+    print(f"{'handler':<10}{'ns/handler':>12}")
+    for label, handler in [("sync", sync_handler), ("async", async_handler)]:
+        elapsed = await measure(handler, handlers, count)
+        per_handler = (elapsed - baseline) / (count * handlers) * 1e9
+        print(f"{label:<10}{per_handler:>12.0f}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    asyncio.run(main(*(args + [10, 100_000][len(args) :])))
@@ -0,0 +1,87 @@
+"""
+Benchmark event construction and memory use
+
+Compares the slotted ``Connect`` and ``Receive`` events against dict-backed classes
+with the same shape as the events in earlier versions of Mara.
+
+Usage::
+
+    python benchmarks/events.py [count]
+"""
+import sys
+import timeit
+import tracemalloc
+
+from mara.events import Connect, Receive
+
+
+class DictEvent:
+    "Non-specific event"
+
+    def __init__(self):
+        self.stopped = False
+        self.app = None
+
+
+class DictClient(DictEvent):
+    "Client event"
+
+    def __init__(self, client):
+        super().__init__()
+        self.client = client
+
+
+class DictConnect(DictClient):
+    "Client connected"
+
+
+class DictReceive(DictClient):
+    "Data received"
+
+    def __init__(self, client, data):
+        super().__init__(client)
+        self.data = data
+
+
+def measure_memory(factory, count):
+    """
+    Return the number of bytes allocated per instance
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = [factory() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Don't count the list holding the instances
+    list_size = sys.getsizeof(instances)
+    return (after - before - list_size) / count
+
+
+def measure_time(factory, count):
+    """
+    Return the number of nanoseconds to construct an instance
+    """
+    timer = timeit.Timer(factory)
+    loops = max(count // 10, 1)
+    best = min(timer.repeat(repeat=5, number=loops))
+    return best / loops * 1e9
+
+
+def main(count: int):
+    client = object()
+    data = "look north"
+    cases = [
+        ("Connect", lambda: Connect(client), lambda: DictConnect(client)),
+        ("Receive", lambda: Receive(client, data), lambda: DictReceive(client, data)),
+    ]
+
+    print(f"{'Event':<10}{'':>10}{'bytes':>10}{'ns':>10}")
+    for name, slotted, dict_backed in cases:
+        for label, factory in [("dict", dict_backed), ("slots", slotted)]:
+            memory = measure_memory(factory, count)
+            time = measure_time(factory, count)
+            print(f"{name:<10}{label:>10}{memory:>10.0f}{time:>10.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
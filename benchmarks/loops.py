@@ -0,0 +1,92 @@
+"""
+Benchmark echo throughput on each event loop backend
+
+Runs a text echo server on a standard asyncio loop, with and without eager tasks, and
+on uvloop if it is installed, and measures how many lines per second a set of clients
+can send and receive back. Eager tasks need Python 3.12 or later.
+
+Usage::
+
+    python benchmarks/loops.py [clients] [lines]
+"""
+import asyncio
+import importlib.util
+import sys
+import threading
+import time
+
+from mara import App, events
+from mara.app import loop as loops
+from mara.servers.protocol import BufferedSocketProtocol
+from mara.servers.socket import TextServer
+from mara.status import Status
+
+
+HOST = "127.0.0.1"
+PORT = 9100
+
+
+def start_app(loop_factory, eager_tasks: bool, protocol_class):
+    app = App(loop_factory=loop_factory)
+    app.eager_tasks = eager_tasks
+    server = TextServer(host=HOST, port=PORT)
+    server.protocol_class = protocol_class
+    app.add_server(server)
+
+    @app.listen(events.Receive)
+    async def echo(event: events.Receive):
+        event.client.write(event.data)
+
+    thread = threading.Thread(target=app.run, daemon=True)
+    thread.start()
+    while app.status < Status.RUNNING:
+        time.sleep(0.01)
+    return app, thread
+
+
+async def run_client(lines: int, payload: bytes):
+    reader, writer = await asyncio.open_connection(HOST, PORT)
+    writer.write(payload * lines)
+    await writer.drain()
+    for _ in range(lines):
+        await reader.readuntil(b"\r\n")
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run_clients(clients: int, lines: int) -> float:
+    payload = b"say The quick brown fox jumps over the lazy dog\r\n"
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(lines, payload) for _ in range(clients)))
+    return time.perf_counter() - start
+
+
+def main(clients: int, lines: int):
+    # Quieten per-event logging
+    events.Event.log_level = 0
+
+    backends = [("asyncio", loops.asyncio_loop, False)]
+    if sys.version_info >= (3, 12):
+        backends.append(("asyncio+eager", loops.asyncio_loop, True))
+    if importlib.util.find_spec("uvloop") is not None:
+        backends.append(("uvloop", loops.uvloop_loop, False))
+    else:
+        print("uvloop is not installed, skipping")
+
+    for label, loop_factory, eager_tasks in backends:
+        for transport, protocol_class in [
+            ("streams", None),
+            ("buffered", BufferedSocketProtocol),
+        ]:
+            app, thread = start_app(loop_factory, eager_tasks, protocol_class)
+            elapsed = asyncio.run(run_clients(clients, lines))
+            app.loop.call_soon_threadsafe(app.stop)
+            thread.join()
+
+            total = clients * lines
+            print(f"{label:<15}{transport:<10}{total / elapsed:>12,.0f} lines/s")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [50, 2000][len(args) :]))
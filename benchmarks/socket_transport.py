@@ -0,0 +1,127 @@
+"""
+Benchmark line throughput of the socket transports
+
+Runs a text echo server using asyncio streams and then ``BufferedSocketProtocol``, and
+measures how many lines per second a set of clients can send and receive back.
+
+It then measures line splitting on its own, feeding data straight into each reader.
+
+Usage::
+
+    python benchmarks/socket_transport.py [clients] [lines]
+"""
+import asyncio
+import sys
+import threading
+import time
+
+from mara import App, events
+from mara.servers.protocol import BufferedSocketProtocol, ProtocolReader
+from mara.servers.socket import TextServer
+from mara.status import Status
+
+
+HOST = "127.0.0.1"
+PORT = 9100
+READ_SIZE = 64 * 1024
+
+
+def start_app(protocol_class):
+    app = App()
+    server = TextServer(host=HOST, port=PORT)
+    server.protocol_class = protocol_class
+    server.read_size = READ_SIZE
+    app.add_server(server)
+
+    @app.listen(events.Receive)
+    async def echo(event: events.Receive):
+        event.client.write(event.data)
+
+    thread = threading.Thread(target=app.run, daemon=True)
+    thread.start()
+    while app.status < Status.RUNNING:
+        time.sleep(0.01)
+    return app, thread
+
+
+async def run_client(lines: int, payload: bytes):
+    reader, writer = await asyncio.open_connection(HOST, PORT)
+    writer.write(payload * lines)
+    await writer.drain()
+    for _ in range(lines):
+        await reader.readuntil(b"\r\n")
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run_clients(clients: int, lines: int) -> float:
+    payload = b"say The quick brown fox jumps over the lazy dog\r\n"
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(lines, payload) for _ in range(clients)))
+    return time.perf_counter() - start
+
+
+class ParseServer:
+    client_class = TextServer.client_class
+    read_size = READ_SIZE
+
+
+class ParseTransport:
+    def pause_reading(self):
+        pass
+
+    def resume_reading(self):
+        pass
+
+
+async def parse_streams(payload: bytes, count: int, repeat: int) -> float:
+    reader = asyncio.StreamReader(limit=READ_SIZE)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        reader.feed_data(payload)
+        for _ in range(count):
+            await reader.readuntil(b"\r\n")
+    return time.perf_counter() - start
+
+
+async def parse_buffered(payload: bytes, count: int, repeat: int) -> float:
+    protocol = BufferedSocketProtocol(ParseServer())  # type: ignore
+    protocol.transport = ParseTransport()  # type: ignore
+    reader: ProtocolReader = protocol.reader
+    start = time.perf_counter()
+    for _ in range(repeat):
+        protocol.get_buffer(-1)[: len(payload)] = payload
+        protocol.buffer_updated(len(payload))
+        for _ in range(count):
+            await reader.readframe()
+    return time.perf_counter() - start
+
+
+def main(clients: int, lines: int):
+    # Quieten per-event logging
+    events.Event.log_level = 0
+
+    for label, protocol_class in [
+        ("streams", None),
+        ("buffered", BufferedSocketProtocol),
+    ]:
+        app, thread = start_app(protocol_class)
+        elapsed = asyncio.run(run_clients(clients, lines))
+        app.loop.call_soon_threadsafe(app.stop)
+        thread.join()
+
+        total = clients * lines
+        print(f"{label:<10}{total / elapsed:>12,.0f} lines/s")
+
+    # Line splitting only
+    count = 1000
+    payload = b"say The quick brown fox jumps over the lazy dog\r\n" * count
+    repeat = max(clients * lines // count, 1)
+    for label, parse in [("streams", parse_streams), ("buffered", parse_buffered)]:
+        elapsed = asyncio.run(parse(payload, count, repeat))
+        print(f"{label:<10}{count * repeat / elapsed:>12,.0f} lines/s (parse only)")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [50, 2000][len(args) :]))
@@ -0,0 +1,147 @@
+"""
+Benchmark many active timers
+
+Starts periodic timers as one task per timer, each sleeping until it is next due, then
+as ``PeriodicTimer`` instances on the app's timer wheel. For each it reports the time
+to start them, the Python memory allocated per timer, the CPU time per firing while they
+run for a few seconds, and the time to stop them.
+
+Timers are spread evenly across their period, so the same number fall due each second.
+
+Usage::
+
+    python benchmarks/timers.py [timers] [every] [seconds]
+"""
+import asyncio
+import gc
+import logging
+import sys
+import time
+import tracemalloc
+
+from mara import App
+from mara.timers import LoopClock, PeriodicTimer
+
+
+class Counter:
+    fired = 0
+
+
+def callback(timer):
+    Counter.fired += 1
+
+
+async def sleeper(offset: float, every: float):
+    """
+    The old design: a long-lived task per timer, sleeping until it is next due
+    """
+    loop = asyncio.get_running_loop()
+    next_due = loop.time() + offset
+    while True:
+        await asyncio.sleep(next_due - loop.time())
+        callback(None)
+        next_due += every
+
+
+async def start_tasks(count: int, every: float):
+    tasks = [
+        asyncio.create_task(sleeper(every * i / count, every)) for i in range(count)
+    ]
+    # Let every task reach its first sleep
+    await asyncio.sleep(0)
+
+    def stop():
+        for task in tasks:
+            task.cancel()
+
+    return stop
+
+
+class StaggeredTimer(PeriodicTimer):
+    """
+    Periodic timer which is first due after an offset
+    """
+
+    offset: float | None
+
+    def __init__(self, offset: float, every: float):
+        super().__init__(every=every, strict=True)
+        self.offset = offset
+
+    def next_due(self, last_due: float, now: float) -> float:
+        if self.offset is not None:
+            offset, self.offset = self.offset, None
+            return last_due + offset
+        return super().next_due(last_due, now)
+
+
+async def start_wheel(count: int, every: float):
+    app = App()
+    app.loop = asyncio.get_running_loop()
+    app.scheduler.start(LoopClock(app.loop))
+    timers = []
+    for i in range(count):
+        timer = StaggeredTimer(every * i / count, every)
+        timer(callback)
+        timer.start(app)
+        timers.append(timer)
+
+    def stop():
+        for timer in timers:
+            timer.stop()
+        app.scheduler.stop()
+
+    return stop
+
+
+async def measure(start, count: int, every: float, seconds: float):
+    # Measure memory separately, as tracing slows everything down
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    stop = await start(count, every)
+    memory = (tracemalloc.get_traced_memory()[0] - before) / count
+    tracemalloc.stop()
+    stop()
+    await asyncio.sleep(0)
+
+    gc.collect()
+    started = time.perf_counter()
+    stop = await start(count, every)
+    setup = time.perf_counter() - started
+
+    Counter.fired = 0
+    cpu = time.process_time()
+    await asyncio.sleep(seconds)
+    cpu = time.process_time() - cpu
+    fired = Counter.fired
+    # Timers which fell due while starting the others fire late, so compare per firing
+    per_fire = cpu / (fired or 1) * 1e6
+
+    started = time.perf_counter()
+    stop()
+    await asyncio.sleep(0)
+    teardown = time.perf_counter() - started
+    return setup, memory, per_fire, fired, teardown
+
+
+async def main(count: int, every: float, seconds: float):
+    print(
+        f"{'design':<8}{'start s':>10}{'bytes/timer':>13}{'cpu us/fire':>13}"
+        f"{'fired':>9}{'stop s':>9}"
+    )
+    for label, start in [("tasks", start_tasks), ("wheel", start_wheel)]:
+        setup, memory, per_fire, fired, teardown = await measure(
+            start, count, every, seconds
+        )
+        print(
+            f"{label:<8}{setup:>10.3f}{memory:>13.0f}{per_fire:>13.1f}"
+            f"{fired:>9}{teardown:>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    args = [float(arg) for arg in sys.argv[1:]]
+    count, every, seconds = args + [100_000, 10, 3][len(args) :]
+    asyncio.run(main(int(count), every, seconds))
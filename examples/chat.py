@@ -13,11 +13,8 @@ app.add_server(server)
 
 
 def broadcast(server: AbstractServer, msg: str):
-    "Send a message out to all connected users"
-    for client in server.clients:
-        if "username" not in client.session:
-            continue
-        client.write(msg)
+    "Send a message out to all logged in users"
+    server.groups["chat"].write(msg)
 
 
 @app.listen(events.Connect)
@@ -28,6 +25,7 @@ async def login(event: events.Connect):
     event.client.write("")
 
     event.client.session.username = username
+    event.client.server.groups.join("chat", event.client)
     broadcast(event.client.server, f"* {username} has joined")
 
 
@@ -47,11 +45,9 @@ async def leave(event: events.Disconnect):
 
 @app.add_timer(PeriodicTimer(every=60))
 async def poll(timer):
+    "Send everyone a message, spread over a second so other clients aren't stalled"
     for server in timer.app.servers:
-        for client in server.clients:
-            if "username" not in client.session:
-                continue
-            client.write("Beep!")
+        await server.groups["chat"].write_chunked("Beep!", window=1)
 
 
 if __name__ == "__main__":
@@ -2,17 +2,30 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import TYPE_CHECKING, Any, Coroutine, List
-
-from ..events import Event, PostStart, PostStop, PreStart, PreStop
+import os
+import signal
+import time
+from typing import TYPE_CHECKING, Any, Callable, Coroutine, List
+
+from ..clients.registry import ClientRegistry
+from ..events import Event, PostStart, PostStop, PreRestart, PreStart, PreStop
+from ..executors import ProcessExecutor, ThreadExecutor
 from ..status import Status
+from ..timers import LoopClock, TimerWheel
 from . import event_manager
 from .logging import configure as configure_logging
+from .loop import LoopFactoryType, cancel_tasks, new_loop
+from .loop import run as run_in_loop
+from .restart import RESTART_ENV, Handoff, SpawnType, hand_off
+from .tasks import TaskRegistry
+from .workers import STOP_SIGNALS, Supervisor
 
 
 if TYPE_CHECKING:
+    from ..bus import AbstractBus
+    from ..executors import AbstractExecutor
     from ..servers import AbstractServer
-    from ..timers import AbstractTimer
+    from ..timers import AbstractClock, AbstractTimer
 
 configure_logging()
 logger = logging.getLogger("mara.app")
@@ -25,16 +38,70 @@ class App:
 
     loop: asyncio.AbstractEventLoop | None = None
     servers: List[AbstractServer]
+    clients: ClientRegistry
     events: event_manager.EventManager
     timers: List[AbstractTimer]
+    scheduler: TimerWheel
+    tasks: TaskRegistry
+    executors: dict[str, AbstractExecutor]
     _status: Status = Status.IDLE
+    _stop_requested: asyncio.Event | None
+
+    #: Number of this worker process when running with workers, otherwise ``None``
+    worker: int | None = None
+
+    #: Bus to relay events and group writes between workers. When running with
+    #: workers, defaults to a ``UnixBus``.
+    bus: AbstractBus | None = None
+
+    #: File descriptor of a socket to receive servers and clients from the process
+    #: being restarted. Set from the ``MARA_RESTART_FD`` environment variable by
+    #: ``restart()``.
+    restart_fd: int | None = None
+
+    #: Function to create the event loop, such as ``mara.app.loop.uvloop_loop``. If
+    #: ``None``, uvloop is used if it is installed, otherwise a standard asyncio loop.
+    loop_factory: LoopFactoryType | None = None
 
-    def __init__(self):
+    #: Start new tasks eagerly, so short tasks can finish without waiting for the loop.
+    #: Only supported in Python 3.12 or later; ignored on earlier versions.
+    eager_tasks: bool = True
+
+    #: Clock for timers. If ``None``, timers use the event loop's clock - which is
+    #: virtual time on a ``VirtualTimeLoop``.
+    clock: AbstractClock | None = None
+
+    #: Seconds allowed when stopping for clients to send their outbound queues, and for
+    #: cancelled tasks to finish
+    shutdown_timeout: float = 5
+
+    #: Seconds taken by each phase of the last shutdown
+    shutdown_timings: dict[str, float]
+
+    def __init__(
+        self,
+        loop_factory: LoopFactoryType | None = None,
+        clock: AbstractClock | None = None,
+    ):
+        if loop_factory is not None:
+            self.loop_factory = loop_factory
+        if clock is not None:
+            self.clock = clock
         self.servers = []
-        # TODO: move clients to server
-        self.clients = []
+
+        # Clients of all servers; each server also has its own registry
+        self.clients = ClientRegistry()
         self.timers = []
 
+        # Timers and other scheduled callbacks share one timer wheel
+        self.scheduler = TimerWheel()
+        self.tasks = TaskRegistry()
+
+        # Pools for blocking and CPU-heavy work; see offload()
+        self.executors = {"thread": ThreadExecutor(), "process": ProcessExecutor()}
+        self.shutdown_timings = {}
+        self._stop_requested = None
+
         self.events = event_manager.EventManager(self)
 
     def add_server(self, server: AbstractServer) -> AbstractServer:
@@ -49,7 +116,7 @@ class App:
 
         if self.loop:
             logger.debug(f"Running server {server}")
-            self.create_task(server.run(self))
+            self.create_task(server.run(self), owner=server)
 
         return server
 
@@ -64,6 +131,37 @@ class App:
         logger.debug(f"Removing server {server}")
         self.servers.remove(server)
 
+    def add_executor(self, name: str, executor: AbstractExecutor) -> AbstractExecutor:
+        """
+        Add an executor to run blocking or CPU-heavy functions in, or replace one
+
+        The app starts with a ``ThreadExecutor`` called ``"thread"`` and a
+        ``ProcessExecutor`` called ``"process"``. Add more to keep separate pools for
+        different kinds of work::
+
+            app.add_executor("pathfinding", ProcessExecutor(max_workers=2))
+        """
+        logger.debug(f"Add executor {name}: {executor}")
+        old = self.executors.get(name)
+        if old is not None and old is not executor:
+            old.shutdown()
+        self.executors[name] = executor
+        return executor
+
+    async def offload(self, executor: str, fn: Callable[..., Any], *args, **kwargs):
+        """
+        Call ``fn(*args, **kwargs)`` in the named executor, and return its result
+
+        For example, to run a blocking function in the thread pool::
+
+            data = await app.offload("thread", load_map, path)
+        """
+        try:
+            pool = self.executors[executor]
+        except KeyError:
+            raise ValueError(f"Unknown executor {executor}") from None
+        return await pool.run(fn, *args, **kwargs)
+
     def add_timer(self, timer: AbstractTimer) -> AbstractTimer:
         """
         Add a new Timer instance to the async loop
@@ -91,57 +189,141 @@ class App:
         self.timers.append(timer)
 
         if self.loop:
-            logger.debug(f"Timer {timer} starting")
-            self.create_task(timer.run(self))
-            logger.debug(f"Timer {timer} stopped")
-
-            # TODO: extend self.create_task to callback to a fn to clean up self.timers
+            # Start on the next iteration, once a decorated callback has been assigned
+            self.loop.call_soon(timer.start, self)
 
         return timer
 
-    def run(self, debug=True):
+    def remove_timer(self, timer: AbstractTimer):
+        """
+        Stop and remove the specified Timer instance
+
+        Timers are removed automatically when they have no next due time.
+        """
+        if timer.running:
+            timer.stop()
+
+        if timer in self.timers:
+            logger.debug(f"Removing timer {timer}")
+            self.timers.remove(timer)
+
+    def run(self, debug=True, workers: int | None = None):
         """
         Start the main app async loop
 
         This will start any Servers which have been added with ``add_server()``
+
+        If ``workers`` is set, fork that many worker processes which each run the app,
+        and supervise them until the app is stopped with ``SIGINT`` or ``SIGTERM``.
         """
+        if workers:
+            Supervisor(self, workers).run()
+            return
+
         self._status = Status.STARTING
+        worker = self.worker
 
-        # TODO: Should add some more logic around here from asyncio.run
-        self.loop = loop = asyncio.new_event_loop()
+        self.loop = loop = new_loop(self.loop_factory, self.eager_tasks)
+        asyncio.set_event_loop(loop)
+        self._stop_requested = stop_requested = asyncio.Event()
         logger.debug("Loop starting")
-        loop.run_until_complete(self.events.trigger(PreStart()))
+        if worker is not None:
+            # Stop when the supervisor passes on a signal
+            for sig in (*STOP_SIGNALS, signal.SIGHUP):
+                loop.add_signal_handler(sig, self.stop)
+
+            if self.bus is not None:
+                loop.run_until_complete(self.bus.connect(self))
+        loop.run_until_complete(self.events.trigger(PreStart(worker=worker)))
+
+        # Take over from the process being restarted
+        handoff = None
+        restart_fd = self.restart_fd
+        if restart_fd is None and worker is None and RESTART_ENV in os.environ:
+            restart_fd = int(os.environ.pop(RESTART_ENV))
+        if restart_fd is not None:
+            handoff = Handoff(self, restart_fd)
+            handoff.receive()
 
         for server in self.servers:
-            self.create_task(server.run(self))
+            self.create_task(server.run(self), owner=server)
 
-        for timer in self.timers:
-            self.create_task(timer.run(self))
+        self.scheduler.start(self.clock or LoopClock(loop))
+        for timer in list(self.timers):
+            timer.start(self)
 
         logger.debug("Loop running")
         self._status = Status.RUNNING
-        loop.run_until_complete(self.events.trigger(PostStart()))
+        loop.run_until_complete(self.events.trigger(PostStart(worker=worker)))
+        if handoff is not None:
+            self.create_task(handoff.restore())
         try:
-            loop.run_forever()
+            loop.run_until_complete(stop_requested.wait())
         finally:
+            # Also shut down if the loop was interrupted, eg by KeyboardInterrupt
             logger.debug("Loop stopping")
-            self._status = Status.STOPPING
-            loop.run_until_complete(self.events.trigger(PreStop()))
+            loop.run_until_complete(self.shutdown())
+            self._stop_requested = None
+            if worker is not None and self.bus is not None:
+                loop.run_until_complete(self.bus.close())
+            cancel_tasks(loop)
             loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(loop.shutdown_default_executor())
+            asyncio.set_event_loop(None)
             loop.close()
             self._status = Status.STOPPED
             self.loop = None
             logger.debug("Loop stopped")
 
             # Loop has terminated
-            asyncio.run(self.events.trigger(PostStop()))
+            self.run_once(self.events.trigger(PostStop(worker=worker)))
+
+    def run_once(self, coro: Coroutine[Any, Any, Any]) -> Any:
+        """
+        Run a coroutine in a new event loop configured like the app's loop
+
+        Used to trigger events when the app's loop isn't running.
+        """
+        return run_in_loop(coro, self.loop_factory, self.eager_tasks)
 
-    def create_task(self, task_fn: Coroutine[Any, Any, Any]):
+    async def restart(self, spawn: SpawnType | None = None):
+        """
+        Restart the app in a new process without dropping connections
+
+        The listening sockets and socket clients are passed to the new process along
+        with each client's session; other clients are closed. This process then stops.
+
+        By default the new process is started with the same command line. To start it
+        another way, pass a ``spawn`` function which will be called with the socket to
+        pass to the new app as its ``restart_fd``.
+        """
+        if self.worker is not None:
+            raise ValueError("Cannot restart a worker")
+
+        # When called from a handler, the handoff cancels the client task this is
+        # running in, so it runs in its own task and carries on without it
+        task = self.create_task(self._restart(spawn))
+        await asyncio.shield(task)
+
+    async def _restart(self, spawn: SpawnType | None):
+        await self.events.trigger(PreRestart(worker=self.worker))
+        await hand_off(self, spawn)
+        self.stop()
+
+    def create_task(self, task_fn: Coroutine[Any, Any, Any], owner: Any = None):
+        """
+        Start a task on the app's loop
+
+        The task is added to ``app.tasks`` under its ``owner`` - the server, client or
+        timer it belongs to, or ``None`` for the app - and is cancelled when the app
+        stops, if it has not finished.
+        """
         if self.loop is None:
             # TODO: Handle pending tasks here
             raise ValueError("Loop is not running")
         task = self.loop.create_task(task_fn)
         task.add_done_callback(self._handle_task_complete)
+        self.tasks.add(task, owner)
         return task
 
     def _handle_task_complete(self, task: asyncio.Task):
@@ -156,6 +338,9 @@ class App:
         self,
         event_class: type[Event],
         handler: event_manager.HandlerType | None = None,
+        *,
+        concurrent: bool | None = None,
+        executor: str | None = None,
         **filters: event_manager.FilterType,
     ):
         """
@@ -165,6 +350,10 @@ class App:
 
             event_class (Type[Event]): The Event class to listen for
             handler (Awaitable | None): The handler, if not being decorated
+            concurrent (bool | None): Run alongside neighbouring concurrent handlers
+                instead of waiting for them; None to use the event class's setting
+            executor (str | None): Name of an executor to run the handler in, such as
+                ``"thread"`` or ``"process"``; the handler must be a plain function
             **filters: Key value pairs to match against inbound events
 
         Can be called directly::
@@ -176,8 +365,47 @@ class App:
             @app.listen(Event)
             async def callback(event):
                 ...
+
+        A handler which runs in an executor is still awaited in turn with the other
+        handlers, but the loop is free to serve other clients while it runs::
+
+            @app.listen(SaveWorld, executor="thread")
+            def save(event):
+                ...
         """
-        return self.events.listen(event_class, handler, **filters)
+        return self.events.listen(
+            event_class, handler, concurrent=concurrent, executor=executor, **filters
+        )
+
+    def subscribe(
+        self,
+        event_class: type[Event],
+        handler: event_manager.HandlerType,
+        *,
+        concurrent: bool | None = None,
+        executor: str | None = None,
+        **filters: event_manager.FilterType,
+    ) -> event_manager.Listener:
+        """
+        Bind a handler callback to the specified event class, and to its subclasses,
+        and return a listener handle which can be used to remove it again
+
+        Use this for short-lived handlers, such as those for a room or quest::
+
+            listener = app.subscribe(events.Receive, handler, client=client)
+            ...
+            listener.remove()
+        """
+        return self.events.subscribe(
+            event_class, handler, concurrent=concurrent, executor=executor, **filters
+        )
+
+    def unlisten(self, event_class: type[Event], handler: event_manager.HandlerType):
+        """
+        Unbind a handler callback from the specified event class, and from its
+        subclasses
+        """
+        self.events.unlisten(event_class, handler)
 
     @property
     def status(self):
@@ -198,11 +426,89 @@ class App:
         """
         This will ask the main loop to stop, shutting down all servers, connections and
         other async tasks.
+
+        See ``shutdown()`` for how the app shuts down.
         """
-        if self.loop:
-            logger.debug("Stopping servers")
-            for server in self.servers:
-                server.stop()
+        if self._stop_requested is not None:
+            logger.debug("Requesting shutdown")
+            self._stop_requested.set()
+
+    async def shutdown(self):
+        """
+        Shut down servers, clients and tasks
 
-            logger.debug("Requesting loop stop")
-            self.loop.stop()
+        Called once the main loop has been asked to stop. Shuts down in phases:
+
+        * ``prestop`` - trigger ``PreStop``, so handlers can send final messages
+        * ``stop_accepting`` - stop servers accepting new connections, and stop timers
+        * ``flush`` - wait for clients to send everything in their outbound queues
+        * ``close`` - close client connections
+        * ``cancel`` - cancel all remaining tasks and wait for them to finish, and shut
+          down executors without waiting for running calls
+
+        The ``flush``, ``close`` and ``cancel`` phases must finish within
+        ``shutdown_timeout`` seconds, otherwise they are cut short. The time taken by
+        each phase is stored in ``shutdown_timings``.
+        """
+        self._status = Status.STOPPING
+        timings: dict[str, float] = {}
+        self.shutdown_timings = timings
+        started = last = time.perf_counter()
+
+        def lap(phase: str):
+            nonlocal last
+            now = time.perf_counter()
+            timings[phase] = now - last
+            last = now
+
+        await self.events.trigger(PreStop(worker=self.worker))
+        lap("prestop")
+
+        logger.debug("Stopping servers")
+        for server in self.servers:
+            server.stop()
+        for timer in self.timers:
+            timer.stop()
+        self.scheduler.stop()
+        lap("stop_accepting")
+
+        deadline = started + self.shutdown_timeout
+        clients = list(self.clients)
+        if clients:
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*(client.flush() for client in clients)),
+                    max(deadline - time.perf_counter(), 0),
+                )
+            except asyncio.TimeoutError:
+                logger.warning("Shutdown timed out waiting for clients to flush")
+        lap("flush")
+
+        if clients:
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(
+                        *(client.close() for client in clients if client.connected),
+                        return_exceptions=True,
+                    ),
+                    max(deadline - time.perf_counter(), 0),
+                )
+            except asyncio.TimeoutError:
+                logger.warning("Shutdown timed out closing clients")
+        lap("close")
+
+        tasks = self.tasks.cancel(all=True)
+        if tasks:
+            _, pending = await asyncio.wait(
+                tasks, timeout=max(deadline - time.perf_counter(), 0)
+            )
+            if pending:
+                logger.warning(f"Shutdown abandoned {len(pending)} tasks")
+        for executor in self.executors.values():
+            executor.shutdown()
+        lap("cancel")
+
+        summary = ", ".join(
+            f"{phase} {seconds * 1000:.1f}ms" for phase, seconds in timings.items()
+        )
+        logger.info(f"Shutdown in {last - started:.3f}s: {summary}")
@@ -1,25 +1,288 @@
 from __future__ import annotations
 
+import asyncio
+import inspect
 import logging
 from collections import defaultdict
+from functools import partial
+from itertools import count
+from operator import attrgetter
 from typing import TYPE_CHECKING, Any
 
 from ..events import Event
 
 
 if TYPE_CHECKING:
-    from collections.abc import Awaitable, Callable
+    from collections.abc import Awaitable, Callable, Sequence
 
     from .app import App
 
     # Type aliases
-    HandlerType = Callable[[Event], Awaitable[None]]
+    AsyncHandlerType = Callable[[Event], Awaitable[None]]
+    HandlerType = AsyncHandlerType | Callable[[Event], None]
     FilterType = dict[str, Any]
-    EventsType = dict[type[Event], list[tuple[HandlerType, FilterType]]]
+    EventsType = dict[type[Event], dict["Listener", None]]
 
 
 logger = logging.getLogger("mara.event")
 
+# Placeholder for an event attribute which has not been set
+_MISSING = object()
+
+# Sort key for restoring registration order
+_by_order = attrgetter("order")
+
+# Task groups are only available in Python 3.11+
+TaskGroup = getattr(asyncio, "TaskGroup", None)
+
+
+class Listener:
+    """
+    A handler bound to an event class
+
+    Returned by ``EventManager.subscribe()`` as a handle which can be used to remove the
+    handler again::
+
+        listener = app.subscribe(events.Receive, handler, server=server)
+        ...
+        listener.remove()
+    """
+
+    __slots__ = (
+        "manager",
+        "event_class",
+        "handler",
+        "call",
+        "sync",
+        "filters",
+        "concurrent",
+        "executor",
+        "order",
+        "classes",
+        "index_key",
+        "index_value",
+        "remaining",
+    )
+
+    manager: EventManager
+    event_class: type[Event]
+    handler: HandlerType
+    #: Callable which runs the handler for an event and returns an awaitable. Not
+    #: used for sync handlers.
+    call: AsyncHandlerType
+    #: Whether the handler is a plain function, which is called without a coroutine.
+    #: Its result is only awaited if it returns an awaitable.
+    sync: bool
+    filters: FilterType
+    #: Whether to run alongside neighbouring concurrent handlers - None to use the
+    #: ``concurrent`` setting of the event class
+    concurrent: bool | None
+    #: Name of the app executor to run the handler in, or None to run it in the loop
+    executor: str | None
+    #: Registration order, used to keep handlers in order across dispatch indexes
+    order: int
+    #: Event classes this listener has been propagated to
+    classes: dict[type[Event], None]
+    #: Filter used to index this listener, or None if it is not indexed
+    index_key: str | None
+    index_value: Any
+    #: Filters to check once the listener has been found
+    remaining: tuple[tuple[str, Any], ...]
+
+    def __init__(
+        self,
+        manager: EventManager,
+        event_class: type[Event],
+        handler: HandlerType,
+        filters: FilterType,
+        order: int,
+        concurrent: bool | None = None,
+        executor: str | None = None,
+    ):
+        self.manager = manager
+        self.event_class = event_class
+        self.handler = handler
+        self.filters = filters
+        self.concurrent = concurrent
+        self.executor = executor
+        self.order = order
+
+        handler_is_async = is_async(handler)
+        if executor is not None and handler_is_async:
+            raise ValueError(
+                f"Cannot run async handler {handler!r} in executor {executor}"
+            )
+
+        self.sync = executor is None and not handler_is_async
+        if executor is None:
+            self.call = handler  # type: ignore
+        else:
+            self.call = partial(manager.app.offload, executor, handler)
+        self.classes = {}
+
+        self.index_key = None
+        self.index_value = None
+        self.remaining = ()
+        if filters:
+            (key, value), *remaining = filters.items()
+            try:
+                hash(value)
+            except TypeError:
+                # Unhashable filter value, will need to be scanned
+                self.remaining = tuple(filters.items())
+            else:
+                self.index_key = key
+                self.index_value = value
+                self.remaining = tuple(remaining)
+
+    def __repr__(self):
+        name = getattr(self.handler, "__name__", repr(self.handler))
+        return f"<Listener {self.event_class.__name__}: {name}>"
+
+    @property
+    def active(self) -> bool:
+        """
+        Whether the listener is still registered
+        """
+        return bool(self.classes)
+
+    def matches(self, event: Event) -> bool:
+        """
+        Check the filters which weren't used to find this listener
+        """
+        return all(
+            getattr(event, filter_key, _MISSING) == filter_value
+            for filter_key, filter_value in self.remaining
+        )
+
+    def remove(self):
+        """
+        Stop listening
+        """
+        self.manager.remove(self)
+
+
+def is_async(handler: Callable) -> bool:
+    """
+    Check if a handler is a coroutine function, or an object with an async ``__call__``
+    """
+    if inspect.iscoroutinefunction(handler):
+        return True
+    call = getattr(handler, "__call__", None)
+    return call is not None and inspect.iscoroutinefunction(call)
+
+
+class DispatchPlan:
+    """
+    Precompiled dispatch table for a single event class
+
+    Built from the registered listeners the first time an event class is triggered, and
+    kept up to date as listeners are added and removed.
+
+    Handlers without filters are frozen into a tuple which can be returned as-is.
+    Handlers with filters are indexed by the value of their first filter, so only
+    handlers whose first filter matches the event are visited; any further filters are
+    checked once the handler has been found. Filter values which can't be hashed fall
+    back to a linear scan.
+
+    Adding or removing a listener only rebuilds the tuple which holds it, so frequent
+    subscriptions with distinct filter values stay cheap.
+    """
+
+    #: Listeners without filters, in registration order
+    unfiltered: tuple[Listener, ...]
+
+    #: Filtered listeners indexed by attribute name then attribute value
+    indexed: dict[str, dict[Any, tuple[Listener, ...]]]
+
+    #: Filtered listeners which could not be indexed
+    scanned: tuple[Listener, ...]
+
+    #: Number of listeners which have asked to run concurrently
+    concurrent: int
+
+    def __init__(self, listeners: Sequence[Listener]):
+        self.unfiltered = ()
+        self.indexed = {}
+        self.scanned = ()
+        self.concurrent = 0
+        for listener in listeners:
+            self.add(listener)
+
+    def add(self, listener: Listener):
+        """
+        Add a listener to the end of the plan
+        """
+        if listener.concurrent:
+            self.concurrent += 1
+
+        if listener.index_key is not None:
+            index = self.indexed.setdefault(listener.index_key, {})
+            index[listener.index_value] = index.get(listener.index_value, ()) + (
+                listener,
+            )
+        elif listener.remaining:
+            self.scanned += (listener,)
+        else:
+            self.unfiltered += (listener,)
+
+    def discard(self, listener: Listener):
+        """
+        Remove a listener from the plan
+        """
+        if listener.concurrent:
+            self.concurrent -= 1
+
+        if listener.index_key is not None:
+            index = self.indexed.get(listener.index_key, {})
+            bucket = tuple(
+                found
+                for found in index.get(listener.index_value, ())
+                if found is not listener
+            )
+            if bucket:
+                index[listener.index_value] = bucket
+            else:
+                index.pop(listener.index_value, None)
+                if not index:
+                    self.indexed.pop(listener.index_key, None)
+
+        elif listener.remaining:
+            self.scanned = tuple(
+                found for found in self.scanned if found is not listener
+            )
+        else:
+            self.unfiltered = tuple(
+                found for found in self.unfiltered if found is not listener
+            )
+
+    def listeners(self, event: Event) -> Sequence[Listener]:
+        """
+        Return the listeners which match this event, in registration order
+        """
+        # Fast path - nothing to filter
+        if not self.indexed and not self.scanned:
+            return self.unfiltered
+
+        matched = list(self.unfiltered)
+        for key, index in self.indexed.items():
+            value = getattr(event, key, _MISSING)
+            if value is _MISSING:
+                continue
+            try:
+                found = index.get(value)
+            except TypeError:
+                # Unhashable event attribute can't match a hashable filter value
+                continue
+            if found:
+                matched.extend(found)
+        matched.extend(self.scanned)
+
+        if len(matched) > 1:
+            matched.sort(key=_by_order)
+
+        return [listener for listener in matched if listener.matches(event)]
+
 
 class EventManager:
     """
@@ -38,16 +301,29 @@ class EventManager:
     # Defined event classes
     _known_events: dict[type[Event], None]
 
+    # Compiled dispatch plans, built on demand by trigger()
+    _plans: dict[type[Event], DispatchPlan]
+
+    # Listeners by handler, for unlisten()
+    _handlers: dict[HandlerType, dict[Listener, None]]
+
     def __init__(self, app: App):
         # Initialise events
         self.app = app
-        self.events: EventsType = defaultdict(list)
+        self.events: EventsType = defaultdict(dict)
         self._known_events: dict[type[Event], None] = {}
+        self._plans: dict[type[Event], DispatchPlan] = {}
+        self._handlers: dict[HandlerType, dict[Listener, None]] = {}
+        self._order = count()
+        self._log_credit: dict[type[Event], float] = {}
 
     def listen(
         self,
         event_class: type[Event],
         handler: HandlerType | None = None,
+        *,
+        concurrent: bool | None = None,
+        executor: str | None = None,
         **filters: FilterType,
     ):
         """
@@ -67,39 +343,113 @@ class EventManager:
         Arguments:
             event_class (Type[Event]): The Event class to listen for
             handler (Awaitable | None): The handler, if not being decorated
+            concurrent (bool | None): Run alongside neighbouring concurrent handlers
+                instead of waiting for them; None to use the event class's setting
+            executor (str | None): Name of an app executor to run a plain function
+                handler in, instead of running it in the loop
             server (AbstractServer | List[AbstractServer] | None): The Server class or
                 classes to filter inbound events
         """
         # Called directly
         if handler is not None:
-            self._listen(event_class, handler, filters)
+            self.subscribe(
+                event_class,
+                handler,
+                concurrent=concurrent,
+                executor=executor,
+                **filters,
+            )
             return handler
 
         # Called as a decorator
         def decorator(fn):
-            self._listen(event_class, fn, filters)
+            self.subscribe(
+                event_class, fn, concurrent=concurrent, executor=executor, **filters
+            )
             return fn
 
         return decorator
 
-    def _listen(
+    def subscribe(
         self,
         event_class: type[Event],
         handler: HandlerType,
-        filters: FilterType,
-    ):
+        *,
+        concurrent: bool | None = None,
+        executor: str | None = None,
+        **filters: FilterType,
+    ) -> Listener:
+        """
+        Bind a handler callback to the specified event class and its subclasses, and
+        return a ``Listener`` which can be used to remove it
+        """
+        listener = Listener(
+            self,
+            event_class,
+            handler,
+            filters,
+            next(self._order),
+            concurrent,
+            executor,
+        )
+        self._listen(event_class, listener)
+        self._handlers.setdefault(handler, {})[listener] = None
+        return listener
+
+    def unlisten(self, event_class: type[Event], handler: HandlerType):
+        """
+        Unbind a handler callback from the specified event class and its subclasses
+
+        This removes every listener for the handler which was bound to this event class,
+        regardless of filters.
+        """
+        for listener in list(self._handlers.get(handler, ())):
+            if listener.event_class is event_class:
+                self.remove(listener)
+
+    def remove(self, listener: Listener):
+        """
+        Remove a listener from every event class it was propagated to
+
+        This only touches the classes the listener is bound to; it does not scan other
+        listeners.
+        """
+        for event_class in listener.classes:
+            self.events[event_class].pop(listener, None)
+            plan = self._plans.get(event_class)
+            if plan is not None:
+                plan.discard(listener)
+        listener.classes = {}
+
+        handler_listeners = self._handlers.get(listener.handler)
+        if handler_listeners is not None:
+            handler_listeners.pop(listener, None)
+            if not handler_listeners:
+                del self._handlers[listener.handler]
+
+    def _listen(self, event_class: type[Event], listener: Listener):
         """
-        Internal method to recursively bind a handler to the specified event
+        Internal method to recursively bind a listener to the specified event
         class and its subclasses. Call listen() instead.
         """
         # Recurse subclasses. Do it before registering for this event in case
         # they're not known yet, then they'll copy handlers for this event
         for subclass in event_class.__subclasses__():
-            self._listen(subclass, handler, filters)
+            self._listen(subclass, listener)
 
         # Register class
         self._ensure_known_event(event_class)
-        self.events[event_class].append((handler, filters))
+        listeners = self.events[event_class]
+        if listener in listeners:
+            # Already reached through another base class
+            return
+        listeners[listener] = None
+        listener.classes[event_class] = None
+
+        # Only this class's plan is affected
+        plan = self._plans.get(event_class)
+        if plan is not None:
+            plan.add(listener)
 
     def _ensure_known_event(self, event_class: type[Event]):
         """
@@ -127,7 +477,9 @@ class EventManager:
 
         # Propagating at registration means that we don't need to walk the MRO for
         # every event raised
-        self.events[event_class] = self.events[base_cls][:]
+        self.events[event_class] = dict(self.events[base_cls])
+        for listener in self.events[event_class]:
+            listener.classes[event_class] = None
 
     async def trigger(self, event: Event):
         """
@@ -141,25 +493,143 @@ class EventManager:
         event.app = self.app
 
         # Log the event
-        logger.info(str(event))
-        # self.app.log.event(event)
+        self._log(event_class, event)
+
+        # Pass it on to other workers
+        if event_class.relay and not event.relayed and self.app.bus is not None:
+            self.app.bus.publish_event(event)
+
+        # Find the handlers for this event
+        plan = self._plans.get(event_class)
+        if plan is None:
+            plan = self._plans[event_class] = DispatchPlan(
+                tuple(self.events[event_class])
+            )
+
+        listeners = plan.listeners(event)
+        if plan.concurrent or event_class.concurrent:
+            await self._trigger_concurrent(event, listeners)
+            return
 
         # Call all handlers
-        handler: HandlerType
-        filters: FilterType
-        for handler, filters in self.events[event_class]:
+        listener: Listener
+        for listener in listeners:
             # Catch stopped event
             if event.stopped:
                 return
 
-            # Filter anything which doesn't match
-            # TODO: This could be enhanced to allow more complex filtering rules
-            if not all(
-                hasattr(event, filter_key)
-                and getattr(event, filter_key) == filter_value
-                for filter_key, filter_value in filters.items()
-            ):
+            # Skip listeners removed by an earlier handler
+            if not listener.classes:
+                continue
+
+            # Pass to the handler - plain functions are called without a coroutine, but
+            # may still return an awaitable, eg a sync wrapper around an async function
+            if listener.sync:
+                result = listener.handler(event)
+                if inspect.isawaitable(result):
+                    await result
+            else:
+                await listener.call(event)
+
+    def _log(self, event_class: type[Event], event: Event):
+        """
+        Log the event according to its class's ``log_level`` and ``log_sample_rate``
+
+        The event is passed to the logger as an argument and in the record's ``extra``,
+        so it is only converted to a string if a handler formats the record.
+        """
+        level = event_class.log_level
+        if not logger.isEnabledFor(level):
+            return
+
+        rate = event_class.log_sample_rate
+        if rate < 1:
+            # Accumulate credit so exactly ``rate`` of the events are logged
+            credit = self._log_credit.get(event_class, 0) + rate
+            if credit < 1:
+                self._log_credit[event_class] = credit
                 return
+            self._log_credit[event_class] = credit - 1
+
+        logger.log(
+            level,
+            "%s",
+            event,
+            extra={"event": event, "event_class": event_class.__name__},
+        )
+
+    async def _trigger_concurrent(self, event: Event, listeners: Sequence[Listener]):
+        """
+        Call handlers, running consecutive concurrent handlers together
+
+        Sequential handlers act as barriers: they wait for all concurrent handlers
+        before them to finish, and handlers after them wait for them. Calling
+        ``event.stop()`` prevents any later handlers from starting, but concurrent
+        handlers which have already started will run to completion.
+        """
+        class_concurrent = type(event).concurrent
+        batch: list[Listener] = []
+        for listener in listeners:
+            concurrent = listener.concurrent
+            if concurrent is None:
+                concurrent = class_concurrent
+            if concurrent:
+                batch.append(listener)
+                continue
+
+            if batch:
+                await self._run_batch(event, batch)
+                batch = []
+
+            if event.stopped:
+                return
+            if not listener.classes:
+                continue
+            if listener.sync:
+                result = listener.handler(event)
+                if inspect.isawaitable(result):
+                    await result
+            else:
+                await listener.call(event)
+
+        if batch:
+            await self._run_batch(event, batch)
+
+    async def _run_batch(self, event: Event, batch: list[Listener]):
+        """
+        Run a batch of concurrent handlers and wait for them all to finish
+
+        Plain function handlers can't run alongside others, so they are called first,
+        in order, before any ``async`` handlers in the batch start - even those which
+        were registered before them. If one of them stops the event, the ``async``
+        handlers in the batch are not started.
+        """
+        if event.stopped:
+            return
+
+        handlers: list[AsyncHandlerType] = []
+        for listener in batch:
+            if not listener.classes:
+                continue
+            if listener.sync:
+                result = listener.handler(event)
+                if inspect.isawaitable(result):
+                    await result
+                if event.stopped:
+                    return
+            else:
+                handlers.append(listener.call)
+
+        if not handlers:
+            return
+
+        if len(handlers) == 1:
+            await handlers[0](event)
+
+        elif TaskGroup is None:
+            await asyncio.gather(*(handler(event) for handler in handlers))
 
-            # Pass to the handler
-            await handler(event)
+        else:
+            async with TaskGroup() as group:
+                for handler in handlers:
+                    group.create_task(handler(event))  # type: ignore
@@ -1,4 +1,5 @@
 import asyncio
+import json
 import logging
 import sys
 from os import getenv
@@ -12,19 +13,46 @@ class Whitelist(logging.Filter):
         return any(f.filter(record) for f in self.whitelist)
 
 
+class JsonFormatter(logging.Formatter):
+    """
+    Format log records as one JSON object per line
+
+    Event records also include the name of the event class
+    """
+
+    def format(self, record):
+        data = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        event_class = getattr(record, "event_class", None)
+        if event_class is not None:
+            data["event"] = event_class
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data)
+
+
 def configure():
     """
     Configure logging
 
     Pick up the log level from the env var LOGLEVEL, otherwise default to INFO
+
+    Set the env var LOGFORMAT=json to log structured records as JSON
     """
     # TODO: Simple configuration of what to log and where to log it to
     level_name = getenv("LOGLEVEL", "INFO")
     level = getattr(logging, level_name)
     logging.basicConfig(stream=sys.stdout, filemode="w", level=level)
 
+    json_format = getenv("LOGFORMAT", "").lower() == "json"
     for handler in logging.root.handlers:
         handler.addFilter(Whitelist("mara", "tests"))
+        if json_format:
+            handler.setFormatter(JsonFormatter())
 
 
 def get_tasks(loop):
@@ -0,0 +1,157 @@
+"""
+Event loop backends
+"""
+from __future__ import annotations
+
+import asyncio
+import selectors
+from typing import Any, Callable, Coroutine
+
+
+LoopFactoryType = Callable[[], asyncio.AbstractEventLoop]
+
+
+def asyncio_loop() -> asyncio.AbstractEventLoop:
+    """
+    Create a standard asyncio event loop
+    """
+    return asyncio.new_event_loop()
+
+
+def uvloop_loop() -> asyncio.AbstractEventLoop:
+    """
+    Create a uvloop event loop
+
+    Requires ``uvloop`` to be installed
+    """
+    try:
+        import uvloop
+    except ImportError as e:
+        raise ImportError("uvloop is not installed - pip install mara[uvloop]") from e
+    return uvloop.new_event_loop()
+
+
+def default_loop() -> asyncio.AbstractEventLoop:
+    """
+    Create a uvloop event loop if uvloop is installed, otherwise an asyncio loop
+    """
+    try:
+        return uvloop_loop()
+    except ImportError:
+        return asyncio_loop()
+
+
+class _VirtualSelector(selectors.DefaultSelector):
+    """
+    Selector which checks for I/O without waiting, and moves the loop's virtual time
+    forward instead of waiting for the next timer
+    """
+
+    def __init__(self, loop: VirtualTimeLoop):
+        super().__init__()
+        self._loop = loop
+
+    def select(self, timeout: float | None = None):
+        events = super().select(0)
+        if events or timeout == 0:
+            return events
+        if timeout is None:
+            # Nothing is scheduled, so only I/O can wake the loop
+            return super().select(None)
+        self._loop.advance(timeout)
+        return []
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """
+    Event loop with a virtual clock, for tests and simulations
+
+    Whenever the loop has nothing ready to run, its clock jumps straight to the next
+    scheduled callback, so sleeps and timers finish instantly in real time while
+    everything still happens in the same order. An hour of timers runs in
+    milliseconds, and gives the same result every time.
+
+    I/O is still checked on each pass, but time does not wait for it.
+    """
+
+    _virtual_time: float
+
+    def __init__(self, start: float = 0):
+        self._virtual_time = start
+        super().__init__(selector=_VirtualSelector(self))
+
+    def time(self) -> float:
+        return self._virtual_time
+
+    def advance(self, seconds: float):
+        """
+        Move the clock forward, to simulate work taking time
+        """
+        if seconds > 0:
+            self._virtual_time += seconds
+
+
+def virtual_loop() -> asyncio.AbstractEventLoop:
+    """
+    Create a ``VirtualTimeLoop``
+    """
+    return VirtualTimeLoop()
+
+
+#: Loop factories by name
+LOOP_FACTORIES: dict[str, LoopFactoryType] = {
+    "asyncio": asyncio_loop,
+    "uvloop": uvloop_loop,
+    "default": default_loop,
+}
+
+
+def new_loop(
+    loop_factory: LoopFactoryType | None = None, eager_tasks: bool = True
+) -> asyncio.AbstractEventLoop:
+    """
+    Create and configure a new event loop
+
+    If ``eager_tasks`` is set and the Python version supports it (3.12 or later), new
+    tasks start running immediately, so short tasks can finish without being scheduled
+    on the loop.
+    """
+    loop = (loop_factory or default_loop)()
+    eager_task_factory = getattr(asyncio, "eager_task_factory", None)
+    if eager_tasks and eager_task_factory is not None:
+        loop.set_task_factory(eager_task_factory)
+    return loop
+
+
+def run(
+    coro: Coroutine[Any, Any, Any],
+    loop_factory: LoopFactoryType | None = None,
+    eager_tasks: bool = True,
+) -> Any:
+    """
+    Run a coroutine in a new event loop, like ``asyncio.run``
+    """
+    loop = new_loop(loop_factory, eager_tasks)
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(coro)
+    finally:
+        try:
+            cancel_tasks(loop)
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(loop.shutdown_default_executor())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+
+def cancel_tasks(loop: asyncio.AbstractEventLoop):
+    """
+    Cancel all tasks left on the loop and wait for them to finish
+    """
+    tasks = asyncio.all_tasks(loop)
+    if not tasks:
+        return
+    for task in tasks:
+        task.cancel()
+    loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
@@ -0,0 +1,224 @@
+"""
+Restart an app without dropping connections
+
+The running app passes its listening sockets and the sockets of its socket clients to a
+new process over a Unix socket using ``SCM_RIGHTS``, along with each client's session
+and any input it had received but not handled. The new process rebuilds the servers and
+clients around the inherited sockets, and the old process stops.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import pickle
+import socket
+import subprocess
+import sys
+from typing import TYPE_CHECKING, Any, Callable
+
+from ..clients.socket import SocketMixin
+from ..events import PostRestart
+from ..servers.base import AbstractAsyncioServer
+from ..servers.socket import AbstractSocketServer
+from ..storage.base import store_classes
+
+
+if TYPE_CHECKING:
+    from .app import App
+
+
+logger = logging.getLogger("mara.app")
+
+#: Environment variable used to pass the restart socket to the new process
+RESTART_ENV = "MARA_RESTART_FD"
+
+#: Most file descriptors to send in one message
+FDS_PER_MESSAGE = 200
+
+# The manifest is sent with an 8 byte length header
+HEADER_SIZE = 8
+
+# Sent by the new process once it has received everything
+ACK = b"K"
+
+SpawnType = Callable[[socket.socket], Any]
+
+
+def spawn_process(sock: socket.socket):
+    """
+    Start a new process with the same command line, passing it the restart socket
+    """
+    fd = sock.fileno()
+    env = {**os.environ, RESTART_ENV: str(fd)}
+    subprocess.Popen(sys.orig_argv, env=env, pass_fds=[fd])
+    sock.close()
+
+
+async def hand_off(app: App, spawn: SpawnType | None = None, timeout: float = 10):
+    """
+    Pass the app's sockets and clients to a new process
+
+    The new process is started by calling ``spawn`` with the socket it should read the
+    handoff from. Clients which can't be passed on are closed.
+    """
+    loop = asyncio.get_running_loop()
+    manifest: dict[str, Any] = {"servers": [], "clients": []}
+    fds: list[int] = []
+    listeners: list[socket.socket] = []
+
+    # Stop accepting; new connections will wait in the backlog for the new process
+    for index, server in enumerate(app.servers):
+        if not isinstance(server, AbstractAsyncioServer):
+            continue
+        transport_socks = server.listening_sockets()
+        for transport_sock in transport_socks:
+            listener = socket.socket(fileno=os.dup(transport_sock.fileno()))
+            listeners.append(listener)
+            fds.append(listener.fileno())
+        manifest["servers"].append((index, len(transport_socks)))
+        server.stop()
+
+    # Stop clients reading, and let them finish writing. If this was called from a
+    # handler, the task running it is cancelled too, so the handoff must run in its own
+    # task - see ``App.restart()``
+    clients: list[SocketMixin] = []
+    for client in app.clients:
+        if not isinstance(client, SocketMixin):
+            await client.close()
+            continue
+        for task in (client.read_task, client.dispatch_task):
+            if task is not None:
+                task.cancel()
+        client._pause_reading()
+        clients.append(client)
+
+    for client in clients:
+        try:
+            await asyncio.wait_for(client.flush(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Client {client} did not flush before restart")
+
+        manifest["clients"].append(
+            {
+                "server": app.servers.index(client.server),
+                "session_class": type(client.session).__name__,
+                "session": await client.session.store(),
+                "unread": client._take_unread(),
+            }
+        )
+        fds.append(client.writer.get_extra_info("socket").fileno())
+
+    # Start the new process and send it everything
+    parent, child = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+    spawn = spawn or spawn_process
+    spawn(child)
+
+    parent.setblocking(False)
+    data = pickle.dumps(manifest, protocol=pickle.HIGHEST_PROTOCOL)
+    await loop.sock_sendall(parent, len(data).to_bytes(HEADER_SIZE, "big") + data)
+    for start in range(0, len(fds), FDS_PER_MESSAGE):
+        chunk = fds[start : start + FDS_PER_MESSAGE]
+        await loop.run_in_executor(None, _send_fds, parent, chunk)
+
+    ack = await asyncio.wait_for(loop.sock_recv(parent, 1), timeout)
+    parent.close()
+    if ack != ACK:
+        raise ValueError("New process did not acknowledge restart")
+
+    # The new process has its own copies now
+    for listener in listeners:
+        listener.close()
+    for client in clients:
+        client.connected = False
+        await client.server.disconnected(client)
+        if client.write_task is not None:
+            client.write_task.cancel()
+        client.writer.transport.abort()
+
+    logger.info(f"Handed {len(clients)} clients to new process")
+
+
+def _send_fds(sock: socket.socket, fds: list[int]):
+    sock.setblocking(True)
+    try:
+        socket.send_fds(sock, [b"F"], fds)
+    finally:
+        sock.setblocking(False)
+
+
+class Handoff:
+    """
+    Sockets and clients received from the old process
+    """
+
+    app: App
+    sock: socket.socket
+    clients: list[tuple[dict[str, Any], socket.socket]]
+
+    def __init__(self, app: App, fd: int):
+        self.app = app
+        self.sock = socket.socket(fileno=fd)
+        self.clients = []
+
+    def receive(self):
+        """
+        Receive the manifest and sockets, and assign listening sockets to the servers
+
+        Called before the servers are started.
+        """
+        sock = self.sock
+        sock.setblocking(True)
+        size = int.from_bytes(self._recv_exactly(HEADER_SIZE), "big")
+        manifest = pickle.loads(self._recv_exactly(size))
+
+        expected = sum(count for _, count in manifest["servers"]) + len(
+            manifest["clients"]
+        )
+        fds: list[int] = []
+        while len(fds) < expected:
+            _, chunk, _, _ = socket.recv_fds(sock, 1, FDS_PER_MESSAGE)
+            if not chunk:
+                raise ValueError("Restart socket closed before all sockets were sent")
+            fds.extend(chunk)
+        sock.sendall(ACK)
+        sock.close()
+
+        fd_iter = iter(fds)
+        for index, count in manifest["servers"]:
+            self.app.servers[index].sockets = [
+                socket.socket(fileno=next(fd_iter)) for _ in range(count)
+            ]
+        for state in manifest["clients"]:
+            self.clients.append((state, socket.socket(fileno=next(fd_iter))))
+
+    def _recv_exactly(self, size: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            chunk = self.sock.recv(size - len(data))
+            if not chunk:
+                raise ValueError("Restart socket closed before the manifest was sent")
+            data += chunk
+        return bytes(data)
+
+    async def restore(self):
+        """
+        Rebuild the clients, then trigger ``PostRestart``
+
+        Called once the app is running.
+        """
+        app = self.app
+        for state, sock in self.clients:
+            server = app.servers[state["server"]]
+            if not isinstance(server, AbstractSocketServer):
+                sock.close()
+                continue
+
+            client = await server.restore_client(sock, state["unread"])
+            session_class = store_classes[state["session_class"]]
+            client.session = await session_class.restore(state["session"])
+            await server.connected(client, restored=True)
+
+        logger.info(f"Restored {len(self.clients)} clients")
+        self.clients = []
+        await app.events.trigger(PostRestart(worker=app.worker))
@@ -0,0 +1,98 @@
+"""
+Registry of the app's running tasks
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Iterator
+
+from ..clients import AbstractClient
+from ..servers import AbstractServer
+from ..timers import AbstractTimer
+
+
+class TaskRegistry:
+    """
+    Running tasks, grouped by the object which owns them
+
+    Owners are servers, clients, timers, or ``None`` for tasks which belong to the app.
+    Tasks are removed when they finish.
+    """
+
+    _tasks: dict[Any, set[asyncio.Task]]
+
+    def __init__(self):
+        self._tasks = {}
+
+    def add(self, task: asyncio.Task, owner: Any = None):
+        if task.done():
+            return
+        tasks = self._tasks.get(owner)
+        if tasks is None:
+            tasks = self._tasks[owner] = set()
+        tasks.add(task)
+        task.add_done_callback(lambda task: self._discard(task, owner))
+
+    def _discard(self, task: asyncio.Task, owner: Any):
+        tasks = self._tasks.get(owner)
+        if tasks is None:
+            return
+        tasks.discard(task)
+        if not tasks:
+            del self._tasks[owner]
+
+    def of(self, owner: Any) -> list[asyncio.Task]:
+        """
+        Return the running tasks of an owner
+        """
+        return list(self._tasks.get(owner, ()))
+
+    def owners(self) -> list[Any]:
+        """
+        Return all owners with running tasks
+        """
+        return list(self._tasks)
+
+    def counts(self) -> dict[str, int]:
+        """
+        Count running tasks by the kind of owner - ``server``, ``client``, ``timer``,
+        or ``app``
+        """
+        counts: dict[str, int] = {}
+        for owner, tasks in self._tasks.items():
+            kind = owner_kind(owner)
+            counts[kind] = counts.get(kind, 0) + len(tasks)
+        return counts
+
+    def cancel(self, owner: Any = None, *, all: bool = False) -> list[asyncio.Task]:
+        """
+        Cancel the running tasks of an owner, or of all owners if ``all`` is set
+
+        Returns the cancelled tasks, so they can be awaited
+        """
+        tasks = list(self) if all else self.of(owner)
+        for task in tasks:
+            task.cancel()
+        return tasks
+
+    def __iter__(self) -> Iterator[asyncio.Task]:
+        for tasks in list(self._tasks.values()):
+            yield from list(tasks)
+
+    def __len__(self) -> int:
+        return sum(len(tasks) for tasks in self._tasks.values())
+
+
+def owner_kind(owner: Any) -> str:
+    """
+    Name the kind of a task owner
+    """
+    if owner is None:
+        return "app"
+    if isinstance(owner, AbstractClient):
+        return "client"
+    if isinstance(owner, AbstractServer):
+        return "server"
+    if isinstance(owner, AbstractTimer):
+        return "timer"
+    return type(owner).__name__.lower()
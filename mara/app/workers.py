@@ -0,0 +1,138 @@
+"""
+Run an app in several worker processes
+
+The supervisor forks the workers, which each run the app with their own event loop.
+Socket servers bind with ``SO_REUSEPORT`` so the kernel shares new connections between
+the workers.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import signal
+import time
+from typing import TYPE_CHECKING
+
+from ..bus import UnixBus
+from ..events import PostStop, PreStart
+
+
+if TYPE_CHECKING:
+    from .app import App
+
+
+logger = logging.getLogger("mara.app")
+
+#: Signals which the supervisor passes on to its workers
+FORWARD_SIGNALS = (signal.SIGINT, signal.SIGTERM, signal.SIGHUP)
+
+#: Signals which stop the supervisor and its workers. Other forwarded signals stop the
+#: workers, which are then restarted.
+STOP_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+
+class Supervisor:
+    """
+    Fork and monitor worker processes for an app
+
+    Workers which exit are restarted until the supervisor is stopped.
+    """
+
+    app: App
+    workers: int
+
+    #: Seconds to wait before restarting a worker which exited this soon after starting
+    restart_delay: float = 1
+
+    #: Worker pids, to worker number and start time
+    _pids: dict[int, tuple[int, float]]
+    _stopping: bool
+
+    def __init__(self, app: App, workers: int):
+        if not hasattr(os, "fork"):
+            raise ValueError("Workers are not supported on this platform")
+        if workers < 1:
+            raise ValueError("Must run at least one worker")
+        self.app = app
+        self.workers = workers
+        self._pids = {}
+        self._stopping = False
+
+    def run(self):
+        app = self.app
+        app.run_once(app.events.trigger(PreStart(master=True)))
+
+        for server in app.servers:
+            if hasattr(server, "reuse_port"):
+                server.reuse_port = True
+
+        if app.bus is None:
+            app.bus = UnixBus()
+        app.bus.start()
+
+        previous = {
+            sig: signal.signal(sig, self._handle_signal) for sig in FORWARD_SIGNALS
+        }
+        try:
+            for worker in range(self.workers):
+                self._start(worker)
+            self._monitor()
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+            app.bus.stop()
+
+        logger.info("All workers stopped")
+        app.run_once(app.events.trigger(PostStop(master=True)))
+
+    def _start(self, worker: int):
+        pid = os.fork()
+        if pid:
+            logger.info(f"Worker {worker} started with pid {pid}")
+            self._pids[pid] = (worker, time.monotonic())
+            return
+
+        # Worker process
+        for sig in FORWARD_SIGNALS:
+            signal.signal(sig, signal.SIG_DFL)
+        code = 0
+        try:
+            self.app.worker = worker
+            self.app.run()
+        except BaseException:
+            logger.exception(f"Worker {worker} failed")
+            code = 1
+        finally:
+            logging.shutdown()
+            os._exit(code)
+
+    def _monitor(self):
+        """
+        Wait for workers to exit, and restart them unless stopping
+        """
+        while self._pids:
+            try:
+                pid, status = os.waitpid(-1, 0)
+            except ChildProcessError:
+                break
+
+            if pid not in self._pids:
+                continue
+            worker, started = self._pids.pop(pid)
+            logger.info(f"Worker {worker} exited with status {status}")
+            if self._stopping:
+                continue
+
+            if time.monotonic() - started < self.restart_delay:
+                time.sleep(self.restart_delay)
+            if not self._stopping:
+                self._start(worker)
+
+    def _handle_signal(self, signum: int, frame):
+        if signum in STOP_SIGNALS:
+            self._stopping = True
+        for pid in list(self._pids):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
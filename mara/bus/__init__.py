@@ -0,0 +1,2 @@
+from .base import AbstractBus  # noqa
+from .unix import UnixBus  # noqa
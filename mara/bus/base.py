@@ -0,0 +1,130 @@
+"""
+Message bus between the worker processes of an app
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import pickle
+from typing import TYPE_CHECKING, Any
+
+
+if TYPE_CHECKING:
+    from ..app import App
+    from ..events import Event
+    from ..servers import AbstractServer
+
+
+logger = logging.getLogger("mara.bus")
+
+# Message types
+EVENT = 0
+GROUP = 1
+
+
+class AbstractBus:
+    """
+    Relay events and group writes to the app's other workers
+
+    Messages published during one iteration of the loop are sent together as a single
+    batch, serialised with ``pickle``. The transport is up to the subclass.
+    """
+
+    app: App | None
+    _pending: list[tuple]
+    _flush_handle: asyncio.Handle | None
+
+    def __init__(self):
+        self.app = None
+        self._pending = []
+        self._flush_handle = None
+
+    def start(self):
+        """
+        Start any services the bus needs
+
+        Called in the supervisor process before the workers are started.
+        """
+        pass
+
+    def stop(self):
+        """
+        Stop any services started by ``start()``
+
+        Called in the supervisor process after the workers have stopped.
+        """
+        pass
+
+    async def connect(self, app: App):
+        """
+        Connect a worker to the bus
+        """
+        self.app = app
+
+    async def close(self):
+        """
+        Send anything pending and disconnect the worker from the bus
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush()
+
+    def publish_event(self, event: Event):
+        """
+        Pass an event on to the other workers
+
+        The event is serialised straight away, before any local handlers have run, so
+        changes they make - such as ``event.stop()`` - are not passed on.
+        """
+        self._publish((EVENT, pickle.dumps(event, protocol=pickle.HIGHEST_PROTOCOL)))
+
+    def publish_group(
+        self, server: AbstractServer, name: str, data: Any, kwargs: dict[str, Any]
+    ):
+        """
+        Pass a group write on to the other workers
+        """
+        if self.app is None:
+            raise ValueError("Bus is not connected")
+        index = self.app.servers.index(server)
+        self._publish((GROUP, index, name, data, kwargs))
+
+    def _publish(self, message: tuple):
+        self._pending.append(message)
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_soon(self._flush)
+
+    def _flush(self):
+        self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            self.send(pickle.dumps(batch, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def send(self, data: bytes):
+        """
+        Send a serialised batch to the other workers
+        """
+        raise NotImplementedError()
+
+    def receive(self, data: bytes):
+        """
+        Handle a serialised batch from another worker
+        """
+        app = self.app
+        if app is None:
+            raise ValueError("Bus is not connected")
+
+        for message in pickle.loads(data):
+            kind = message[0]
+            if kind == EVENT:
+                event = pickle.loads(message[1])
+                event.relayed = True
+                app.create_task(app.events.trigger(event))
+
+            elif kind == GROUP:
+                _, index, name, data, kwargs = message
+                group = app.servers[index].groups[name]
+                group.write(data, relay=False, **kwargs)
+
+            else:
+                logger.warning(f"Unknown bus message type {kind}")
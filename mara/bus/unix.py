@@ -0,0 +1,157 @@
+"""
+Message bus using a broker process on a Unix domain socket
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import shutil
+import signal
+import tempfile
+from typing import TYPE_CHECKING
+
+from .base import AbstractBus
+
+
+if TYPE_CHECKING:
+    from ..app import App
+
+
+logger = logging.getLogger("mara.bus")
+
+# Batches are sent with a 4 byte length header
+HEADER_SIZE = 4
+
+# Sent by the broker once a worker is registered to receive batches
+READY = b"R"
+
+
+class UnixBus(AbstractBus):
+    """
+    Bus which sends batches through a broker process
+
+    The broker is forked by the supervisor, and passes each batch it receives from a
+    worker on to every other worker without decoding it. The socket is created in a
+    private temporary directory unless a ``path`` is given.
+    """
+
+    path: str | None
+    _tmpdir: str | None
+    _broker_pid: int | None
+    _writer: asyncio.StreamWriter | None
+    _read_task: asyncio.Task | None
+
+    def __init__(self, path: str | None = None):
+        super().__init__()
+        self.path = path
+        self._tmpdir = None
+        self._broker_pid = None
+        self._writer = None
+        self._read_task = None
+
+    def start(self):
+        if self.path is None:
+            self._tmpdir = tempfile.mkdtemp(prefix="mara-")
+            self.path = os.path.join(self._tmpdir, "bus.sock")
+
+        ready_read, ready_write = os.pipe()
+        pid = os.fork()
+        if pid:
+            # Wait for the broker to start listening
+            os.close(ready_write)
+            os.read(ready_read, 1)
+            os.close(ready_read)
+            self._broker_pid = pid
+            logger.info(f"Bus broker started with pid {pid}")
+            return
+
+        # Broker process - leave the supervisor to handle interrupts
+        os.close(ready_read)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        code = 0
+        try:
+            asyncio.run(run_broker(self.path, ready_write))
+        except BaseException:
+            logger.exception("Bus broker failed")
+            code = 1
+        finally:
+            os._exit(code)
+
+    def stop(self):
+        if self._broker_pid is not None:
+            try:
+                os.kill(self._broker_pid, signal.SIGTERM)
+                os.waitpid(self._broker_pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+            self._broker_pid = None
+
+        if self._tmpdir is not None:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            self._tmpdir = None
+
+    async def connect(self, app: App):
+        await super().connect(app)
+        if self.path is None:
+            raise ValueError("Bus has not been started")
+        reader, self._writer = await asyncio.open_unix_connection(self.path)
+
+        # Wait until the broker will pass on batches from other workers
+        if await reader.readexactly(len(READY)) != READY:
+            raise ValueError("Bus broker did not accept the connection")
+        self._read_task = app.create_task(self._read_loop(reader))
+
+    async def close(self):
+        await super().close()
+        if self._read_task is not None:
+            self._read_task.cancel()
+            self._read_task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def send(self, data: bytes):
+        if self._writer is None:
+            raise ValueError("Bus is not connected")
+        self._writer.writelines([len(data).to_bytes(HEADER_SIZE, "big"), data])
+
+    async def _read_loop(self, reader: asyncio.StreamReader):
+        try:
+            while True:
+                header = await reader.readexactly(HEADER_SIZE)
+                data = await reader.readexactly(int.from_bytes(header, "big"))
+                self.receive(data)
+        except asyncio.IncompleteReadError:
+            logger.warning("Bus broker closed the connection")
+
+
+async def run_broker(path: str, ready_fd: int):
+    """
+    Pass batches from each worker to all other workers
+    """
+    peers: set[asyncio.StreamWriter] = set()
+
+    async def relay(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        peers.add(writer)
+        writer.write(READY)
+        try:
+            while True:
+                header = await reader.readexactly(HEADER_SIZE)
+                data = await reader.readexactly(int.from_bytes(header, "big"))
+                for peer in peers:
+                    if peer is not writer:
+                        peer.writelines([header, data])
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            peers.discard(writer)
+            writer.close()
+
+    server = await asyncio.start_unix_server(relay, path)
+    os.write(ready_fd, b"1")
+    os.close(ready_fd)
+    async with server:
+        await server.serve_forever()
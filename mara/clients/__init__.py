@@ -1 +1,2 @@
-from .base import AbstractClient  # noqa
+from .base import AbstractClient, OverflowPolicy  # noqa
+from .registry import ClientRegistry  # noqa
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
 import logging
-from typing import TYPE_CHECKING, Generic, TypeVar
+from enum import Enum, auto
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
 
-from ..events import Connect, Disconnect, Receive
+from ..events import Connect, Disconnect, Receive, WriteOverflow
 from ..storage.dict import DictStore
 
 
@@ -16,39 +18,294 @@ ContentType = TypeVar("ContentType")
 
 logger = logging.getLogger("mara.client")
 
+# Marks the end of the inbound queue
+_EOF = object()
+
+# Source of client ids
+_ids = itertools.count(1)
+
+
+class OverflowPolicy(Enum):
+    """
+    What to do when a client's outbound queue reaches the server's limit
+    """
+
+    #: Drop the oldest queued data to make room
+    DROP_OLDEST = auto()
+
+    #: Drop the data being written
+    DROP_NEWEST = auto()
+
+    #: Disconnect the client
+    DISCONNECT = auto()
+
 
 class AbstractClient(Generic[ContentType]):
+    __slots__ = (
+        "id",
+        "server",
+        "connected",
+        "read_task",
+        "write_task",
+        "dispatch_task",
+        "inbound_queue",
+        "write_queue_bytes",
+        "write_queue_high_water",
+        "write_queue_high_water_bytes",
+        "write_queue_dropped",
+        "_overflowing",
+        "_write_queue",
+        "_session",
+    )
+
+    #: Unique id for this client
+    id: int
+
     server: AbstractServer
     connected: bool
     read_task: asyncio.Task
-    write_task: asyncio.Task
-    write_queue: asyncio.Queue
-    session: DictStore
+    write_task: asyncio.Task | None
+    dispatch_task: asyncio.Task | None
+    inbound_queue: asyncio.Queue | None
+
+    #: Size of the data in the outbound queue - bytes, or characters for text clients
+    write_queue_bytes: int
+
+    #: Most messages and most data there have been in the outbound queue
+    write_queue_high_water: int
+    write_queue_high_water_bytes: int
+
+    #: Number of outbound messages dropped because the queue was full
+    write_queue_dropped: int
+
+    #: Whether the queue has overflowed since it was last empty
+    _overflowing: bool
+
+    # Created on first use
+    _write_queue: asyncio.Queue | None
+    _session: DictStore | None
 
     def __init__(self, server: AbstractServer):
+        self.id = next(_ids)
         self.server = server
         self.connected = True
-        self.session = DictStore()
-        # TODO: Queue(maxsize=?) - configure from server
-        self.write_queue = asyncio.Queue()
+        self.write_task = None
+        self.dispatch_task = None
+        self._session = None
+
+        # Limits are enforced by write(), so the queue itself is unbounded
+        self._write_queue = None
+        self.write_queue_bytes = 0
+        self.write_queue_high_water = 0
+        self.write_queue_high_water_bytes = 0
+        self.write_queue_dropped = 0
+        self._overflowing = False
+
+        # Inbound queue is only used if the server asks for one
+        self.inbound_queue = None
+        if server.inbound_queue_size:
+            self.inbound_queue = asyncio.Queue(maxsize=server.inbound_queue_size)
 
     def __str__(self):
         return "unknown"
 
+    @property
+    def peername(self) -> Any:
+        """
+        Address of the remote end of the connection, if known
+        """
+        return None
+
+    @property
+    def session(self) -> DictStore:
+        if self._session is None:
+            self._session = DictStore()
+        return self._session
+
+    @session.setter
+    def session(self, session: DictStore):
+        self._session = session
+
+    @property
+    def write_queue(self) -> asyncio.Queue:
+        """
+        Outbound queue
+        """
+        if self._write_queue is None:
+            self._write_queue = asyncio.Queue()
+        return self._write_queue
+
     async def read(self) -> ContentType:
+        """
+        Read the next input from the client
+
+        If the server has an inbound queue this will take the next item from the queue,
+        otherwise it will read from the connection.
+        """
+        if self.inbound_queue is None:
+            return await self._read()
+
+        data = await self.inbound_queue.get()
+        if data is _EOF:
+            # Leave the marker for the dispatch loop, and let the connection return
+            # whatever it returns once closed
+            self.inbound_queue.put_nowait(_EOF)
+            return await self._read()
+        return data
+
+    async def _read(self) -> ContentType:
+        """
+        Read from the connection
+        """
         raise NotImplementedError()
 
+    def _pause_reading(self):
+        """
+        Stop reading from the connection until ``_resume_reading`` is called
+        """
+        pass
+
+    def _resume_reading(self):
+        pass
+
+    @classmethod
+    def encode(cls, data: ContentType) -> Any:
+        """
+        Convert data passed to ``write()`` into the form held in the outbound queue
+
+        Used by ``AbstractServer.broadcast`` so that data is only encoded once for all
+        clients of the same class. Subclasses which override ``write()`` with extra
+        arguments should accept the same arguments here.
+        """
+        return data
+
     def write(self, data: ContentType):
         """
         Write to the outbound queue
         """
-        self.write_queue.put_nowait(data)
+        self._enqueue(self.encode(data))
+
+    def _enqueue(self, data: Any) -> bool:
+        """
+        Add encoded data to the outbound queue, applying the server's limits
+
+        If the server uses lean clients and nothing is waiting to be sent, the data is
+        written straight to the connection if it can take it.
+
+        Returns False if the data was not queued or written
+        """
+        if not self.connected:
+            return False
+
+        start_writing = False
+        if self.write_task is None and self.server.lean_clients:
+            if self._write_nowait(data):
+                return True
+            start_writing = True
+
+        size = len(data)
+        if self._is_over_limit(size) and not self._overflow(size):
+            return False
+
+        queue = self.write_queue
+        queue.put_nowait(data)
+        self.write_queue_bytes += size
+
+        if queue.qsize() > self.write_queue_high_water:
+            self.write_queue_high_water = queue.qsize()
+        if self.write_queue_bytes > self.write_queue_high_water_bytes:
+            self.write_queue_high_water_bytes = self.write_queue_bytes
+
+        if start_writing:
+            # Start the write task once the data is queued; with eager tasks it runs
+            # straight away, and may already have finished
+            task = self.server.app.create_task(self._write_loop(), owner=self)
+            if not task.done():
+                self.write_task = task
+        return True
+
+    def _is_over_limit(self, size: int) -> bool:
+        """
+        Check if adding data of this size would take the queue over the server's limits
+        """
+        max_messages = self.server.write_queue_max_messages
+        if max_messages is not None and self.write_queue.qsize() >= max_messages:
+            return True
+
+        max_bytes = self.server.write_queue_max_bytes
+        if max_bytes is not None and self.write_queue_bytes + size > max_bytes:
+            return True
+
+        return False
+
+    def _overflow(self, size: int) -> bool:
+        """
+        Apply the server's overflow policy to make room for data of this size
+
+        Returns True if the new data should still be queued
+        """
+        policy = self.server.write_queue_policy
+        self._notify_overflow(policy)
+
+        if policy == OverflowPolicy.DROP_OLDEST:
+            # Drop until there's room. If the data is larger than the limit by itself,
+            # it will be sent once the queue is empty.
+            queue = self.write_queue
+            while not queue.empty() and self._is_over_limit(size):
+                dropped = queue.get_nowait()
+                queue.task_done()
+                self.write_queue_bytes -= len(dropped)
+                self.write_queue_dropped += 1
+            return True
+
+        self.write_queue_dropped += 1
+        if policy == OverflowPolicy.DISCONNECT and self.connected:
+            logger.info(f"Client {self} outbound queue full, disconnecting")
+            self.connected = False
+            self.server.app.create_task(self.close(), owner=self)
+        return False
+
+    def _notify_overflow(self, policy: OverflowPolicy):
+        """
+        Trigger a WriteOverflow event when the queue starts to overflow
+        """
+        if self._overflowing:
+            return
+        self._overflowing = True
+        logger.warning(f"Client {self} outbound queue full, applying {policy.name}")
+        app = self.server.app
+        app.create_task(app.events.trigger(WriteOverflow(self, policy)), owner=self)
+
+    def _take_unread(self) -> bytes:
+        """
+        Remove and return input which has been received but not handled, encoded as it
+        was received, so that it can be passed to a new process on restart
+
+        The client's read tasks must have been stopped.
+        """
+        unread = []
+        queue = self.inbound_queue
+        if queue is not None:
+            while not queue.empty():
+                data = queue.get_nowait()
+                if data is not _EOF:
+                    unread.append(self.encode(data))
+        return b"".join(unread)
 
     async def flush(self):
         """
         Wait for all outbound data to be sent
         """
-        await self.write_queue.join()
+        if self._write_queue is not None:
+            await self._write_queue.join()
+
+    def _write_nowait(self, data: ContentType) -> bool:
+        """
+        Write to the connection without waiting, if it can take more data
+
+        Used by lean clients. Returns False if the data should be queued instead.
+        """
+        return False
 
     async def _write(self, data: ContentType):
         """
@@ -56,31 +313,162 @@ class AbstractClient(Generic[ContentType]):
         """
         raise NotImplementedError()
 
+    async def _write_batch(self, batch: list[ContentType]):
+        """
+        Write several items to the connection
+
+        Subclasses should override this to send the batch with a single write and drain.
+        """
+        for data in batch:
+            await self._write(data)
+
     async def close(self):
         logger.info(f"Client {self} closed")
+        self.connected = False
+
+        # Stop the write loop, unless it is closing the client itself
+        write_task = self.write_task
+        if write_task is not None and write_task is not asyncio.current_task():
+            write_task.cancel()
+
         await self.server.disconnected(self)
 
-    def run(self):
+    def run(self, restored: bool = False):
         """
         Add the client read and write tasks to the app's loop
+
+        Lean clients start their write task when they need to queue data.
+
+        If the client has been restored from another process after a restart, it will
+        not trigger a ``Connect`` event.
+        """
+        app = self.server.app
+        if self.inbound_queue is None:
+            self.read_task = app.create_task(self._read_loop(restored), owner=self)
+        else:
+            self.read_task = app.create_task(self._queue_loop(), owner=self)
+            self.dispatch_task = app.create_task(
+                self._dispatch_loop(restored), owner=self
+            )
+        if not self.server.lean_clients:
+            self.write_task = app.create_task(self._write_loop(), owner=self)
+
+    async def _read_loop(self, restored: bool = False):
         """
-        self.read_task = self.server.app.create_task(self._read_loop())
-        self.write_task = self.server.app.create_task(self._write_loop())
+        Read from the connection and handle the events inline
 
-    async def _read_loop(self):
+        Reading is suspended while a handler is running.
+        """
         app = self.server.app
-        await app.events.trigger(Connect(self))
-        logger.info(f"Client {self} connected")
+        await self._connect(restored)
         while self.connected:
             data: ContentType = await self.read()
             if data:
-                await app.events.trigger(Receive(self, data))
+                await self._receive(data)
+
+        logger.info(f"Client {self} disconnected")
+        await app.events.trigger(Disconnect(self))
+        await self._close_disconnected()
+
+    async def _receive(self, data: ContentType):
+        """
+        Handle input now, or hold it for the server's tick
+        """
+        tick = self.server.tick
+        if tick is None:
+            await self.server.app.events.trigger(Receive(self, data))
+        else:
+            await tick.receive(self, data)
+
+    async def _connect(self, restored: bool):
+        """
+        Announce the new client, unless it was restored after a restart
+        """
+        if restored:
+            logger.info(f"Client {self} restored")
+            return
+        await self.server.app.events.trigger(Connect(self))
+        logger.info(f"Client {self} connected")
+
+    async def _close_disconnected(self):
+        """
+        Close the client after it has disconnected, unless a handler already has
+        """
+        if self in self.server.clients:
+            await self.close()
+
+    async def _queue_loop(self):
+        """
+        Read from the connection into the inbound queue
+
+        When the queue is full, pause the connection until there is space again.
+        """
+        queue = self.inbound_queue
+        if queue is None:
+            raise ValueError("Client does not have an inbound queue")
+
+        while self.connected:
+            data: ContentType = await self._read()
+            if queue.full():
+                self._pause_reading()
+                await queue.put(data)
+                self._resume_reading()
+            else:
+                queue.put_nowait(data)
+
+        await queue.put(_EOF)
+
+    async def _dispatch_loop(self, restored: bool = False):
+        """
+        Handle events for data in the inbound queue
+        """
+        queue = self.inbound_queue
+        if queue is None:
+            raise ValueError("Client does not have an inbound queue")
+
+        app = self.server.app
+        await self._connect(restored)
+        while True:
+            data = await queue.get()
+            if data is _EOF:
+                break
+            if data:
+                await self._receive(data)
 
         logger.info(f"Client {self} disconnected")
         await app.events.trigger(Disconnect(self))
+        await self._close_disconnected()
 
     async def _write_loop(self):
+        """
+        Send everything in the outbound queue as a batch
+
+        For lean clients, this stops once the queue is empty so that later writes can
+        go straight to the connection.
+        """
+        queue = self.write_queue
+        lean = self.server.lean_clients
         while self.connected:
-            data: ContentType = await self.write_queue.get()
-            await self._write(data)
-            self.write_queue.task_done()
+            if lean and queue.empty():
+                break
+
+            batch: list[ContentType] = [await queue.get()]
+
+            # Let more writes arrive before sending, to make fewer larger writes
+            window = self.server.write_flush_window
+            if window:
+                await asyncio.sleep(window)
+
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            self.write_queue_bytes -= sum(len(data) for data in batch)  # type: ignore
+            self._overflowing = False
+
+            try:
+                await self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+        if lean:
+            self.write_task = None
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Iterator
+
+
+if TYPE_CHECKING:
+    from .base import AbstractClient
+
+
+class ClientRegistry:
+    """
+    Connected clients, in the order they connected
+
+    Clients can be added, removed and found by id or peer address in constant time.
+
+    Iterating over the registry iterates over a snapshot, so it is safe for clients to
+    connect and disconnect during a loop. The snapshot is reused until the registry
+    next changes.
+    """
+
+    _clients: dict[int, AbstractClient]
+    _peers: dict[int, Any]
+    _by_peer: dict[Any, AbstractClient]
+    _snapshot: tuple[AbstractClient, ...] | None
+
+    def __init__(self):
+        self._clients = {}
+        self._peers = {}
+        self._by_peer = {}
+        self._snapshot = None
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def __bool__(self) -> bool:
+        return bool(self._clients)
+
+    def __contains__(self, client: AbstractClient) -> bool:
+        return self._clients.get(client.id) is client
+
+    def __iter__(self) -> Iterator[AbstractClient]:
+        if self._snapshot is None:
+            self._snapshot = tuple(self._clients.values())
+        return iter(self._snapshot)
+
+    def add(self, client: AbstractClient):
+        self._clients[client.id] = client
+        self._snapshot = None
+
+        # Store the peer, it may not be available once the connection closes
+        peer = client.peername
+        if peer is not None:
+            self._peers[client.id] = peer
+            self._by_peer[peer] = client
+
+    def discard(self, client: AbstractClient):
+        """
+        Remove a client, if it is registered
+        """
+        if self._clients.pop(client.id, None) is None:
+            return
+        self._snapshot = None
+
+        peer = self._peers.pop(client.id, None)
+        if peer is not None and self._by_peer.get(peer) is client:
+            del self._by_peer[peer]
+
+    def get(self, client_id: int) -> AbstractClient | None:
+        return self._clients.get(client_id)
+
+    def get_by_peer(self, peer: Any) -> AbstractClient | None:
+        """
+        Find a client by the peer address of its connection
+        """
+        return self._by_peer.get(peer)
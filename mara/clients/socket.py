@@ -1,13 +1,19 @@
 from __future__ import annotations
 
 import asyncio
-from typing import TYPE_CHECKING, Protocol
+from typing import TYPE_CHECKING, Any, Protocol
 
+from ..servers.protocol import ProtocolReader
 from .base import AbstractClient
 
 
 if TYPE_CHECKING:
     from ..servers import AbstractServer
+    from ..servers.protocol import ProtocolWriter
+    from ..servers.socket import AbstractSocketServer
+
+    ReaderType = asyncio.StreamReader | ProtocolReader
+    WriterType = asyncio.StreamWriter | ProtocolWriter
 
 
 class ClientCanStream(Protocol):
@@ -27,34 +33,79 @@ class ClientCanStream(Protocol):
 class SocketMixin(AbstractClient):
     """
     Mixin for any client class which uses byte sockets
+
+    The reader and writer will be asyncio streams, or the equivalent objects from
+    ``BufferedSocketProtocol``.
     """
 
-    reader: asyncio.StreamReader
-    writer: asyncio.StreamWriter
+    __slots__ = ("reader", "writer")
+
+    server: AbstractSocketServer
+    reader: ReaderType
+    writer: WriterType
+
+    #: Delimiter used to split input into frames, or None to read raw bytes
+    delimiter: bytes | None = None
 
     def __init__(
         self,
-        server: AbstractServer,
-        reader: asyncio.StreamReader,
-        writer: asyncio.StreamWriter,
+        server: AbstractSocketServer,
+        reader: ReaderType,
+        writer: WriterType,
     ):
         super().__init__(server)
         self.reader = reader
         self.writer = writer
 
     def __str__(self) -> str:
-        ip, port = self.writer.get_extra_info("peername")
+        ip, port = self.peername
         return str(ip)
 
+    @property
+    def peername(self) -> Any:
+        return self.writer.get_extra_info("peername")
+
     async def _write(self, data: bytes):
         self.writer.write(data)
         await self.writer.drain()
         self._check_is_active()
 
+    def _write_nowait(self, data: bytes) -> bool:
+        transport = self.writer.transport
+        if transport.is_closing():
+            return False
+        low, high = transport.get_write_buffer_limits()
+        if transport.get_write_buffer_size() >= high:
+            return False
+        self.writer.write(data)
+        return True
+
+    async def _write_batch(self, batch: list[bytes]):
+        self.writer.writelines(batch)
+        await self.writer.drain()
+        self._check_is_active()
+
     def _check_is_active(self):
         if self.reader.at_eof() or self.writer.transport.is_closing():
             self.connected = False
 
+    def _take_unread(self) -> bytes:
+        unread = super()._take_unread()
+        reader = self.reader
+        if isinstance(reader, ProtocolReader):
+            return unread + reader.protocol.take_unread()
+
+        # Streams have no public API to take buffered data
+        buffered = bytes(reader._buffer)  # type: ignore
+        reader._buffer.clear()  # type: ignore
+        return unread + buffered
+
+    def _pause_reading(self):
+        self.writer.transport.pause_reading()
+
+    def _resume_reading(self):
+        self.writer.transport.resume_reading()
+
     async def close(self):
         # Close the streams
         self.writer.close()
@@ -72,9 +123,10 @@ class SocketClient(SocketMixin, AbstractClient[bytes]):
     Read and write bytes
     """
 
-    async def read(self) -> bytes:
-        # TODO: read size and buffers
-        data = await self.reader.read(1024)
+    __slots__ = ()
+
+    async def _read(self) -> bytes:
+        data = await self.reader.read(self.server.read_size)
         self._check_is_active()
         return data
 
@@ -84,18 +136,28 @@ class TextClient(SocketMixin, AbstractClient[str]):
     Read and write unicode over an underlying byte socket
     """
 
-    async def read(self) -> str:
-        # TODO: read size and buffers
+    __slots__ = ()
+
+    delimiter: bytes = b"\r\n"
+
+    async def _read(self) -> str:
+        reader = self.reader
         try:
-            data: bytes = await self.reader.readuntil(b"\r\n")
+            if isinstance(reader, ProtocolReader):
+                data: bytes = await reader.readframe()
+            else:
+                data = await reader.readuntil(self.delimiter)
+                data = data.rstrip(self.delimiter)
         except asyncio.exceptions.IncompleteReadError:
             self.connected = False
             return ""
-        data = data.rstrip(b"\r\n")
         self._check_is_active()
         text: str = data.decode()
         return text
 
+    @classmethod
+    def encode(cls, data: str, *, end: str = "\r\n") -> bytes:
+        return f"{data}{end}".encode()
+
     def write(self, data: str, *, end: str = "\r\n"):
-        raw_data: bytes = f"{data}{end}".encode()
-        super().write(raw_data)
+        self._enqueue(self.encode(data, end=end))
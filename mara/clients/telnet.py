@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from telnetlib3 import TelnetReader, TelnetWriter
 
@@ -12,9 +12,11 @@ if TYPE_CHECKING:
 
 
 class TelnetClient(AbstractClient[str]):
+    __slots__ = ("reader", "writer", "_str")
+
     reader: TelnetReader
     writer: TelnetWriter
-    _str: str | None = None
+    _str: str | None
 
     def __init__(
         self,
@@ -30,20 +32,34 @@ class TelnetClient(AbstractClient[str]):
     def __str__(self) -> str:
         # Cache value, it won't be available after connection closes
         if not self._str:
-            ip, port = self.writer.get_extra_info("peername")
+            ip, port = self.peername
             self._str = str(ip)
         return self._str
 
+    @property
+    def peername(self) -> Any:
+        return self.writer.get_extra_info("peername")
+
     async def _write(self, data: str):
         # TODO: says it takes bytes but needs str
         self.writer.write(data)  # type: ignore
         await self.writer.drain()
         self._check_is_active()
 
+    async def _write_batch(self, batch: list[str]):
+        # Join so telnetlib3 escapes and sends the batch as one write
+        await self._write("".join(batch))
+
     def _check_is_active(self):
         if self.reader.at_eof() or self.writer.transport.is_closing():
             self.connected = False
 
+    def _pause_reading(self):
+        self.writer.transport.pause_reading()
+
+    def _resume_reading(self):
+        self.writer.transport.resume_reading()
+
     async def close(self):
         # Close the streams
         self.writer.close()
@@ -59,13 +75,16 @@ class TelnetClient(AbstractClient[str]):
 
         await super().close()
 
-    async def read(self) -> str:
+    async def _read(self) -> str:
         # TODO: read size and buffers
         data = await self.reader.readline()
         data = data.rstrip("\r\n")
         self._check_is_active()
         return data
 
+    @classmethod
+    def encode(cls, data: str, *, end: str = "\r\n") -> str:
+        return f"{data}{end}"
+
     def write(self, data: str, *, end: str = "\r\n"):
-        data = f"{data}{end}"
-        super().write(data)
+        self._enqueue(self.encode(data, end=end))
@@ -10,5 +10,6 @@ from .app import (  # noqa
     PreStop,
 )
 from .base import Event  # noqa
-from .client import Client, Connect, Disconnect, Receive  # noqa
+from .client import Client, Connect, Disconnect, Receive, WriteOverflow  # noqa
 from .server import ListenStart, ListenStop, Server, Suspend  # noqa
+from .timer import TickOverrun, Timer  # noqa
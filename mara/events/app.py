@@ -20,26 +20,51 @@ __all__ = [
 class App(Event):
     "Service event"
 
+    __slots__ = ("worker", "master")
+
+    #: Number of the worker process, or ``None`` if the app isn't running workers
+    worker: int | None
+
+    #: ``True`` if the event is from the supervisor process of an app with workers
+    master: bool
+
+    def __init__(self, worker: int | None = None, master: bool = False):
+        super().__init__()
+        self.worker = worker
+        self.master = master
+
 
 class PreStart(App):
     "Service starting"
 
+    __slots__ = ()
+
 
 class PostStart(App):
     "Service started"
 
+    __slots__ = ()
+
 
 class PreStop(App):
     "Service stopping"
 
+    __slots__ = ()
+
 
 class PostStop(App):
     "Service stopped"
 
+    __slots__ = ()
+
 
 class PreRestart(App):
     "Service restarting"
 
+    __slots__ = ()
+
 
 class PostRestart(App):
     "Service restarted"
+
+    __slots__ = ()
@@ -3,6 +3,7 @@ Mara events
 """
 from __future__ import annotations
 
+import logging
 from typing import TYPE_CHECKING
 
 
@@ -15,9 +16,51 @@ class Event(object):
     Non-specific event
 
     All events are derived from this class.
+
+    Events are slotted to keep them small and quick to create. Subclasses should define
+    ``__slots__`` for their own attributes; handlers can still add attributes to events,
+    but the instance ``__dict__`` will only be created when they do.
     """
 
+    __slots__ = ("app", "stopped", "__dict__")
+
     app: App | None
+    stopped: bool
+
+    #: Label for logging, set from the class's ``hint`` or docstring when it is defined
+    _label: str = ""
+
+    #: Default for whether handlers run alongside each other; handlers can override
+    #: this with ``app.listen(..., concurrent=True|False)``
+    concurrent: bool = False
+
+    #: Level to log this event at
+    log_level: int = logging.INFO
+
+    #: Proportion of these events to log, between 0 and 1
+    log_sample_rate: float = 1
+
+    #: Pass these events on to the app's other workers, if it has a bus. Relayed events
+    #: must be picklable, apart from their ``app``.
+    relay: bool = False
+
+    #: Whether this event was received from another worker
+    relayed: bool = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._label = cls._build_label()
+
+    @classmethod
+    def _build_label(cls) -> str:
+        """
+        Build the label used by ``__str__`` from the first line of the class's ``hint``
+        attribute or docstring
+        """
+        hint = getattr(cls, "hint", cls.__doc__) or ""
+        lines = hint.strip().splitlines()
+        label = lines[0] if lines else ""
+        return f"[{cls.__name__}]: {label}"
 
     def __init__(self):
         self.stopped = False
@@ -31,10 +74,26 @@ class Event(object):
         """
         self.stopped = True
 
+    def __getstate__(self) -> dict:
+        # The app is local to each process, so isn't pickled
+        state = {}
+        for cls in type(self).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                if name not in ("app", "__dict__") and hasattr(self, name):
+                    state[name] = getattr(self, name)
+        state.update(getattr(self, "__dict__", {}))
+        return state
+
+    def __setstate__(self, state: dict):
+        self.app = None
+        for name, value in state.items():
+            setattr(self, name, value)
+
     def __str__(self):
         """
         Return this event as a string
         """
-        label = getattr(self.__class__, "hint", self.__class__.__doc__ or "")
-        label = (label.strip().splitlines()[0],)
-        return f"[{self.__class__.__name__}]: {label}"
+        return self._label
+
+
+Event._label = Event._build_label()
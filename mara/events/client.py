@@ -6,12 +6,14 @@ from __future__ import annotations
 from .base import Event
 
 
-__all__ = ["Client", "Connect", "Receive", "Disconnect"]
+__all__ = ["Client", "Connect", "Receive", "Disconnect", "WriteOverflow"]
 
 
 class Client(Event):
     "Client event"
 
+    __slots__ = ("client",)
+
     def __init__(self, client):
         super(Client, self).__init__()
         self.client = client
@@ -24,14 +26,20 @@ class Client(Event):
 class Connect(Client):
     "Client connected"
 
+    __slots__ = ()
+
 
 class Disconnect(Client):
     "Client disconnected"
 
+    __slots__ = ()
+
 
 class Receive(Client):
     "Data received"
 
+    __slots__ = ("data",)
+
     def __init__(self, client, data):
         super(Receive, self).__init__(client)
         self.data = data
@@ -39,3 +47,17 @@ class Receive(Client):
     def __str__(self):
         msg = super(Receive, self).__str__().strip()
         return f"{msg}: {self.data}"
+
+
+class WriteOverflow(Client):
+    "Client outbound queue full"
+
+    __slots__ = ("policy",)
+
+    def __init__(self, client, policy):
+        super(WriteOverflow, self).__init__(client)
+        self.policy = policy
+
+    def __str__(self):
+        msg = super(WriteOverflow, self).__str__().strip()
+        return f"{msg}: {self.policy.name}"
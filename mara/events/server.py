@@ -17,9 +17,13 @@ if TYPE_CHECKING:
 
 class Server(Event):
     "Server event"
+
+    __slots__ = ("server",)
+
     server: AbstractServer
 
     def __init__(self, server: AbstractServer):
+        super().__init__()
         self.server = server
 
     def __str__(self) -> str:
@@ -29,10 +33,16 @@ class Server(Event):
 class ListenStart(Server):
     "Server listening"
 
+    __slots__ = ()
+
 
 class Suspend(Server):
     "Server has been suspended"
 
+    __slots__ = ()
+
 
 class ListenStop(Server):
     "Server is no longer listening"
+
+    __slots__ = ()
@@ -0,0 +1,46 @@
+"""
+Timer events
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from .base import Event
+
+
+__all__ = ["Timer", "TickOverrun"]
+
+
+if TYPE_CHECKING:
+    from ..timers import AbstractTimer
+
+
+class Timer(Event):
+    "Timer event"
+
+    __slots__ = ("timer",)
+
+    timer: AbstractTimer
+
+    def __init__(self, timer: AbstractTimer):
+        super().__init__()
+        self.timer = timer
+
+    def __str__(self) -> str:
+        return f"{super().__str__()}: {self.timer}"
+
+
+class TickOverrun(Timer):
+    "Tick took longer than its interval"
+
+    __slots__ = ("duration",)
+
+    #: Seconds the tick took
+    duration: float
+
+    def __init__(self, timer: AbstractTimer, duration: float):
+        super().__init__(timer)
+        self.duration = duration
+
+    def __str__(self) -> str:
+        return f"{super().__str__()} ({self.duration * 1000:.1f}ms)"
@@ -0,0 +1,2 @@
+from .base import AbstractExecutor  # noqa
+from .pool import ProcessExecutor, ThreadExecutor  # noqa
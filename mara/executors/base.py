@@ -0,0 +1,165 @@
+"""
+Run blocking or CPU-heavy functions away from the event loop
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable
+
+
+class AbstractExecutor:
+    """
+    Run functions in a pool, and pass their results back to the loop
+
+    At most ``max_concurrent`` calls are passed to the pool at once; further calls wait
+    their turn in the loop. The pool is created the first time it is used.
+
+    Timings are kept for calls which succeed:
+
+    * queue time - from the call until it started running in the pool, including any
+      time waiting for a free worker
+    * run time - from when it started running until it finished
+    """
+
+    #: Number of workers in the pool, or None for the pool's default
+    max_workers: int | None
+
+    #: Maximum number of calls passed to the pool at once, or None for ``max_workers``
+    max_concurrent: int | None
+
+    #: Number of calls waiting to be passed to the pool
+    queued: int
+
+    #: Number of calls passed to the pool which have not finished
+    running: int
+
+    #: Number of calls which have finished, including failed calls
+    completed: int
+
+    #: Number of calls which raised an exception
+    failed: int
+
+    #: Total and longest seconds successful calls have spent queued and running
+    queue_time: float
+    max_queue_time: float
+    run_time: float
+    max_run_time: float
+
+    pool: Executor | None
+    _semaphore: asyncio.Semaphore | None
+
+    def __init__(
+        self, max_workers: int | None = None, max_concurrent: int | None = None
+    ):
+        self.max_workers = max_workers
+        self.max_concurrent = max_concurrent
+        self.pool = None
+        self._semaphore = None
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.queue_time = 0
+        self.max_queue_time = 0
+        self.run_time = 0
+        self.max_run_time = 0
+
+    def __str__(self):
+        return f"{type(self).__name__}({self.max_workers or 'default'} workers)"
+
+    def create_pool(self) -> Executor:
+        """
+        Create the pool to run functions in
+        """
+        raise NotImplementedError()
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            if self.pool is None:
+                self.pool = self.create_pool()
+            limit = self.max_concurrent or self.max_workers
+            if limit is None:
+                # Use the size the pool picked for itself
+                limit = getattr(self.pool, "_max_workers", 1)
+            self._semaphore = asyncio.Semaphore(limit)
+        return self._semaphore
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call ``fn(*args, **kwargs)`` in the pool and return the result
+        """
+        semaphore = self._get_semaphore()
+        loop = asyncio.get_running_loop()
+        queued_at = time.monotonic()
+        self.queued += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self.queued -= 1
+
+        self.running += 1
+        try:
+            result, started, finished = await loop.run_in_executor(
+                self.pool, _timed, fn, args, kwargs
+            )
+        except Exception:
+            self.completed += 1
+            self.failed += 1
+            raise
+        finally:
+            self.running -= 1
+            semaphore.release()
+
+        self._record(queued_at, started, finished)
+        return result
+
+    def _record(self, queued_at: float, started: float, finished: float):
+        waited = started - queued_at
+        ran = finished - started
+        self.completed += 1
+        self.queue_time += waited
+        self.run_time += ran
+        if waited > self.max_queue_time:
+            self.max_queue_time = waited
+        if ran > self.max_run_time:
+            self.max_run_time = ran
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Return the executor's counters and timings
+        """
+        timed = (self.completed - self.failed) or 1
+        return {
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "mean_queue_time": self.queue_time / timed,
+            "max_queue_time": self.max_queue_time,
+            "mean_run_time": self.run_time / timed,
+            "max_run_time": self.max_run_time,
+        }
+
+    def shutdown(self):
+        """
+        Shut down the pool without waiting for running calls, and cancel queued calls
+        """
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+        self._semaphore = None
+
+
+def _timed(
+    fn: Callable[..., Any], args: tuple, kwargs: dict[str, Any]
+) -> tuple[Any, float, float]:
+    """
+    Call the function in the pool, and time when it started and finished
+
+    Uses the monotonic clock, which is shared between processes.
+    """
+    started = time.monotonic()
+    result = fn(*args, **kwargs)
+    return result, started, time.monotonic()
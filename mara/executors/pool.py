@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing.context import BaseContext
+
+from .base import AbstractExecutor
+
+
+class ThreadExecutor(AbstractExecutor):
+    """
+    Run functions in a thread pool
+
+    Use for blocking calls, such as file or database access. Functions run in another
+    thread, so must not use the loop or call client methods.
+    """
+
+    def create_pool(self) -> Executor:
+        return ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="mara-executor"
+        )
+
+
+class ProcessExecutor(AbstractExecutor):
+    """
+    Run functions in a process pool
+
+    Use for CPU-heavy work. Functions, arguments and results are pickled, so functions
+    must be defined at module level, and arguments can't include clients or other
+    objects tied to the loop.
+    """
+
+    #: Multiprocessing context for the pool, or None for the default
+    mp_context: BaseContext | None = None
+
+    def create_pool(self) -> Executor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers, mp_context=self.mp_context
+        )
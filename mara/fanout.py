@@ -0,0 +1,58 @@
+"""
+Cooperative fan-out over large sets of clients
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Callable, Iterable, TypeVar
+
+
+T = TypeVar("T")
+
+#: Default number of items to process before yielding to the loop
+CHUNK_SIZE = 1000
+
+
+async def fan_out(
+    items: Iterable[T],
+    fn: Callable[[T], Any],
+    *,
+    chunk_size: int | None = None,
+    window: float = 0,
+) -> int:
+    """
+    Call ``fn(item)`` for each item, a chunk at a time, yielding to the loop between
+    chunks so that other connections are not stalled
+
+    Arguments:
+        items: The items to process, such as a server's ``clients``. They are copied
+            before the first chunk, so the collection can change while this runs.
+        fn: Function to call for each item
+        chunk_size (int | None): Most items to process before yielding. Defaults to
+            ``CHUNK_SIZE``.
+        window (float): Seconds to spread the chunks evenly over. If 0, each chunk is
+            processed as soon as the loop comes back to it.
+
+    Returns the number of items processed.
+    """
+    if chunk_size is None:
+        chunk_size = CHUNK_SIZE
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be at least 1")
+
+    snapshot = list(items)
+    total = len(snapshot)
+    chunks = -(-total // chunk_size)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    interval = window / chunks if window and chunks > 1 else 0
+
+    for index, start in enumerate(range(0, total, chunk_size)):
+        if index:
+            # Yield to the loop, then wait for this chunk's place in the window
+            delay = started + index * interval - loop.time() if interval else 0
+            await asyncio.sleep(max(delay, 0))
+        for item in snapshot[start : start + chunk_size]:
+            fn(item)
+    return total
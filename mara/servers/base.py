@@ -2,26 +2,63 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import TYPE_CHECKING
+import socket
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Iterable
 
+from ..clients.base import OverflowPolicy
+from ..clients.registry import ClientRegistry
 from ..events import ListenStart, ListenStop
+from ..fanout import fan_out
 from ..status import Status
+from .groups import Groups
 
 
 if TYPE_CHECKING:
     from ..app import App
     from ..clients import AbstractClient
+    from ..timers import TickTimer
 
 logger = logging.getLogger("mara.server")
 
 
 class AbstractServer:
     app: App
-    clients: list[AbstractClient]
+    clients: ClientRegistry
+    groups: Groups
     _status: Status = Status.IDLE
 
+    #: Size of each client's inbound queue. If set, clients read into the queue in one
+    #: task and handle events in another, so the connection is still read while a
+    #: handler is running; when the queue is full, the connection is paused. If
+    #: ``None``, events are handled inline by the client's read task.
+    inbound_queue_size: int | None = None
+
+    #: Limits for each client's outbound queue, in messages and in bytes (characters for
+    #: text clients). ``None`` for no limit.
+    write_queue_max_messages: int | None = None
+    write_queue_max_bytes: int | None = None
+
+    #: What to do when a client's outbound queue is full. A ``WriteOverflow`` event is
+    #: triggered when a client's queue starts to overflow.
+    write_queue_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST
+
+    #: Seconds for each client to wait for more outbound data before sending what it
+    #: has. Everything queued is always sent together; a short window trades latency for
+    #: fewer, larger writes.
+    write_flush_window: float = 0
+
+    #: If ``True``, clients write straight to the connection when it can take more
+    #: data, and only start a write task to queue data under backpressure. This keeps
+    #: each idle connection to a single task, but each write is sent separately.
+    lean_clients: bool = False
+
+    #: Tick to batch client input with. If set, input is held until the next tick
+    #: rather than handled as it arrives; see ``TickTimer``.
+    tick: TickTimer | None = None
+
     def __init__(self):
-        self.clients = []
+        self.clients = ClientRegistry()
+        self.groups = Groups(self)
 
     def __str__(self):
         return "AbstractServer"
@@ -63,19 +100,118 @@ class AbstractServer:
         """
         pass
 
-    async def connected(self, client: AbstractClient):
+    async def connected(self, client: AbstractClient, restored: bool = False):
         """
         Register a new client connection and start the client lifecycle
+
+        If ``restored``, the client was passed from another process after a restart.
         """
         logger.info(f"Connection from {client}")
-        self.clients.append(client)
-        client.run()
+        self.clients.add(client)
+        self.app.clients.add(client)
+        client.run(restored=restored)
 
     async def disconnected(self, client: AbstractClient):
         """
         Unregister a client who has disconnected
         """
-        self.clients.remove(client)
+        self.groups.leave_all(client)
+        self.clients.discard(client)
+        self.app.clients.discard(client)
+
+    def broadcast(
+        self,
+        data: Any,
+        *,
+        where: Callable[[AbstractClient], bool] | None = None,
+        exclude: AbstractClient | None = None,
+        **kwargs,
+    ) -> int:
+        """
+        Write to all clients connected to this server
+
+        Arguments:
+            data: The data to write
+            where (Callable | None): Only write to clients where this returns True
+            exclude (AbstractClient | None): A client not to write to
+            **kwargs: Arguments for the client's ``write()``, such as ``end``
+
+        Returns the number of clients the data was queued for.
+        """
+        return self.broadcast_to(
+            self.clients, data, where=where, exclude=exclude, **kwargs
+        )
+
+    def broadcast_to(
+        self,
+        clients: Iterable[AbstractClient],
+        data: Any,
+        *,
+        where: Callable[[AbstractClient], bool] | None = None,
+        exclude: AbstractClient | None = None,
+        **kwargs,
+    ) -> int:
+        """
+        Write to a group of clients
+
+        The data is encoded once for each client class, and the encoded object is
+        shared between all their outbound queues.
+
+        Takes the same arguments as ``broadcast()``, with the clients to write to.
+        Returns the number of clients the data was queued for.
+        """
+        send = _Broadcast(data, where, exclude, kwargs)
+        for client in clients:
+            send(client)
+        return send.reached
+
+    async def broadcast_chunked(
+        self,
+        data: Any,
+        *,
+        where: Callable[[AbstractClient], bool] | None = None,
+        exclude: AbstractClient | None = None,
+        chunk_size: int | None = None,
+        window: float = 0,
+        **kwargs,
+    ) -> int:
+        """
+        Write to all clients connected to this server, a chunk of clients at a time
+
+        Yields to the loop between chunks, so writing to a large number of clients does
+        not stall other connections. Takes the same arguments as ``broadcast()``, with
+        the ``chunk_size`` and ``window`` for ``mara.fanout.fan_out()``.
+        """
+        return await self.broadcast_to_chunked(
+            self.clients,
+            data,
+            where=where,
+            exclude=exclude,
+            chunk_size=chunk_size,
+            window=window,
+            **kwargs,
+        )
+
+    async def broadcast_to_chunked(
+        self,
+        clients: Iterable[AbstractClient],
+        data: Any,
+        *,
+        where: Callable[[AbstractClient], bool] | None = None,
+        exclude: AbstractClient | None = None,
+        chunk_size: int | None = None,
+        window: float = 0,
+        **kwargs,
+    ) -> int:
+        """
+        Write to a group of clients, a chunk of clients at a time
+
+        Takes the same arguments as ``broadcast_chunked()``, with the clients to write
+        to. Returns the number of clients the data was queued for.
+        """
+        send = _Broadcast(data, where, exclude, kwargs)
+        await fan_out(clients, send, chunk_size=chunk_size, window=window)
+        return send.reached
 
     def stop(self):
         """
@@ -89,12 +225,95 @@ class AbstractServer:
         return self._status
 
 
+class _Broadcast:
+    """
+    Write the same data to clients, encoding it once for each client class and sharing
+    the encoded object between their outbound queues
+    """
+
+    __slots__ = ("data", "where", "exclude", "kwargs", "encoded", "reached")
+
+    def __init__(
+        self,
+        data: Any,
+        where: Callable[[AbstractClient], bool] | None,
+        exclude: AbstractClient | None,
+        kwargs: dict[str, Any],
+    ):
+        self.data = data
+        self.where = where
+        self.exclude = exclude
+        self.kwargs = kwargs
+        self.encoded: dict[type[AbstractClient], Any] = {}
+        self.reached = 0
+
+    def __call__(self, client: AbstractClient):
+        where = self.where
+        if client is self.exclude or (where is not None and not where(client)):
+            return
+
+        client_class = type(client)
+        encoded = self.encoded
+        if client_class in encoded:
+            payload = encoded[client_class]
+        else:
+            payload = encoded[client_class] = client.encode(self.data, **self.kwargs)
+
+        if client._enqueue(payload):
+            self.reached += 1
+
+
 class AbstractAsyncioServer(AbstractServer):
     """
     Base class for servers based on asyncio.Server
     """
 
     server: asyncio.base_events.Server
+    host: str
+    port: int
+
+    #: Bind with ``SO_REUSEPORT`` so several processes can listen on the same port.
+    #: This is set automatically when the app runs with workers.
+    reuse_port: bool = False
+
+    #: Listening sockets to use instead of binding to the host and port. These are set
+    #: automatically when the server is passed from another process after a restart.
+    sockets: list[socket.socket] | None = None
+
+    #: Servers for any listening sockets after the first, when listening on sockets
+    #: passed from another process
+    extra_servers: list[asyncio.base_events.Server]
+
+    async def _create_servers(
+        self, create: Callable[..., Awaitable[asyncio.base_events.Server]]
+    ):
+        """
+        Create the asyncio server by calling ``create`` with the address to listen on
+
+        Each listening socket passed from another process needs its own server, so
+        ``create`` is called for each one.
+        """
+        self.extra_servers = []
+        if not self.sockets:
+            self.server = await create(
+                host=self.host, port=self.port, reuse_port=self.reuse_port or None
+            )
+            return
+
+        first, *rest = self.sockets
+        self.server = await create(sock=first)
+        for sock in rest:
+            self.extra_servers.append(await create(sock=sock))
+
+    def listening_sockets(self) -> list[socket.socket]:
+        """
+        Return the sockets the server is listening on
+        """
+        return [
+            sock
+            for server in (self.server, *self.extra_servers)
+            for sock in server.sockets
+        ]
 
     async def listen_loop(self):
         async with self.server:
@@ -106,6 +325,8 @@ class AbstractAsyncioServer(AbstractServer):
         """
         super().stop()
         self.server.close()
+        for server in self.extra_servers:
+            server.close()
 
     @property
     def status(self) -> Status:
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable, Iterator
+
+from ..clients.registry import ClientRegistry
+
+
+if TYPE_CHECKING:
+    from ..clients import AbstractClient
+    from .base import AbstractServer
+
+
+class Group(ClientRegistry):
+    """
+    A named group of clients on a server, such as a room or a channel
+    """
+
+    name: str
+    server: AbstractServer
+
+    def __init__(self, server: AbstractServer, name: str):
+        super().__init__()
+        self.server = server
+        self.name = name
+
+    def __str__(self) -> str:
+        return self.name
+
+    def write(
+        self,
+        data: Any,
+        *,
+        where: Callable[[AbstractClient], bool] | None = None,
+        exclude: AbstractClient | None = None,
+        relay: bool = True,
+        **kwargs,
+    ) -> int:
+        """
+        Write to all clients in the group
+
+        Takes the same arguments as ``AbstractServer.broadcast()``, and returns the
+        number of clients in this process the data was queued for.
+
+        If the app has a bus, the write is also passed on to the group in the app's
+        other workers, unless ``relay`` is ``False``.
+        """
+        bus = self.server.app.bus
+        if relay and bus is not None:
+            if where is not None:
+                raise ValueError("Cannot relay a group write with a where function")
+            bus.publish_group(self.server, self.name, data, kwargs)
+
+        return self.server.broadcast_to(
+            self, data, where=where, exclude=exclude, **kwargs
+        )
+
+    async def write_chunked(
+        self,
+        data: Any,
+        *,
+        where: Callable[[AbstractClient], bool] | None = None,
+        exclude: AbstractClient | None = None,
+        relay: bool = True,
+        chunk_size: int | None = None,
+        window: float = 0,
+        **kwargs,
+    ) -> int:
+        """
+        Write to all clients in the group, a chunk of clients at a time
+
+        Takes the same arguments as ``write()``, with the ``chunk_size`` and ``window``
+        for ``mara.fanout.fan_out()``.
+        """
+        bus = self.server.app.bus
+        if relay and bus is not None:
+            if where is not None:
+                raise ValueError("Cannot relay a group write with a where function")
+            bus.publish_group(self.server, self.name, data, kwargs)
+
+        return await self.server.broadcast_to_chunked(
+            self,
+            data,
+            where=where,
+            exclude=exclude,
+            chunk_size=chunk_size,
+            window=window,
+            **kwargs,
+        )
+
+
+class Groups:
+    """
+    Groups of clients on a server
+
+    Clients can join and leave groups in constant time, and are removed from all their
+    groups when they disconnect. Groups are created when their first client joins, and
+    removed when their last client leaves.
+    """
+
+    server: AbstractServer
+    _groups: dict[str, Group]
+    # Names of the groups each client is in, by client id, in the order they joined
+    _memberships: dict[int, dict[str, None]]
+
+    def __init__(self, server: AbstractServer):
+        self.server = server
+        self._groups = {}
+        self._memberships = {}
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._groups
+
+    def __iter__(self) -> Iterator[Group]:
+        return iter(tuple(self._groups.values()))
+
+    def __getitem__(self, name: str) -> Group:
+        """
+        Get a group by name
+
+        An unknown group is returned empty, but is not kept unless a client joins it.
+        """
+        group = self._groups.get(name)
+        if group is None:
+            group = Group(self.server, name)
+        return group
+
+    def join(self, name: str, client: AbstractClient) -> Group:
+        group = self._groups.get(name)
+        if group is None:
+            group = self._groups[name] = Group(self.server, name)
+        group.add(client)
+        self._memberships.setdefault(client.id, {})[name] = None
+        return group
+
+    def leave(self, name: str, client: AbstractClient):
+        group = self._groups.get(name)
+        if group is None:
+            return
+        group.discard(client)
+        if not group:
+            del self._groups[name]
+
+        names = self._memberships.get(client.id)
+        if names is not None:
+            names.pop(name, None)
+            if not names:
+                del self._memberships[client.id]
+
+    def leave_all(self, client: AbstractClient):
+        """
+        Remove a client from all its groups
+        """
+        for name in self._memberships.pop(client.id, ()):
+            group = self._groups[name]
+            group.discard(client)
+            if not group:
+                del self._groups[name]
+
+    def of(self, client: AbstractClient) -> list[Group]:
+        """
+        Get the groups a client is in
+        """
+        return [self._groups[name] for name in self._memberships.get(client.id, ())]
+
+    def counts(self) -> dict[str, int]:
+        """
+        Number of clients in each group, for monitoring
+        """
+        return {name: len(group) for name, group in self._groups.items()}
@@ -0,0 +1,344 @@
+"""
+Socket transport based on asyncio.BufferedProtocol
+
+An alternative to asyncio streams for socket servers. Data is read into a preallocated
+buffer which is reused for the lifetime of the connection, and split into frames using
+memoryviews. All complete lines in a read are split in one pass, and clients can take
+lines without their delimiter using ``reader.readframe()``.
+
+Enable it on a socket server with::
+
+    server = TextServer()
+    server.protocol_class = BufferedSocketProtocol
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, Iterable
+
+
+if TYPE_CHECKING:
+    from ..clients.socket import SocketMixin
+    from .socket import AbstractSocketServer
+
+
+logger = logging.getLogger("mara.server")
+
+# Pause reading when a client has this many unread frames, and resume when it is back
+# down to the low water mark
+HIGH_WATER_FRAMES = 64
+LOW_WATER_FRAMES = 16
+
+
+class ProtocolReader:
+    """
+    Frames received by a ``BufferedSocketProtocol``
+
+    Provides the parts of the ``asyncio.StreamReader`` API which clients use, plus
+    ``readframe()`` to read a line without its delimiter.
+    """
+
+    protocol: BufferedSocketProtocol
+    _eof: bool
+    _partial: bytes
+    _waiter: asyncio.Future | None
+
+    def __init__(self, protocol: BufferedSocketProtocol):
+        self.protocol = protocol
+
+        # Unread frames are _frames[_next:]. A list is smaller than a deque, and lets
+        # a list of split lines be taken as it is.
+        self._frames: list[bytes] = []
+        self._next = 0
+        self._eof = False
+        self._partial = b""
+        self._waiter = None
+
+    def feed(self, frames: list[bytes]):
+        if self._next == len(self._frames):
+            self._frames = frames
+            self._next = 0
+        else:
+            del self._frames[: self._next]
+            self._next = 0
+            self._frames.extend(frames)
+        self._wake()
+        self.protocol.check_reading(self.unread)
+
+    @property
+    def unread(self) -> int:
+        return len(self._frames) - self._next
+
+    def feed_eof(self, partial: bytes = b""):
+        self._eof = True
+        self._partial = partial
+        self._wake()
+
+    def at_eof(self) -> bool:
+        return self._eof and not self.unread
+
+    def _wake(self):
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    async def _wait(self):
+        self._waiter = asyncio.get_running_loop().create_future()
+        try:
+            await self._waiter
+        finally:
+            self._waiter = None
+
+    def _pop(self) -> bytes:
+        frame = self._frames[self._next]
+        self._next += 1
+        if self.protocol.reading_paused:
+            self.protocol.check_reading(self.unread)
+        return frame
+
+    async def read(self, n: int = -1) -> bytes:
+        """
+        Read the next frame, up to ``n`` bytes. Returns ``b""`` at EOF.
+        """
+        while not self.unread:
+            if self._eof:
+                return b""
+            await self._wait()
+
+        frame = self._pop()
+        if n >= 0 and len(frame) > n:
+            self._next -= 1
+            self._frames[self._next] = frame[n:]
+            frame = frame[:n]
+        return frame
+
+    async def readframe(self) -> bytes:
+        """
+        Read the next complete line, without the delimiter
+
+        Raises ``IncompleteReadError`` at EOF.
+        """
+        while self._next == len(self._frames):
+            if self._eof:
+                raise asyncio.IncompleteReadError(self._partial, None)
+            await self._wait()
+        return self._pop()
+
+    async def readuntil(self, separator: bytes = b"\n") -> bytes:
+        """
+        Read the next complete line, including the delimiter
+
+        Lines are split by the protocol, so the separator must match the client's
+        delimiter. Raises ``IncompleteReadError`` at EOF.
+        """
+        if separator != self.protocol.delimiter:
+            raise ValueError(
+                f"Separator {separator!r} does not match protocol delimiter"
+                f" {self.protocol.delimiter!r}"
+            )
+        return await self.readframe() + separator
+
+
+class ProtocolWriter:
+    """
+    Write side of a ``BufferedSocketProtocol``
+
+    Provides the parts of the ``asyncio.StreamWriter`` API which clients use.
+    """
+
+    transport: asyncio.Transport
+    _paused: bool
+    _drain_waiter: asyncio.Future | None
+    _closed: asyncio.Future
+
+    def __init__(self, transport: asyncio.Transport):
+        self.transport = transport
+        self._paused = False
+        self._drain_waiter = None
+        self._closed = asyncio.get_running_loop().create_future()
+
+    def get_extra_info(self, name: str, default: Any = None) -> Any:
+        return self.transport.get_extra_info(name, default)
+
+    def write(self, data: bytes):
+        self.transport.write(data)
+
+    def writelines(self, data: Iterable[bytes]):
+        self.transport.writelines(data)
+
+    def is_closing(self) -> bool:
+        return self.transport.is_closing()
+
+    def close(self):
+        self.transport.close()
+
+    async def wait_closed(self):
+        await self._closed
+
+    async def drain(self):
+        """
+        Wait until the transport is ready for more data
+        """
+        if not self._paused or self._closed.done():
+            return
+        if self._drain_waiter is None:
+            self._drain_waiter = asyncio.get_running_loop().create_future()
+        await asyncio.shield(self._drain_waiter)
+
+    def pause_writing(self):
+        self._paused = True
+
+    def resume_writing(self):
+        self._paused = False
+        self._release_drain()
+
+    def connection_lost(self):
+        self._release_drain()
+        if not self._closed.done():
+            self._closed.set_result(None)
+
+    def _release_drain(self):
+        waiter = self._drain_waiter
+        self._drain_waiter = None
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+
+class BufferedSocketProtocol(asyncio.BufferedProtocol):
+    """
+    Read into a reusable buffer and hand frames to the client
+
+    If the client class has a ``delimiter``, received data is split into lines;
+    otherwise each chunk received is a frame.
+
+    The buffer is ``server.read_size`` bytes, which is also the longest line which can
+    be received; a client which sends a longer line is disconnected.
+    """
+
+    server: AbstractSocketServer
+    client: SocketMixin
+    delimiter: bytes | None
+    reader: ProtocolReader
+    writer: ProtocolWriter
+    transport: asyncio.Transport
+
+    #: If the connection was passed from another process after a restart, the client
+    #: is registered by the restart instead of when the connection is made
+    restored: bool
+
+    def __init__(self, server: AbstractSocketServer, restored: bool = False):
+        self.server = server
+        self.restored = restored
+        self.delimiter = server.client_class.delimiter
+        self.read_size = server.read_size
+        self._buffer = bytearray(self.read_size)
+        self._end = 0
+        self.reading_paused = False
+        self.reader = ProtocolReader(self)
+
+    def connection_made(self, transport: asyncio.BaseTransport):
+        self.transport = transport  # type: ignore
+        self.writer = ProtocolWriter(self.transport)
+        self.client = self.server.client_class(
+            server=self.server,
+            reader=self.reader,  # type: ignore
+            writer=self.writer,  # type: ignore
+        )
+        if not self.restored:
+            self.server.app.create_task(
+                self.server.connected(self.client), owner=self.server
+            )
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return memoryview(self._buffer)[self._end :]
+
+    def buffer_updated(self, nbytes: int):
+        end = self._end + nbytes
+        view = memoryview(self._buffer)
+
+        # Raw bytes - everything received is a frame
+        delimiter = self.delimiter
+        if delimiter is None:
+            self._end = 0
+            self.reader.feed([bytes(view[:end])])
+            return
+
+        # Find the end of the last complete line, only searching the new data (and
+        # enough of the old data to catch a delimiter split across reads)
+        buffer = self._buffer
+        search = max(self._end - len(delimiter) + 1, 0)
+        last = buffer.rfind(delimiter, search, end)
+        if last == -1:
+            self._end = end
+        else:
+            # Copy out all complete lines and split them in one pass
+            stop = last + len(delimiter)
+            lines = bytes(view[:stop]).split(delimiter)
+            lines.pop()
+            self.reader.feed(lines)
+
+            # Move any partial line to the start of the buffer
+            remaining = end - stop
+            if remaining:
+                buffer[:remaining] = buffer[stop:end]
+            self._end = remaining
+
+        if self._end == len(buffer):
+            logger.warning(
+                f"Line longer than read buffer ({self.read_size} bytes), disconnecting"
+            )
+            self._end = 0
+            self.transport.close()
+
+    def take_unread(self) -> bytes:
+        """
+        Remove and return data which has been received but not read by the client
+        """
+        reader = self.reader
+        frames = reader._frames[reader._next :]
+        reader._frames = []
+        reader._next = 0
+        if self.delimiter is not None:
+            frames = [frame + self.delimiter for frame in frames]
+        frames.append(bytes(self._buffer[: self._end]))
+        self._end = 0
+        return b"".join(frames)
+
+    def feed_unread(self, data: bytes):
+        """
+        Process data which another process received but did not handle
+        """
+        view = memoryview(data)
+        while view:
+            buffer = self.get_buffer(-1)
+            size = min(len(buffer), len(view))
+            buffer[:size] = view[:size]
+            view = view[size:]
+            self.buffer_updated(size)
+
+    def eof_received(self) -> bool:
+        self.reader.feed_eof(bytes(self._buffer[: self._end]))
+        return False
+
+    def connection_lost(self, exc: Exception | None):
+        self.reader.feed_eof(bytes(self._buffer[: self._end]))
+        self.writer.connection_lost()
+
+    def pause_writing(self):
+        self.writer.pause_writing()
+
+    def resume_writing(self):
+        self.writer.resume_writing()
+
+    def check_reading(self, unread: int):
+        """
+        Pause reading when the client has too many unread frames, and resume when it
+        has caught up
+        """
+        if not self.reading_paused and unread >= HIGH_WATER_FRAMES:
+            self.reading_paused = True
+            self.transport.pause_reading()
+        elif self.reading_paused and unread <= LOW_WATER_FRAMES:
+            self.reading_paused = False
+            self.transport.resume_reading()
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import logging
+import socket
 
 from ..clients.socket import SocketClient, SocketMixin, TextClient
 from ..constants import DEFAULT_HOST, DEFAULT_PORT
 from .base import AbstractAsyncioServer
+from .protocol import BufferedSocketProtocol
 
 
 logger = logging.getLogger("mara.server")
@@ -16,6 +19,14 @@ class AbstractSocketServer(AbstractAsyncioServer):
     _host: str
     _port: int
 
+    #: Transport protocol. If ``None``, use asyncio streams; otherwise a protocol class
+    #: such as ``BufferedSocketProtocol``, which will be passed this server.
+    protocol_class: type[BufferedSocketProtocol] | None = None
+
+    #: Size of reads from the socket. With ``BufferedSocketProtocol`` this is the size
+    #: of each connection's receive buffer, and the longest line which can be received.
+    read_size: int = 4096
+
     def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
         self.host = host
         self.port = port
@@ -27,11 +38,20 @@ class AbstractSocketServer(AbstractAsyncioServer):
     async def create(self):
         await super().create()
 
-        self.server = await asyncio.start_server(
-            client_connected_cb=self.handle_connect,
-            host=self.host,
-            port=self.port,
-        )
+        protocol_class = self.protocol_class
+        if protocol_class is None:
+            await self._create_servers(
+                functools.partial(
+                    asyncio.start_server, client_connected_cb=self.handle_connect
+                )
+            )
+        else:
+            loop = asyncio.get_running_loop()
+            await self._create_servers(
+                functools.partial(
+                    loop.create_server, protocol_factory=lambda: protocol_class(self)
+                )
+            )
 
     async def handle_connect(
         self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
@@ -41,6 +61,27 @@ class AbstractSocketServer(AbstractAsyncioServer):
         )
         await self.connected(client)
 
+    async def restore_client(self, sock: socket.socket, unread: bytes) -> SocketMixin:
+        """
+        Create a client for a connection passed from another process after a restart
+
+        Any input which the old process had received but not handled is passed as
+        ``unread``. The client is not registered or started.
+        """
+        protocol_class = self.protocol_class
+        if protocol_class is None:
+            reader, writer = await asyncio.open_connection(sock=sock)
+            if unread:
+                reader.feed_data(unread)
+            return self.client_class(server=self, reader=reader, writer=writer)
+
+        loop = asyncio.get_running_loop()
+        transport, protocol = await loop.connect_accepted_socket(
+            lambda: protocol_class(self, restored=True), sock
+        )
+        protocol.feed_unread(unread)
+        return protocol.client
+
 
 class SocketServer(AbstractSocketServer):
     client_class: type[SocketClient] = SocketClient
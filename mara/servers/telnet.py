@@ -5,6 +5,8 @@ Wrapper around telnetlib3, https://pypi.org/project/telnetlib3/
 """
 from __future__ import annotations
 
+import functools
+
 from telnetlib3 import TelnetReader, TelnetWriter
 
 from ..clients.telnet import TelnetClient
@@ -43,10 +45,11 @@ class TelnetServer(AbstractAsyncioServer):
         if loop is None:
             raise ValueError("Cannot start TelnetServer without running loop")
 
-        self.server = await loop.create_server(
-            protocol_factory=lambda: telnetlib3.TelnetServer(**self.telnet_kwargs),
-            host=self.host,
-            port=self.port,
+        await self._create_servers(
+            functools.partial(
+                loop.create_server,
+                protocol_factory=lambda: telnetlib3.TelnetServer(**self.telnet_kwargs),
+            )
         )
 
     async def handle_connect(self, reader: TelnetReader, writer: TelnetWriter):
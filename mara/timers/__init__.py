@@ -1,2 +1,6 @@
-from .base import AbstractTimer  # noqa
+from .base import AbstractTimer, MissedPolicy  # noqa
+from .clock import AbstractClock, LoopClock, ManualClock  # noqa
+from .delay import DelayTimer  # noqa
 from .periodic import PeriodicTimer  # noqa
+from .tick import TickTimer  # noqa
+from .wheel import TimerHandle, TimerWheel  # noqa
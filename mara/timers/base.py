@@ -1,36 +1,109 @@
 from __future__ import annotations
 
-import asyncio
+import inspect
 import logging
-from time import time
-from typing import TYPE_CHECKING, Awaitable, Callable
+from enum import Enum, auto
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
 
 
 if TYPE_CHECKING:
     from .. import App
+    from .wheel import TimerHandle
 
 
 logger = logging.getLogger("mara.timer")
 
 
+TimerCallbackType = Callable[["AbstractTimer"], Awaitable[None] | None]
+
+
+class MissedPolicy(Enum):
+    """
+    What to do when a timer's firings are missed, because its callback or the loop
+    ran late
+    """
+
+    #: Skip the missed firings, and carry on from the next due time
+    SKIP = auto()
+
+    #: Call the callback for each missed firing, one after another, until caught up
+    BURST = auto()
+
+    #: Call the callback once for all the missed firings, then carry on from the next
+    #: due time
+    COALESCE = auto()
+
+
 class AbstractTimer:
     app: App
-    callback: Callable[[AbstractTimer], Awaitable[None]] | None = None
+    callback: TimerCallbackType | None = None
     running: bool = False
 
+    #: What to do when firings are missed
+    missed_policy: MissedPolicy = MissedPolicy.SKIP
+
+    #: If set, each call to an async callback runs in its own task and the next firing
+    #: is scheduled straight away, with at most this many calls running at once; firings
+    #: due while the limit is reached are skipped. If ``None``, the next firing is
+    #: scheduled once the callback has finished.
+    max_concurrent: int | None = None
+
+    #: Time on the app's timer wheel the timer was last due
+    last_due: float = 0
+
+    #: Number of times the callback has been called
+    fired: int
+
+    #: Number of firings which were missed and not called
+    skipped: int
+
+    #: Number of calls to the callback which are still running
+    active: int
+
+    #: Seconds the last firing was called after it was due, and the total and longest
+    lateness: float
+    total_lateness: float
+    max_lateness: float
+
+    #: Total and longest seconds calls to the callback have taken
+    run_time: float
+    max_run_time: float
+
+    _handle: TimerHandle | None = None
+    _due: float = 0
+
+    def __init__(
+        self,
+        missed_policy: MissedPolicy | None = None,
+        max_concurrent: int | None = None,
+    ):
+        if missed_policy is not None:
+            self.missed_policy = missed_policy
+        if max_concurrent is not None:
+            self.max_concurrent = max_concurrent
+        self.fired = 0
+        self.skipped = 0
+        self.active = 0
+        self.lateness = 0
+        self.total_lateness = 0
+        self.max_lateness = 0
+        self.run_time = 0
+        self.max_run_time = 0
+
     def __str__(self):
         if self.callback is None:
             return str(id(self))
         return self.callback.__name__
 
-    def __call__(
-        self, callback: Callable[[AbstractTimer], Awaitable[None]]
-    ) -> Callable[[AbstractTimer], Awaitable[None]]:
+    def __call__(self, callback: TimerCallbackType) -> TimerCallbackType:
         logger.debug(f"Timer {self} assigned callback {callback.__name__}")
         self.callback = callback
         return callback
 
-    async def run(self, app: App):
+    def start(self, app: App):
+        """
+        Schedule the timer on the app's timer wheel
+        """
         self.app = app
 
         logger.debug(f"Timer {self} starting")
@@ -38,27 +111,149 @@ class AbstractTimer:
             raise ValueError(f"Timer {self} has not been assigned a callback")
 
         self.running = True
-        last_due = time()
-        while self.running:
-            now = time()
-            next_due = self.next_due(last_due, now)
-            if not next_due:
-                logger.debug(f"Timer {self} at {now} has no next due, stopping")
-                break
-
-            logger.debug(f"Timer {self} at {now} is next due {next_due}")
-            await asyncio.sleep(next_due - now)
-            logger.debug(f"Timer {self} active")
-            await self.callback(self)
+        self.last_due = app.scheduler.time()
+        self._schedule(self.last_due)
 
-        self.running = False
-        logger.debug(f"Timer {self} stopped")
-        # TODO
-        # self.app.remove_timer(self)
+    def _schedule(self, now: float, after_firing: bool = False):
+        """
+        Schedule the next firing, applying the missed policy if the timer has fired
+        and the next due time has already passed
+        """
+        next_due = self.next_due(self.last_due, now)
+        if next_due and after_firing and next_due < now:
+            # A due time in the past is called on the wheel's next tick, so bursts
+            # need nothing more
+            policy = self.missed_policy
+            if policy != MissedPolicy.BURST:
+                last_missed, next_due, missed = self.skip_missed(next_due, now)
+                if policy == MissedPolicy.COALESCE:
+                    # Call once now for the missed firings, as the last of them
+                    missed -= 1
+                    next_due = last_missed
+                if missed:
+                    self.skipped += missed
+                    logger.warning(
+                        f"Timer {self} missed {missed} firings ({policy.name})"
+                    )
+
+        if not next_due:
+            logger.debug(f"Timer {self} at {now} has no next due, stopping")
+            self.running = False
+            self.app.remove_timer(self)
+            return
+
+        logger.debug(f"Timer {self} at {now} is next due {next_due}")
+        self._due = next_due
+        self._handle = self.app.scheduler.call_at(next_due, self._fire)
+
+    def skip_missed(
+        self, due: float, now: float
+    ) -> tuple[float, int | float | None, int]:
+        """
+        Step through due times which have passed
+
+        Returns the last due time before ``now``, the next due time, and the number of
+        due times which were missed. Subclasses can override this to calculate it
+        directly.
+        """
+        missed = 0
+        last_missed = due
+        next_due: int | float | None = due
+        while next_due and next_due < now:
+            missed += 1
+            last_missed = next_due
+            next_due = self.next_due(next_due, now)
+        return last_missed, next_due, missed
+
+    def _fire(self):
+        """
+        Called by the timer wheel when the timer is due
+        """
+        self._handle = None
+        now = self.app.scheduler.time()
+        self.last_due = self._due
+        lateness = max(now - self._due, 0)
+        self.lateness = lateness
+        self.total_lateness += lateness
+        if lateness > self.max_lateness:
+            self.max_lateness = lateness
+
+        if self.max_concurrent is None:
+            if not self._call():
+                self._reschedule()
+            return
+
+        if self.active >= self.max_concurrent:
+            self.skipped += 1
+            logger.warning(
+                f"Timer {self} skipped a firing, {self.active} calls still running"
+            )
+        else:
+            self._call()
+        self._reschedule()
+
+    def _call(self) -> bool:
+        """
+        Call the callback. Plain function callbacks are called directly; coroutines
+        are run in a task.
+
+        Returns True if the callback is running in a task
+        """
+        logger.debug(f"Timer {self} active")
+        self.fired += 1
+        self.active += 1
+        started = self.app.scheduler.time()
+        try:
+            result = self.callback(self)  # type: ignore[misc]
+        except Exception:
+            logger.exception(f"Timer {self} callback failed")
+        else:
+            if inspect.isawaitable(result):
+                self.app.create_task(self._await_callback(result, started), owner=self)
+                return True
+        self._record(started)
+        return False
+
+    async def _await_callback(self, result: Awaitable[None], started: float):
+        try:
+            await result
+        except Exception:
+            logger.exception(f"Timer {self} callback failed")
+        finally:
+            self._record(started)
+        if self.max_concurrent is None:
+            self._reschedule()
+
+    def _record(self, started: float):
+        ran = self.app.scheduler.time() - started
+        self.active -= 1
+        self.run_time += ran
+        if ran > self.max_run_time:
+            self.max_run_time = ran
+
+    def _reschedule(self):
+        if self.running:
+            self._schedule(self.app.scheduler.time(), after_firing=True)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Return the timer's counters and timings
+        """
+        fired = self.fired or 1
+        finished = (self.fired - self.active) or 1
+        return {
+            "fired": self.fired,
+            "skipped": self.skipped,
+            "active": self.active,
+            "mean_lateness": self.total_lateness / fired,
+            "max_lateness": self.max_lateness,
+            "mean_run_time": self.run_time / finished,
+            "max_run_time": self.max_run_time,
+        }
 
     def next_due(self, last_due: float, now: float) -> int | float | None:
         """
-        Return unix time for the next time the trigger is due
+        Return the time on the app's timer wheel for the next time the trigger is due
 
         Arguments:
 
@@ -75,3 +270,6 @@ class AbstractTimer:
     def stop(self):
         logger.debug(f"Timer {self} stopping")
         self.running = False
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
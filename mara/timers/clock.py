@@ -0,0 +1,113 @@
+"""
+Clocks for timers
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+from typing import Any, Callable, Protocol
+
+
+class Cancellable(Protocol):
+    def cancel(self) -> Any:
+        ...
+
+
+class AbstractClock:
+    """
+    Source of time for the app's timer wheel
+
+    Times are in seconds on a monotonic clock, and only need to be comparable with each
+    other.
+    """
+
+    def time(self) -> float:
+        """
+        Return the current time
+        """
+        raise NotImplementedError()
+
+    def call_at(self, when: float, callback: Callable[[], Any]) -> Cancellable:
+        """
+        Call ``callback()`` once the time reaches ``when``, and return an object with a
+        ``cancel()`` method
+        """
+        raise NotImplementedError()
+
+
+class LoopClock(AbstractClock):
+    """
+    Use the event loop's clock
+
+    This is the default. If the loop is a ``VirtualTimeLoop``, this is virtual time.
+    """
+
+    loop: asyncio.AbstractEventLoop
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+
+    def time(self) -> float:
+        return self.loop.time()
+
+    def call_at(self, when: float, callback: Callable[[], Any]) -> Cancellable:
+        return self.loop.call_at(when, callback)
+
+
+class ManualHandle:
+    __slots__ = ("when", "callback", "cancelled")
+
+    def __init__(self, when: float, callback: Callable[[], Any]):
+        self.when = when
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class ManualClock(AbstractClock):
+    """
+    Clock which only moves when it is told to
+
+    For testing timers without an event loop - call ``advance()`` to move time forward
+    and call everything which falls due, in order.
+    """
+
+    now: float
+    _calls: list[tuple[float, int, ManualHandle]]
+
+    def __init__(self, start: float = 0):
+        self.now = start
+        self._calls = []
+        self._order = itertools.count()
+
+    def time(self) -> float:
+        return self.now
+
+    def call_at(self, when: float, callback: Callable[[], Any]) -> ManualHandle:
+        handle = ManualHandle(when, callback)
+        heapq.heappush(self._calls, (when, next(self._order), handle))
+        return handle
+
+    def advance(self, seconds: float):
+        """
+        Move time forward by a number of seconds
+        """
+        self.advance_to(self.now + seconds)
+
+    def advance_to(self, when: float):
+        """
+        Move time forward to ``when``, calling everything due on the way
+        """
+        calls = self._calls
+        while calls and calls[0][0] <= when:
+            due, _, handle = heapq.heappop(calls)
+            if handle.cancelled:
+                continue
+            if due > self.now:
+                self.now = due
+            handle.callback()
+        if when > self.now:
+            self.now = when
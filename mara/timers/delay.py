@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from .base import AbstractTimer, MissedPolicy
+
+
+if TYPE_CHECKING:
+    from .. import App
+
+
+class DelayTimer(AbstractTimer):
+    """
+    Call the callback once, ``delay`` seconds after the timer starts
+    """
+
+    delay: int | float
+    _scheduled: bool
+
+    def __init__(
+        self,
+        delay: int | float,
+        missed_policy: MissedPolicy | None = None,
+        max_concurrent: int | None = None,
+    ):
+        super().__init__(missed_policy=missed_policy, max_concurrent=max_concurrent)
+        self.delay = delay
+        self._scheduled = False
+
+    def start(self, app: App):
+        self._scheduled = False
+        super().start(app)
+
+    def next_due(self, last_due: float, now: float) -> int | float | None:
+        """
+        Return the time the timer is due, or None once it has been called
+        """
+        if self._scheduled:
+            return None
+        self._scheduled = True
+        return last_due + self.delay
@@ -1,28 +1,43 @@
 from __future__ import annotations
 
-from .base import AbstractTimer
+import math
+
+from .base import AbstractTimer, MissedPolicy
 
 
 class PeriodicTimer(AbstractTimer):
+    """
+    Call the callback every ``every`` seconds
+
+    If ``strict``, each firing is due ``every`` seconds after the last was due, and
+    firings missed while the callback or loop ran late are handled by the timer's
+    ``missed_policy``. Otherwise each firing is due ``every`` seconds after the last
+    call finished.
+    """
+
     every: int | float
     strict: bool
 
-    def __init__(self, every: int | float, strict=False):
-        super().__init__()
+    def __init__(
+        self,
+        every: int | float,
+        strict=False,
+        missed_policy: MissedPolicy | None = None,
+        max_concurrent: int | None = None,
+    ):
+        super().__init__(missed_policy=missed_policy, max_concurrent=max_concurrent)
         self.every = every
         self.strict = strict
 
     def next_due(self, last_due: float, now: float) -> int | float:
         """
-        Return unix time for the next time the trigger is due
+        Return the time on the app's timer wheel for the next time the trigger is due
         """
         if self.strict:
-            next = last_due + self.every
-
-        else:
-            next = last_due
-
-        if next <= now:
-            next = now + self.every
+            return last_due + self.every
+        return now + self.every
 
-        return next
+    def skip_missed(self, due: float, now: float) -> tuple[float, float, int]:
+        missed = math.floor((now - due) / self.every) + 1
+        last_missed = due + (missed - 1) * self.every
+        return last_missed, last_missed + self.every, missed
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+from collections import deque
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+from ..events import Receive, TickOverrun
+from .base import AbstractTimer
+from .periodic import PeriodicTimer
+
+
+if TYPE_CHECKING:
+    from ..clients import AbstractClient
+
+
+logger = logging.getLogger("mara.timer")
+
+SystemType = Callable[["TickTimer"], Awaitable[None] | None]
+
+
+class TickTimer(PeriodicTimer):
+    """
+    Fixed-step game tick
+
+    Set as a server's ``tick`` to batch the input its clients send. Input received
+    between ticks is held for each client, then on each tick the ``Receive`` events are
+    triggered in one pass, client by client, followed by the tick's systems in the
+    order they were added::
+
+        tick = app.add_timer(TickTimer(every=0.1))
+        server.tick = tick
+
+        @tick
+        async def move_npcs(tick):
+            ...
+
+    A tick which takes longer than ``every`` is an overrun: it is logged, counted and a
+    ``TickOverrun`` event is triggered. Recent tick durations are kept for
+    ``percentiles()`` and ``stats()``.
+    """
+
+    #: Most inputs dispatched for each client per tick; any more wait for later ticks.
+    #: ``None`` for no limit.
+    max_input_per_tick: int | None = None
+
+    #: Most inputs held for a client before its read task waits for the next tick
+    max_pending: int = 100
+
+    #: Number of recent tick durations kept for percentiles
+    history: int = 1000
+
+    #: Functions called on each tick, in order
+    systems: list[SystemType]
+
+    #: Number of ticks run
+    ticks: int
+
+    #: Number of ticks which took longer than ``every``
+    overruns: int
+
+    #: Seconds taken by recent ticks
+    durations: deque[float]
+
+    _pending: dict[AbstractClient, list[Any]]
+    _tick_done: asyncio.Event | None
+
+    def __init__(
+        self,
+        every: int | float,
+        max_input_per_tick: int | None = None,
+        history: int | None = None,
+    ):
+        super().__init__(every=every, strict=True)
+        if max_input_per_tick is not None:
+            self.max_input_per_tick = max_input_per_tick
+        if history is not None:
+            self.history = history
+        self.callback = self.run_tick
+        self.systems = []
+        self.ticks = 0
+        self.overruns = 0
+        self.durations = deque(maxlen=self.history)
+        self._pending = {}
+        self._tick_done = None
+
+    def __str__(self):
+        return f"TickTimer({self.every})"
+
+    def __call__(self, system: SystemType) -> SystemType:  # type: ignore[override]
+        return self.add_system(system)
+
+    def add_system(self, system: SystemType) -> SystemType:
+        """
+        Add a function to call on each tick, after the systems already added
+
+        The function is passed the tick timer. Can be used as a decorator.
+        """
+        logger.debug(f"Tick {self} added system {system.__name__}")
+        self.systems.append(system)
+        return system
+
+    def remove_system(self, system: SystemType):
+        self.systems.remove(system)
+
+    async def receive(self, client: AbstractClient, data: Any):
+        """
+        Hold input from a client until the next tick
+
+        Waits for the tick while the client has ``max_pending`` inputs held, so reading
+        from the client's connection is paused.
+        """
+        pending = self._pending.get(client)
+        if pending is None:
+            pending = self._pending[client] = []
+        pending.append(data)
+        while len(pending) >= self.max_pending and client.connected:
+            if self._tick_done is None:
+                self._tick_done = asyncio.Event()
+            await self._tick_done.wait()
+            pending = self._pending.get(client, [])
+
+    def pending(self, client: AbstractClient) -> int:
+        """
+        Number of inputs held for a client
+        """
+        return len(self._pending.get(client, ()))
+
+    async def run_tick(self, timer: AbstractTimer):
+        """
+        Dispatch held input then run the systems
+        """
+        started = self.app.scheduler.time()
+        self.ticks += 1
+        await self._dispatch_input()
+
+        for system in list(self.systems):
+            try:
+                result = system(self)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception(f"Tick {self} system {system.__name__} failed")
+
+        tick_done = self._tick_done
+        if tick_done is not None:
+            self._tick_done = None
+            tick_done.set()
+
+        duration = self.app.scheduler.time() - started
+        self.durations.append(duration)
+        if duration > self.every:
+            self.overruns += 1
+            logger.warning(
+                f"Tick {self} overran: {duration * 1000:.1f}ms,"
+                f" {self.every * 1000:.1f}ms allowed"
+            )
+            await self.app.events.trigger(TickOverrun(self, duration))
+
+    async def _dispatch_input(self):
+        """
+        Trigger ``Receive`` for the input each client sent since the last tick
+        """
+        pending = self._pending
+        limit = self.max_input_per_tick
+        trigger = self.app.events.trigger
+        for client in list(pending):
+            batch = pending[client]
+            if not client.connected:
+                del pending[client]
+                continue
+
+            if limit is None or len(batch) <= limit:
+                del pending[client]
+            else:
+                # Input arriving during the tick waits behind the rest of the batch
+                batch, pending[client] = batch[:limit], batch[limit:]
+
+            for data in batch:
+                if not client.connected:
+                    break
+                await trigger(Receive(client, data))
+
+    def percentiles(self, *percents: float) -> list[float]:
+        """
+        Return tick durations at the given percentiles of recent ticks, eg
+        ``percentiles(50, 99)``
+        """
+        if not self.durations:
+            return [0.0 for _ in percents]
+        durations = sorted(self.durations)
+        last = len(durations) - 1
+        return [durations[round(last * percent / 100)] for percent in percents]
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Return the tick's counters and recent durations
+        """
+        p50, p90, p99 = self.percentiles(50, 90, 99)
+        return {
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "pending": sum(len(batch) for batch in self._pending.values()),
+            "p50": p50,
+            "p90": p90,
+            "p99": p99,
+            "max": max(self.durations, default=0.0),
+        }
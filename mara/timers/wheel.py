@@ -0,0 +1,344 @@
+"""
+Hierarchical timer wheel
+"""
+from __future__ import annotations
+
+import logging
+import math
+from typing import TYPE_CHECKING, Any, Callable
+
+
+if TYPE_CHECKING:
+    from .clock import AbstractClock, Cancellable
+
+
+logger = logging.getLogger("mara.timer")
+
+# Each level of the wheel has 64 slots
+SLOT_BITS = 6
+SLOTS = 1 << SLOT_BITS
+SLOT_MASK = SLOTS - 1
+ALL_SLOTS = (1 << SLOTS) - 1
+
+
+class TimerHandle:
+    """
+    A callback scheduled on a ``TimerWheel``
+
+    Returned by ``TimerWheel.call_at()`` and ``TimerWheel.call_later()``, and can be
+    used to cancel the callback.
+    """
+
+    __slots__ = (
+        "wheel",
+        "when",
+        "tick",
+        "callback",
+        "args",
+        "_slot",
+        "_level",
+        "_index",
+    )
+
+    wheel: TimerWheel
+    #: Time the callback is due, on the wheel's clock
+    when: float
+    #: Tick of the wheel the callback is due
+    tick: int
+    callback: Callable[..., Any]
+    args: tuple
+    _slot: dict[TimerHandle, None] | None
+    _level: int
+    _index: int
+
+    def __init__(
+        self,
+        wheel: TimerWheel,
+        when: float,
+        tick: int,
+        callback: Callable[..., Any],
+        args: tuple,
+    ):
+        self.wheel = wheel
+        self.when = when
+        self.tick = tick
+        self.callback = callback
+        self.args = args
+        self._slot = None
+
+    def __repr__(self):
+        name = getattr(self.callback, "__name__", repr(self.callback))
+        return f"<TimerHandle {name} at {self.when:.3f}>"
+
+    @property
+    def scheduled(self) -> bool:
+        """
+        Whether the callback is still waiting to be called
+        """
+        return self._slot is not None
+
+    def cancel(self):
+        """
+        Stop the callback from being called
+        """
+        slot = self._slot
+        if slot is not None:
+            del slot[self]
+            self._slot = None
+            wheel = self.wheel
+            wheel._count -= 1
+            if not slot and wheel._slots[self._level][self._index] is slot:
+                wheel._occupied[self._level] &= ~(1 << self._index)
+
+
+class TimerWheel:
+    """
+    Schedule callbacks using a hierarchical timing wheel
+
+    Time is divided into ticks of ``resolution`` seconds. The wheel has several levels
+    of 64 slots: the first level holds callbacks due in the next 64 ticks, the second
+    those due in the next 64 * 64 ticks, and so on. As time reaches the start of a slot
+    in a higher level, its callbacks are moved down to the level below, until they
+    reach the first level and are called.
+
+    Scheduling and cancelling a callback take constant time, however many callbacks
+    are scheduled. Callbacks are not called before their tick, but may be called up to
+    one tick late; callbacks due in the same tick are called in the order they were
+    scheduled.
+
+    The wheel runs on a clock - normally the loop's monotonic clock - and only sets one
+    timer on the clock, for the next tick with something to do.
+    """
+
+    #: Seconds per tick
+    resolution: float
+
+    #: Number of levels. Callbacks due after the last level are moved along the last
+    #: level until they are in range.
+    levels: int = 5
+
+    clock: AbstractClock | None
+
+    #: Whether the wheel has been started and not stopped
+    running: bool
+    _origin: float
+    _tick: int
+    _count: int
+    _slots: list[list[dict[TimerHandle, None]]]
+    # Bitmap of the slots in each level which hold handles
+    _occupied: list[int]
+    _wakeup: Cancellable | None
+    _wakeup_tick: int | None
+
+    def __init__(self, resolution: float = 0.01):
+        self.resolution = resolution
+        self.clock = None
+        self.running = False
+        self._origin = 0
+        self._tick = 0
+        self._count = 0
+        self._slots = [[{} for _ in range(SLOTS)] for _ in range(self.levels)]
+        self._occupied = [0] * self.levels
+        self._wakeup = None
+        self._wakeup_tick = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def start(self, clock: AbstractClock):
+        """
+        Start the wheel on a clock, such as a ``LoopClock``
+        """
+        self.clock = clock
+        self.running = True
+        self._origin = clock.time()
+        self._tick = 0
+
+    def stop(self):
+        """
+        Cancel all scheduled callbacks and stop the wheel
+        """
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+            self._wakeup_tick = None
+        for level in self._slots:
+            for slot in level:
+                for handle in slot:
+                    handle._slot = None
+                slot.clear()
+        self._occupied = [0] * self.levels
+        self._count = 0
+        self.running = False
+
+    def time(self) -> float:
+        """
+        Return the current time on the wheel's clock
+        """
+        if self.clock is None:
+            raise ValueError("Timer wheel has not been started")
+        return self.clock.time()
+
+    def call_later(
+        self, delay: float, callback: Callable[..., Any], *args
+    ) -> TimerHandle:
+        """
+        Call ``callback(*args)`` after ``delay`` seconds
+        """
+        return self.call_at(self.time() + delay, callback, *args)
+
+    def call_at(self, when: float, callback: Callable[..., Any], *args) -> TimerHandle:
+        """
+        Call ``callback(*args)`` at ``when`` on the wheel's clock
+        """
+        if not self.running:
+            raise ValueError("Timer wheel is not running")
+
+        if not self._count:
+            # Nothing is positioned relative to the current tick, so catch up
+            self._tick = self._now_tick()
+
+        # Round up, so callbacks are never called early
+        tick = math.ceil((when - self._origin) / self.resolution - 1e-9)
+        handle = TimerHandle(self, when, tick, callback, args)
+        self._insert(handle, self._tick + 1)
+        self._count += 1
+
+        if self._wakeup_tick is None or handle.tick < self._wakeup_tick:
+            self._set_wakeup()
+        return handle
+
+    def _now_tick(self) -> int:
+        if self.clock is None:
+            raise ValueError("Timer wheel is not running")
+        return math.floor((self.clock.time() - self._origin) / self.resolution + 1e-9)
+
+    def _insert(self, handle: TimerHandle, earliest: int):
+        """
+        Put the handle into the slot for its tick, or for the earliest tick it can be
+        called if it is already due
+        """
+        tick = max(handle.tick, earliest)
+        delta = tick - self._tick
+
+        level = 0
+        while delta >= SLOTS << (SLOT_BITS * level):
+            level += 1
+            if level == self.levels - 1:
+                # Too far ahead for the wheel, hold it in the last slot in range
+                limit = (SLOTS << (SLOT_BITS * level)) - 1
+                tick = min(tick, self._tick + limit)
+                break
+
+        index = (tick >> (SLOT_BITS * level)) & SLOT_MASK
+        slot = self._slots[level][index]
+        slot[handle] = None
+        handle._slot = slot
+        handle._level = level
+        handle._index = index
+        self._occupied[level] |= 1 << index
+
+    def _next_tick(self) -> int | None:
+        """
+        Find the next tick where a slot needs to be called or moved down a level
+        """
+        current = self._tick
+        found = None
+        for level, occupied in enumerate(self._occupied):
+            if not occupied:
+                continue
+            shift = SLOT_BITS * level
+            rotation = (current >> shift) & ~SLOT_MASK
+            position = (current >> shift) & SLOT_MASK
+
+            # Rotate the bitmap so the slot after the current one is the lowest bit,
+            # then the lowest set bit is the next occupied slot
+            start = position + 1
+            rotated = ((occupied >> start) | (occupied << (SLOTS - start))) & ALL_SLOTS
+            offset = (rotated & -rotated).bit_length()
+
+            tick = (rotation + position + offset) << shift
+            if found is None or tick < found:
+                found = tick
+        return found
+
+    def _set_wakeup(self):
+        """
+        Set a timer on the clock for the next tick with something to do
+        """
+        clock = self.clock
+        if clock is None or not self.running:
+            return
+
+        tick = self._next_tick()
+        if tick == self._wakeup_tick:
+            return
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        self._wakeup_tick = tick
+        if tick is not None:
+            when = self._origin + tick * self.resolution
+            self._wakeup = clock.call_at(when, self._advance)
+
+    def _advance(self):
+        """
+        Call everything due up to now
+        """
+        target = self._wakeup_tick
+        self._wakeup = None
+        self._wakeup_tick = None
+        if not self.running:
+            return
+
+        # The clock can wake us slightly early, and the clock can be too coarse to
+        # resolve the tick far from the origin, so always reach the tick we woke for
+        now = self._now_tick()
+        if target is not None and target > now:
+            now = target
+        while True:
+            tick = self._next_tick()
+            if tick is None or tick > now:
+                break
+            self._run_tick(tick)
+        self._set_wakeup()
+
+    def _run_tick(self, tick: int):
+        """
+        Move to the tick, moving down higher levels and calling what is due
+        """
+        self._tick = tick
+        for level in range(self.levels - 1, 0, -1):
+            shift = SLOT_BITS * level
+            if tick & ((1 << shift) - 1):
+                continue
+            index = (tick >> shift) & SLOT_MASK
+            slot = self._slots[level][index]
+            if slot:
+                self._slots[level][index] = {}
+                self._occupied[level] &= ~(1 << index)
+                for handle in slot:
+                    # Anything due now goes into this tick's slot, called below
+                    self._insert(handle, tick)
+
+        index = tick & SLOT_MASK
+        slot = self._slots[0][index]
+        if not slot:
+            return
+        # Swap in a new slot, so callbacks can schedule into it or cancel this batch
+        self._slots[0][index] = {}
+        self._occupied[0] &= ~(1 << index)
+        for handle in list(slot):
+            if handle._slot is not slot:
+                # Cancelled by an earlier callback
+                continue
+            if handle.tick > tick:
+                # Held back because it was out of range; move it along
+                self._insert(handle, tick + 1)
+                continue
+            handle._slot = None
+            self._count -= 1
+            try:
+                handle.callback(*handle.args)
+            except Exception:
+                logger.exception(f"Timer callback {handle} failed")
@@ -0,0 +1,391 @@
+import asyncio
+import functools
+import logging
+
+from mara import App, events
+
+
+class Tagged(events.Event):
+    "Tagged event"
+
+    def __init__(self, tag, colour=None):
+        super().__init__()
+        self.tag = tag
+        self.colour = colour
+
+
+async def test_trigger__handlers_called_in_order():
+    app = App()
+    called = []
+
+    @app.listen(Tagged)
+    async def first(event):
+        called.append("first")
+
+    @app.listen(events.Event)
+    async def second(event):
+        called.append("second")
+
+    await app.events.trigger(Tagged("a"))
+    assert called == ["first", "second"]
+
+
+async def test_trigger__filter_mismatch_skips_only_that_handler():
+    app = App()
+    called = []
+
+    @app.listen(Tagged, tag="a")
+    async def only_a(event):
+        called.append("a")
+
+    @app.listen(Tagged)
+    async def always(event):
+        called.append("always")
+
+    await app.events.trigger(Tagged("b"))
+    assert called == ["always"]
+
+
+async def test_trigger__indexed_filters_respect_registration_order():
+    app = App()
+    called = []
+
+    @app.listen(Tagged, tag="a")
+    async def a1(event):
+        called.append("a1")
+
+    @app.listen(Tagged)
+    async def any1(event):
+        called.append("any1")
+
+    @app.listen(Tagged, tag="b")
+    async def b1(event):
+        called.append("b1")
+
+    @app.listen(Tagged, tag="a", colour="red")
+    async def a_red(event):
+        called.append("a_red")
+
+    @app.listen(Tagged, colour="red")
+    async def red(event):
+        called.append("red")
+
+    await app.events.trigger(Tagged("a", colour="red"))
+    assert called == ["a1", "any1", "a_red", "red"]
+
+    called.clear()
+    await app.events.trigger(Tagged("a", colour="blue"))
+    assert called == ["a1", "any1"]
+
+
+async def test_trigger__unhashable_filter_value():
+    app = App()
+    called = []
+
+    @app.listen(Tagged, tag=["x"])
+    async def listed(event):
+        called.append("listed")
+
+    await app.events.trigger(Tagged(["x"]))
+    await app.events.trigger(Tagged("x"))
+    assert called == ["listed"]
+
+
+async def test_listen__at_runtime_invalidates_plan():
+    app = App()
+    called = []
+
+    @app.listen(Tagged)
+    async def first(event):
+        called.append("first")
+
+    await app.events.trigger(Tagged("a"))
+
+    @app.listen(events.Event)
+    async def late(event):
+        called.append("late")
+
+    await app.events.trigger(Tagged("a"))
+    assert called == ["first", "first", "late"]
+
+
+async def test_trigger__stop():
+    app = App()
+    called = []
+
+    @app.listen(Tagged)
+    async def stopper(event):
+        called.append("stopper")
+        event.stop()
+
+    @app.listen(Tagged)
+    async def never(event):
+        called.append("never")
+
+    await app.events.trigger(Tagged("a"))
+    assert called == ["stopper"]
+
+
+async def test_subscribe__remove():
+    app = App()
+    called = []
+
+    async def handler(event):
+        called.append(event.tag)
+
+    listener = app.subscribe(events.Event, handler, tag="a")
+    await app.events.trigger(Tagged("a"))
+    listener.remove()
+    await app.events.trigger(Tagged("a"))
+
+    assert called == ["a"]
+    assert not listener.active
+    assert not any(app.events.events.values())
+
+
+async def test_unlisten__removes_from_subclasses():
+    app = App()
+    called = []
+
+    @app.listen(events.Client)
+    async def handler(event):
+        called.append(event)
+
+    @app.listen(events.Client)
+    async def other(event):
+        called.append("other")
+
+    # Build the plan before removing
+    await app.events.trigger(events.Connect(None))
+    app.unlisten(events.Client, handler)
+    await app.events.trigger(events.Connect(None))
+
+    assert called[1:] == ["other", "other"]
+    assert handler not in app.events._handlers
+
+
+async def test_remove__during_dispatch():
+    app = App()
+    called = []
+
+    async def first(event):
+        called.append("first")
+        second_listener.remove()
+
+    async def second(event):
+        called.append("second")
+
+    app.subscribe(Tagged, first)
+    second_listener = app.subscribe(Tagged, second)
+
+    await app.events.trigger(Tagged("a"))
+    assert called == ["first"]
+
+
+async def test_concurrent__handlers_overlap_and_barrier_waits():
+    app = App()
+    called = []
+    release = asyncio.Event()
+
+    @app.listen(Tagged, concurrent=True)
+    async def slow(event):
+        called.append("slow start")
+        await release.wait()
+        called.append("slow end")
+
+    @app.listen(Tagged, concurrent=True)
+    async def fast(event):
+        called.append("fast")
+        release.set()
+
+    @app.listen(Tagged)
+    async def after(event):
+        called.append("after")
+
+    await app.events.trigger(Tagged("a"))
+    assert called == ["slow start", "fast", "slow end", "after"]
+
+
+async def test_concurrent__event_class_default():
+    class Parallel(Tagged):
+        "Parallel event"
+        concurrent = True
+
+    app = App()
+    called = []
+    release = asyncio.Event()
+
+    @app.listen(Parallel)
+    async def first(event):
+        await release.wait()
+        called.append("first")
+
+    @app.listen(Parallel)
+    async def second(event):
+        called.append("second")
+        release.set()
+
+    await app.events.trigger(Parallel("a"))
+    assert called == ["second", "first"]
+
+
+async def test_concurrent__stop_prevents_later_batches():
+    app = App()
+    called = []
+
+    @app.listen(Tagged, concurrent=True)
+    async def stopper(event):
+        called.append("stopper")
+        event.stop()
+
+    @app.listen(Tagged, concurrent=True)
+    async def sibling(event):
+        called.append("sibling")
+
+    @app.listen(Tagged)
+    async def never(event):
+        called.append("never")
+
+    await app.events.trigger(Tagged("a"))
+    assert called == ["stopper", "sibling"]
+
+
+class Counted(Tagged):
+    "Counted event"
+
+    formatted = 0
+
+    def __str__(self):
+        Counted.formatted += 1
+        return super().__str__()
+
+
+async def test_log__sample_rate(caplog):
+    class Sampled(Tagged):
+        "Sampled event"
+        log_sample_rate = 0.25
+
+    app = App()
+    with caplog.at_level(logging.INFO, logger="mara.event"):
+        for i in range(8):
+            await app.events.trigger(Sampled(i))
+
+    records = [record for record in caplog.records if record.name == "mara.event"]
+    assert len(records) == 2
+    assert records[0].event_class == "Sampled"
+    assert records[0].event.tag == 3
+
+
+async def test_log__not_formatted_when_level_disabled(caplog):
+    app = App()
+    Counted.formatted = 0
+    with caplog.at_level(logging.WARNING, logger="mara.event"):
+        await app.events.trigger(Counted("a"))
+    assert Counted.formatted == 0
+
+
+async def test_sync__called_in_order_without_coroutine():
+    app = App()
+    called = []
+
+    @app.listen(Tagged)
+    def first(event):
+        called.append("first")
+
+    @app.listen(Tagged)
+    async def second(event):
+        called.append("second")
+
+    @app.listen(Tagged)
+    def third(event):
+        called.append("third")
+        event.stop()
+
+    @app.listen(Tagged)
+    def stopped(event):
+        called.append("stopped")
+
+    listeners = app.events.events[Tagged]
+    assert [listener.sync for listener in listeners] == [True, False, True, True]
+
+    await app.events.trigger(Tagged("a"))
+    assert called == ["first", "second", "third"]
+
+
+async def test_sync__async_callable_object_detected():
+    called = []
+
+    class Handler:
+        async def __call__(self, event):
+            called.append(event.tag)
+
+    app = App()
+    listener = app.subscribe(Tagged, Handler())
+    assert not listener.sync
+
+    await app.events.trigger(Tagged("a"))
+    assert called == ["a"]
+
+
+async def test_sync__awaitable_result_awaited():
+    app = App()
+    called = []
+
+    async def handler(event):
+        await asyncio.sleep(0)
+        called.append(event.tag)
+
+    @functools.wraps(handler)
+    def wrapper(event):
+        return handler(event)
+
+    wrapped = app.subscribe(Tagged, wrapper)
+    wrapped_lambda = app.subscribe(Tagged, lambda event: handler(event))
+    app.subscribe(Tagged, wrapper, concurrent=True)
+    assert wrapped.sync
+    assert wrapped_lambda.sync
+
+    await app.events.trigger(Tagged("a"))
+    assert called == ["a", "a", "a"]
+
+
+async def test_sync__in_concurrent_batch():
+    app = App()
+    called = []
+
+    @app.listen(Tagged, concurrent=True)
+    async def slow(event):
+        await asyncio.sleep(0)
+        called.append("slow")
+
+    @app.listen(Tagged, concurrent=True)
+    def quick(event):
+        called.append("quick")
+
+    @app.listen(Tagged)
+    def after(event):
+        called.append("after")
+
+    await app.events.trigger(Tagged("a"))
+    assert called == ["quick", "slow", "after"]
+
+
+async def test_sync__stop_in_concurrent_batch():
+    app = App()
+    called = []
+
+    @app.listen(Tagged, concurrent=True)
+    async def registered_first(event):
+        called.append("async")
+
+    @app.listen(Tagged, concurrent=True)
+    def stopper(event):
+        called.append("stopper")
+        event.stop()
+
+    @app.listen(Tagged, concurrent=True)
+    def after(event):
+        called.append("after")
+
+    await app.events.trigger(Tagged("a"))
+    assert called == ["stopper"]
@@ -0,0 +1,73 @@
+import asyncio
+import importlib.util
+import sys
+
+import pytest
+
+from mara import App, events
+from mara.app import loop as loops
+
+
+HAS_UVLOOP = importlib.util.find_spec("uvloop") is not None
+
+
+def test_app__loop_factory__used():
+    created = []
+
+    def factory():
+        loop = asyncio.new_event_loop()
+        created.append(loop)
+        return loop
+
+    app = App(loop_factory=factory)
+    seen = []
+
+    @app.listen(events.PostStart)
+    async def stop(event):
+        seen.append(asyncio.get_running_loop())
+        event.app.stop()
+
+    app.run()
+    assert len(created) == 2  # app loop, then PostStop
+    assert seen == created[:1]
+    assert created[0].is_closed()
+
+
+@pytest.mark.skipif(sys.version_info < (3, 12), reason="Eager tasks need 3.12")
+def test_new_loop__eager_tasks():
+    loop = loops.new_loop(loops.asyncio_loop)
+    assert loop.get_task_factory() is asyncio.eager_task_factory
+    loop.close()
+
+    loop = loops.new_loop(loops.asyncio_loop, eager_tasks=False)
+    assert loop.get_task_factory() is None
+    loop.close()
+
+
+@pytest.mark.skipif(HAS_UVLOOP, reason="uvloop is installed")
+def test_default_loop__without_uvloop__asyncio():
+    with pytest.raises(ImportError):
+        loops.uvloop_loop()
+
+    loop = loops.default_loop()
+    assert isinstance(loop, asyncio.BaseEventLoop)
+    loop.close()
+
+
+def test_run__cancels_remaining_tasks():
+    cancelled = []
+
+    async def forever():
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def main():
+        asyncio.get_running_loop().create_task(forever())
+        await asyncio.sleep(0)
+        return "done"
+
+    assert loops.run(main(), loops.asyncio_loop) == "done"
+    assert cancelled == [True]
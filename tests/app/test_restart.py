@@ -0,0 +1,173 @@
+import asyncio
+import socket
+import threading
+
+import pytest
+
+from mara import App, events
+from mara.servers.protocol import BufferedSocketProtocol
+from mara.servers.socket import TextServer
+
+from ..fixtures.client import SocketClient
+from ..fixtures.constants import TEST_HOST, TEST_PORT
+from ..fixtures.harness import AppHarness
+
+
+PORT = TEST_PORT + 60
+
+
+def make_app(protocol_class, connects, spawn=None):
+    app = App()
+    server = app.add_server(TextServer(host=TEST_HOST, port=PORT))
+    server.protocol_class = protocol_class
+
+    @app.listen(events.Connect)
+    async def connect(event):
+        connects.append(event.client)
+
+    @app.listen(events.Receive)
+    async def receive(event):
+        if event.data == "restart":
+            await app.restart(spawn)
+            return
+        session = event.client.session
+        session["count"] = session.get("count", 0) + 1
+        event.client.write(f"{event.data} {session['count']}")
+
+    return app
+
+
+def make_spawn(new, new_harness):
+    def spawn(sock):
+        # The new app waits for the handoff before it is running, so start it without
+        # blocking the old app
+        new.restart_fd = sock.detach()
+        threading.Thread(target=new_harness.run, args=(new,), daemon=True).start()
+
+    return spawn
+
+
+def listen(port):
+    sock = socket.socket()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((TEST_HOST, port))
+    sock.listen()
+    return sock
+
+
+@pytest.mark.parametrize("protocol_class", [None, BufferedSocketProtocol])
+def test_restart__client_kept(protocol_class):
+    old_connects, new_connects = [], []
+    old = make_app(protocol_class, old_connects)
+    new = make_app(protocol_class, new_connects)
+    restarted = threading.Event()
+
+    @new.listen(events.PostRestart)
+    async def post_restart(event):
+        restarted.set()
+
+    old_harness = AppHarness("old")
+    new_harness = AppHarness("new")
+
+    spawn = make_spawn(new, new_harness)
+
+    old_harness.run(old)
+
+    client = SocketClient("restart")
+    client.connect(TEST_HOST, PORT)
+    client.write(b"one\r\n")
+    assert client.read_line() == b"one 1"
+
+    future = asyncio.run_coroutine_threadsafe(old.restart(spawn), old.loop)
+    future.result(timeout=5)
+    old_harness.thread.join(timeout=5)
+    assert not old_harness.thread.is_alive()
+    assert restarted.wait(timeout=5)
+
+    # Same connection and session, without a new Connect event
+    client.write(b"two\r\n")
+    assert client.read_line() == b"two 2"
+    assert len(old_connects) == 1
+    assert new_connects == []
+    assert len(new.clients) == 1
+
+    # New connections go to the new process
+    other = SocketClient("restart:other")
+    other.connect(TEST_HOST, PORT)
+    other.write(b"three\r\n")
+    assert other.read_line() == b"three 1"
+    assert len(new_connects) == 1
+
+    client.close()
+    other.close()
+    new_harness.stop()
+
+
+def test_restart__from_handler():
+    new_connects = []
+    new = make_app(None, new_connects)
+    new_harness = AppHarness("new")
+    old = make_app(None, [], spawn=make_spawn(new, new_harness))
+    restarted = threading.Event()
+
+    @new.listen(events.PostRestart)
+    async def post_restart(event):
+        restarted.set()
+
+    old_harness = AppHarness("old")
+    old_harness.run(old)
+
+    client = SocketClient("restart")
+    client.connect(TEST_HOST, PORT)
+    client.write(b"one\r\n")
+    assert client.read_line() == b"one 1"
+
+    # The handoff carries on after the handler's task is cancelled
+    client.write(b"restart\r\n")
+    old_harness.thread.join(timeout=5)
+    assert not old_harness.thread.is_alive()
+    assert restarted.wait(timeout=5)
+
+    client.write(b"two\r\n")
+    assert client.read_line() == b"two 2"
+    assert new_connects == []
+
+    other = SocketClient("restart:other")
+    other.connect(TEST_HOST, PORT)
+    other.write(b"three\r\n")
+    assert other.read_line() == b"three 1"
+
+    client.close()
+    other.close()
+    new_harness.stop()
+
+
+def test_restart__all_listening_sockets_passed():
+    old = make_app(None, [])
+    new = make_app(None, [])
+    old.servers[0].sockets = [listen(PORT + 1), listen(PORT + 2)]
+    restarted = threading.Event()
+
+    @new.listen(events.PostRestart)
+    async def post_restart(event):
+        restarted.set()
+
+    old_harness = AppHarness("old")
+    new_harness = AppHarness("new")
+    old_harness.run(old)
+
+    future = asyncio.run_coroutine_threadsafe(
+        old.restart(make_spawn(new, new_harness)), old.loop
+    )
+    future.result(timeout=5)
+    old_harness.thread.join(timeout=5)
+    assert restarted.wait(timeout=5)
+
+    assert len(new.servers[0].sockets) == 2
+    for port in (PORT + 1, PORT + 2):
+        client = SocketClient(f"restart:{port}")
+        client.connect(TEST_HOST, port)
+        client.write(b"hello\r\n")
+        assert client.read_line() == b"hello 1"
+        client.close()
+    new_harness.stop()
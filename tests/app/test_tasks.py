@@ -0,0 +1,114 @@
+import asyncio
+
+from mara import App, events
+from mara.app.tasks import TaskRegistry
+from mara.clients import AbstractClient
+from mara.servers import AbstractServer
+from mara.servers.socket import TextServer
+from mara.timers import PeriodicTimer
+
+from ..fixtures.client import SocketClient
+from ..fixtures.constants import TEST_HOST, TEST_PORT
+from ..fixtures.harness import AppHarness
+
+
+class QueueClient(AbstractClient[str]):
+    pass
+
+
+class StuckClient(AbstractClient[str]):
+    """
+    Client whose outbound queue never drains
+    """
+
+    async def flush(self):
+        await asyncio.sleep(60)
+
+
+async def test_registry__grouped_by_owner():
+    server = AbstractServer()
+    client = QueueClient(server)
+    timer = PeriodicTimer(every=1)
+    registry = TaskRegistry()
+    gate = asyncio.Event()
+
+    tasks = []
+    for owner in [None, server, client, client, timer]:
+        task = asyncio.create_task(gate.wait())
+        registry.add(task, owner)
+        tasks.append(task)
+
+    assert len(registry) == 5
+    assert registry.counts() == {"app": 1, "server": 1, "client": 2, "timer": 1}
+    assert set(registry.of(client)) == set(tasks[2:4])
+
+    cancelled = registry.cancel(client)
+    await asyncio.gather(*cancelled, return_exceptions=True)
+    assert registry.counts() == {"app": 1, "server": 1, "timer": 1}
+    assert registry.of(client) == []
+
+    gate.set()
+    await asyncio.gather(*tasks[:2], tasks[4])
+    await asyncio.sleep(0)
+    assert len(registry) == 0
+    assert registry.owners() == []
+
+
+def test_shutdown__final_messages_sent():
+    app = App()
+    app.add_server(TextServer(host=TEST_HOST, port=TEST_PORT + 70))
+
+    @app.listen(events.Receive)
+    async def flood(event):
+        for i in range(1000):
+            event.client.write(f"line {i}")
+        event.app.stop()
+
+    @app.listen(events.PreStop)
+    async def goodbye(event):
+        for client in event.app.clients:
+            client.write("Goodbye")
+
+    harness = AppHarness("shutdown")
+    harness.run(app)
+    client = SocketClient("shutdown")
+    client.connect(TEST_HOST, TEST_PORT + 70)
+    client.write(b"go\r\n")
+
+    received = b""
+    while chunk := client.read(65536):
+        received += chunk
+    lines = received.split(b"\r\n")
+    assert lines[-3:] == [b"line 999", b"Goodbye", b""]
+    assert len(lines) == 1002
+    client.close()
+    harness.thread.join(timeout=5)
+
+    assert list(app.shutdown_timings) == [
+        "prestop",
+        "stop_accepting",
+        "flush",
+        "close",
+        "cancel",
+    ]
+    assert len(app.tasks) == 0
+
+
+def test_shutdown__deadline():
+    app = App()
+    app.shutdown_timeout = 0.1
+    server = AbstractServer()
+    app.add_server(server)
+
+    @app.listen(events.PostStart)
+    async def start(event):
+        client = StuckClient(server)
+        app.clients.add(client)
+        app.create_task(asyncio.sleep(60), owner=client)
+        app.stop()
+
+    app.run()
+    timings = app.shutdown_timings
+    assert 0.05 < timings["flush"] < 0.5
+    assert sum(timings.values()) < 1
+    assert len(app.tasks) == 0
@@ -0,0 +1,92 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import textwrap
+import time
+from pathlib import Path
+
+import pytest
+
+import mara
+
+from ..fixtures.constants import TEST_HOST, TEST_PORT
+
+
+PORT = TEST_PORT + 50
+
+APP = textwrap.dedent(
+    f"""
+    import os
+    import sys
+
+    from mara import App, events
+    from mara.servers.socket import TextServer
+
+    log = open(sys.argv[1], "a", buffering=1)
+    app = App()
+    app.add_server(TextServer(host="{TEST_HOST}", port={PORT}))
+
+    @app.listen(events.PreStart)
+    async def start(event):
+        log.write(f"start worker={{event.worker}} master={{event.master}}\\n")
+
+    @app.listen(events.PostStop, master=True)
+    async def stop(event):
+        log.write("stop master\\n")
+
+    @app.listen(events.Receive)
+    async def echo(event):
+        if event.data == "crash":
+            os._exit(1)
+        event.client.write(f"{{event.app.worker}}: {{event.data}}")
+
+    app.run(workers=2)
+    """
+)
+
+
+def send(line: bytes) -> bytes:
+    for _ in range(50):
+        try:
+            conn = socket.create_connection((TEST_HOST, PORT), timeout=5)
+            break
+        except ConnectionRefusedError:
+            time.sleep(0.1)
+    else:
+        raise RuntimeError("Could not connect")
+
+    with conn:
+        conn.sendall(line + b"\r\n")
+        return conn.recv(1024)
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGHUP"), reason="Requires POSIX")
+def test_workers__restart_and_stop(tmp_path):
+    script = tmp_path / "app.py"
+    script.write_text(APP)
+    log = tmp_path / "log.txt"
+    env = {**os.environ, "PYTHONPATH": str(Path(mara.__file__).parent.parent)}
+    process = subprocess.Popen([sys.executable, str(script), str(log)], env=env)
+    try:
+        assert send(b"hello").endswith(b": hello\r\n")
+
+        # Crashed worker is restarted
+        send(b"crash")
+        time.sleep(1.5)
+        assert send(b"again").endswith(b": again\r\n")
+
+        process.send_signal(signal.SIGTERM)
+        assert process.wait(timeout=10) == 0
+    finally:
+        process.kill()
+
+    lines = log.read_text().splitlines()
+    assert lines[0] == "start worker=None master=True"
+    assert sorted(lines[1:3]) == [
+        "start worker=0 master=False",
+        "start worker=1 master=False",
+    ]
+    assert len([line for line in lines if line.startswith("start worker=")]) == 4
+    assert lines[-1] == "stop master"
@@ -0,0 +1,156 @@
+import asyncio
+import pickle
+
+import pytest
+
+from mara import App, events
+from mara.bus import UnixBus
+from mara.clients import AbstractClient
+from mara.servers import AbstractServer
+
+
+class Shout(events.Event):
+    "Shout"
+
+    __slots__ = ("message",)
+    relay = True
+
+    def __init__(self, message):
+        super().__init__()
+        self.message = message
+
+
+class QueueClient(AbstractClient[str]):
+    pass
+
+
+@pytest.fixture
+def broker():
+    bus = UnixBus()
+    bus.start()
+    yield bus
+    bus.stop()
+
+
+async def make_worker(broker):
+    app = App()
+    app.loop = asyncio.get_running_loop()
+    server = AbstractServer()
+    server.app = app
+    app.servers.append(server)
+
+    app.bus = UnixBus(path=broker.path)
+    await app.bus.connect(app)
+    return app
+
+
+async def wait_for(condition):
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("Timed out")
+
+
+def test_event__pickle__drops_app():
+    event = Shout("hello")
+    event.app = App()
+    event.extra = "added by handler"
+
+    copy = pickle.loads(pickle.dumps(event))
+    assert copy.message == "hello"
+    assert copy.extra == "added by handler"
+    assert copy.app is None
+
+
+async def test_event__relayed_to_other_workers(broker):
+    apps = [await make_worker(broker) for _ in range(3)]
+    received = {id(app): [] for app in apps}
+    for app in apps:
+
+        @app.listen(Shout)
+        async def shout(event, app=app):
+            received[id(app)].append((event.message, event.relayed))
+
+    await apps[0].events.trigger(Shout("one"))
+    await apps[0].events.trigger(Shout("two"))
+    await wait_for(lambda: all(len(shouts) == 2 for shouts in received.values()))
+
+    assert received[id(apps[0])] == [("one", False), ("two", False)]
+    assert received[id(apps[1])] == [("one", True), ("two", True)]
+    assert received[id(apps[2])] == [("one", True), ("two", True)]
+    for app in apps:
+        await app.bus.close()
+
+
+async def test_event__relayed_before_local_handlers_change_it(broker):
+    sender, other = await make_worker(broker), await make_worker(broker)
+    received = []
+
+    @sender.listen(Shout)
+    async def stop(event):
+        event.message = "changed"
+        event.stop()
+
+    @other.listen(Shout)
+    async def shout(event):
+        received.append(event.message)
+
+    await sender.events.trigger(Shout("one"))
+    await wait_for(lambda: received)
+
+    assert received == ["one"]
+    for app in [sender, other]:
+        await app.bus.close()
+
+
+async def test_connect__ready_once_registered(broker):
+    # Connect returns once the broker will relay to the new worker, so a batch sent
+    # straight away is not lost
+    sender = await make_worker(broker)
+    other = await make_worker(broker)
+    received = []
+
+    @other.listen(Shout)
+    async def shout(event):
+        received.append(event.message)
+
+    sender.bus.publish_event(Shout("first"))
+    await wait_for(lambda: received)
+
+    assert received == ["first"]
+    for app in [sender, other]:
+        await app.bus.close()
+
+
+async def test_publish__batched_per_tick(broker):
+    app = await make_worker(broker)
+    batches = []
+    app.bus.send = batches.append
+
+    app.bus.publish_event(Shout("one"))
+    app.bus.publish_event(Shout("two"))
+    await asyncio.sleep(0)
+
+    assert len(batches) == 1
+    messages = [pickle.loads(event).message for _, event in pickle.loads(batches[0])]
+    assert messages == ["one", "two"]
+
+
+async def test_group_write__relayed(broker):
+    sender, other = await make_worker(broker), await make_worker(broker)
+    local = QueueClient(sender.servers[0])
+    remote = QueueClient(other.servers[0])
+    sender.servers[0].groups.join("lobby", local)
+    other.servers[0].groups.join("lobby", remote)
+
+    sender.servers[0].groups["lobby"].write("hello", exclude=local)
+    await wait_for(lambda: remote.write_queue.qsize())
+
+    assert list(remote.write_queue._queue) == ["hello"]
+    assert local.write_queue.qsize() == 0
+
+    with pytest.raises(ValueError):
+        sender.servers[0].groups["lobby"].write("hello", where=bool)
+    for app in [sender, other]:
+        await app.bus.close()
@@ -0,0 +1,48 @@
+import asyncio
+
+from mara import App, events
+from mara.servers.socket import TextServer
+
+
+def make_app():
+    app = App()
+    server = TextServer()
+    server.inbound_queue_size = 2
+    app.add_server(server)
+
+    @app.listen(events.Connect)
+    async def login(event: events.Connect):
+        event.client.write("Username: ", end="")
+        event.client.session.username = await event.client.read()
+        event.client.write(f"Welcome {event.client.session.username}")
+
+    @app.listen(events.Receive)
+    async def slow_echo(event: events.Receive):
+        if event.data == "wait":
+            await asyncio.sleep(0.2)
+        event.client.write(f"{event.client.session.username}: {event.data}")
+
+    return app
+
+
+def test_capture_read__still_works(app_harness, socket_client_factory):
+    app_harness(make_app())
+    client = socket_client_factory()
+    assert client.read() == b"Username: "
+    client.write(b"alice\r\n")
+    assert client.read_line() == b"Welcome alice"
+    client.write(b"hello\r\n")
+    assert client.read_line() == b"alice: hello"
+
+
+def test_slow_handler__input_is_queued_in_order(app_harness, socket_client_factory):
+    app_harness(make_app())
+    client = socket_client_factory()
+    assert client.read() == b"Username: "
+    client.write(b"alice\r\n")
+    assert client.read_line() == b"Welcome alice"
+
+    # Send more lines than the queue can hold while the handler is busy
+    client.write(b"wait\r\none\r\ntwo\r\nthree\r\nfour\r\n")
+    for expected in [b"wait", b"one", b"two", b"three", b"four"]:
+        assert client.read_line() == b"alice: " + expected
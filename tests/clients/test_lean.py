@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from mara import App, events
+from mara.clients import AbstractClient
+from mara.servers import AbstractServer
+from mara.servers.protocol import BufferedSocketProtocol
+from mara.servers.socket import TextServer
+
+
+class BlockedClient(AbstractClient[bytes]):
+    """
+    Client whose connection can't take data until it is unblocked
+    """
+
+    def __init__(self, server):
+        super().__init__(server)
+        self.blocked = True
+        self.sent = []
+
+    def _write_nowait(self, data):
+        if self.blocked:
+            return False
+        self.sent.append(data)
+        return True
+
+    async def _write_batch(self, batch):
+        self.sent.extend(batch)
+
+
+@pytest.fixture
+async def client():
+    app = App()
+    app.loop = asyncio.get_running_loop()
+    server = AbstractServer()
+    server.app = app
+    server.lean_clients = True
+    return BlockedClient(server)
+
+
+async def test_backpressure__queues_until_drained(client):
+    client.write(b"a")
+    client.write(b"b")
+    assert client.write_task is not None
+    assert client.sent == []
+
+    await client.write_task
+    assert client.sent == [b"a", b"b"]
+    assert client.write_task is None
+
+    client.blocked = False
+    client.write(b"c")
+    assert client.sent == [b"a", b"b", b"c"]
+    assert client.write_task is None
+
+
+def test_client__slots_and_lazy_session():
+    server = TextServer()
+    client = server.client_class(server, reader=None, writer=None)
+    assert not hasattr(client, "__dict__")
+    assert client._session is None
+    assert client._write_queue is None
+
+    client.session["name"] = "Alice"
+    assert client.session.name == "Alice"
+
+
+def test_echo__writes_inline(app_harness, socket_client_factory):
+    app = App()
+    server = TextServer()
+    server.protocol_class = BufferedSocketProtocol
+    server.lean_clients = True
+    app.add_server(server)
+    tasks = []
+
+    @app.listen(events.Receive)
+    async def echo(event: events.Receive):
+        event.client.write(event.data)
+        tasks.append(event.client.write_task)
+
+    app_harness(app)
+    client = socket_client_factory()
+    client.write(b"one\r\n")
+    assert client.read_line() == b"one"
+    client.write(b"two\r\n")
+    assert client.read_line() == b"two"
+    assert tasks[0] is None
@@ -0,0 +1,86 @@
+import time
+
+from mara import App, events
+from mara.clients import AbstractClient, ClientRegistry
+from mara.servers import AbstractServer
+from mara.servers.socket import TextServer
+
+
+class PeerClient(AbstractClient[str]):
+    def __init__(self, server, peer):
+        super().__init__(server)
+        self.peer = peer
+
+    @property
+    def peername(self):
+        return self.peer
+
+
+def make_clients(count):
+    server = AbstractServer()
+    return [PeerClient(server, ("127.0.0.1", 1000 + i)) for i in range(count)]
+
+
+def test_add_remove__lookups():
+    registry = ClientRegistry()
+    one, two, three = make_clients(3)
+    for client in [one, two, three]:
+        registry.add(client)
+
+    registry.discard(two)
+    assert list(registry) == [one, three]
+    assert len(registry) == 2
+    assert two not in registry
+    assert registry.get(three.id) is three
+    assert registry.get(two.id) is None
+    assert registry.get_by_peer(("127.0.0.1", 1002)) is three
+    assert registry.get_by_peer(("127.0.0.1", 1001)) is None
+
+
+def test_discard__unknown_client__ignored():
+    registry = ClientRegistry()
+    (client,) = make_clients(1)
+    registry.discard(client)
+    assert not registry
+
+
+def test_iterate__changes_during_loop__uses_snapshot():
+    registry = ClientRegistry()
+    clients = make_clients(3)
+    for client in clients:
+        registry.add(client)
+
+    seen = []
+    for client in registry:
+        seen.append(client)
+        registry.discard(client)
+        registry.add(*make_clients(1))
+
+    assert seen == clients
+    assert len(registry) == 3
+    assert not any(client in registry for client in clients)
+
+
+def test_app_and_server__share_clients(app_harness, socket_client_factory):
+    app = App()
+    server = app.add_server(TextServer())
+    connected = []
+
+    @app.listen(events.Connect)
+    async def connect(event: events.Connect):
+        connected.append(event.client)
+        event.client.write("hello")
+
+    app_harness(app)
+    client = socket_client_factory()
+    assert client.read_line() == b"hello"
+    assert list(app.clients) == connected
+    assert list(server.clients) == connected
+
+    client.close()
+    for _ in range(100):
+        if not app.clients:
+            break
+        time.sleep(0.01)
+    assert not app.clients
+    assert not server.clients
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from mara import App, events
+from mara.clients import AbstractClient, OverflowPolicy
+from mara.servers import AbstractServer
+
+
+class QueueClient(AbstractClient[bytes]):
+    closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+async def client():
+    app = App()
+    app.loop = asyncio.get_running_loop()
+    server = AbstractServer()
+    server.app = app
+    server.write_queue_max_messages = 3
+    server.write_queue_max_bytes = 10
+    return QueueClient(server)
+
+
+def queued(client):
+    return list(client.write_queue._queue)
+
+
+async def test_under_limit__queued(client):
+    client.write(b"abc")
+    client.write(b"def")
+    assert queued(client) == [b"abc", b"def"]
+    assert client.write_queue_bytes == 6
+    assert client.write_queue_high_water == 2
+    assert client.write_queue_high_water_bytes == 6
+
+
+async def test_drop_oldest(client):
+    overflows = []
+
+    @client.server.app.listen(events.WriteOverflow)
+    async def overflow(event):
+        overflows.append(event)
+
+    for data in [b"a", b"b", b"c", b"d", b"efghijk"]:
+        client.write(data)
+
+    assert queued(client) == [b"c", b"d", b"efghijk"]
+    assert client.write_queue_bytes == 9
+    assert client.write_queue_dropped == 2
+
+    await asyncio.sleep(0)
+    assert len(overflows) == 1
+    assert overflows[0].policy == OverflowPolicy.DROP_OLDEST
+
+
+async def test_drop_newest(client):
+    client.server.write_queue_policy = OverflowPolicy.DROP_NEWEST
+    for data in [b"a", b"b", b"c", b"d"]:
+        client.write(data)
+
+    assert queued(client) == [b"a", b"b", b"c"]
+    assert client.write_queue_dropped == 1
+    assert client.connected
+
+
+async def test_disconnect(client):
+    client.server.write_queue_policy = OverflowPolicy.DISCONNECT
+    client.write(b"0123456789")
+    client.write(b"!")
+    await asyncio.sleep(0)
+
+    assert queued(client) == [b"0123456789"]
+    assert not client.connected
+    assert client.closed
+
+
+async def test_write_loop__coalesces_queued_writes(client):
+    batches = []
+
+    async def write_batch(batch):
+        batches.append(batch)
+        client.connected = False
+
+    client._write_batch = write_batch
+    for data in [b"a", b"b", b"c"]:
+        client.write(data)
+    await client._write_loop()
+
+    assert batches == [[b"a", b"b", b"c"]]
+    assert client.write_queue_bytes == 0
+    await asyncio.wait_for(client.flush(), 1)
@@ -1 +1 @@
-from .fixtures import app_harness, socket_client_factory  # noqa
+from .fixtures import app_harness, socket_client_factory, virtual_app  # noqa
@@ -0,0 +1,111 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+from mara import App, events
+from mara.executors import ProcessExecutor, ThreadExecutor
+
+
+class Work(events.Event):
+    "Work"
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+
+
+def square(value):
+    return value * value, os.getpid()
+
+
+def fail():
+    raise ValueError("Failed")
+
+
+def increment(event):
+    event.value += 1
+
+
+@pytest.fixture
+async def app():
+    app = App()
+    app.loop = asyncio.get_running_loop()
+    yield app
+    for executor in app.executors.values():
+        executor.shutdown()
+
+
+async def test_offload__thread__result_and_stats(app):
+    result = await app.offload("thread", threading.get_ident)
+    assert result != threading.get_ident()
+
+    stats = app.executors["thread"].stats()
+    assert stats["completed"] == 1
+    assert stats["failed"] == 0
+    assert stats["mean_queue_time"] >= 0
+    assert stats["mean_run_time"] >= 0
+
+
+async def test_offload__process__result(app):
+    result, pid = await app.offload("process", square, 7)
+    assert result == 49
+    assert pid != os.getpid()
+
+
+async def test_offload__exception__raised_in_loop(app):
+    with pytest.raises(ValueError):
+        await app.offload("thread", fail)
+    executor = app.executors["thread"]
+    assert executor.completed == 1
+    assert executor.failed == 1
+
+    with pytest.raises(ValueError):
+        await app.offload("missing", fail)
+
+
+async def test_offload__concurrency_bounded(app):
+    executor = app.add_executor("slow", ThreadExecutor(max_workers=4, max_concurrent=1))
+    gate = threading.Event()
+
+    first = asyncio.create_task(app.offload("slow", gate.wait))
+    second = asyncio.create_task(app.offload("slow", gate.wait))
+    await asyncio.sleep(0.05)
+    assert executor.running == 1
+    assert executor.queued == 1
+
+    gate.set()
+    await asyncio.gather(first, second)
+    assert executor.running == 0
+    assert executor.completed == 2
+    assert executor.max_queue_time > 0.04
+
+
+async def test_listen__executor__runs_in_pool(app):
+    app.add_executor("process", ProcessExecutor(max_workers=1))
+    threads = []
+
+    @app.listen(Work, executor="thread")
+    def in_thread(event):
+        threads.append(threading.get_ident())
+        event.value += 1
+
+    # Runs on a copy of the event
+    app.listen(Work, increment, executor="process")
+
+    event = Work(1)
+    await app.events.trigger(event)
+    assert threads and threads[0] != threading.get_ident()
+    assert event.value == 2
+
+
+async def test_listen__executor__async_handler_rejected(app):
+    async def handler(event):
+        pass
+
+    with pytest.raises(ValueError, match="Cannot run async handler"):
+        app.listen(Work, handler, executor="thread")
+    assert not app.events.events.get(Work)
@@ -1,2 +1,3 @@
 from .client import socket_client_factory  # noqa
 from .harness import app_harness  # noqa
+from .virtual import virtual_app, virtual_time  # noqa
@@ -4,6 +4,7 @@ Test harness to run mara in a separate thread to tests
 from __future__ import annotations
 
 import logging
+import os
 import threading
 import time
 from typing import TYPE_CHECKING
@@ -11,6 +12,7 @@ from typing import TYPE_CHECKING
 import pytest
 
 from mara.app.app import Status
+from mara.app.loop import LOOP_FACTORIES
 from mara.servers.socket import AbstractSocketServer
 
 from .constants import TEST_HOST, TEST_PORT
@@ -25,6 +27,10 @@ if TYPE_CHECKING:
 # Debug everything that we do
 DEBUG = False
 
+# Event loop to run apps with - set MARA_TEST_LOOP to run the tests with a different
+# backend, eg MARA_TEST_LOOP=uvloop
+LOOP = os.environ.get("MARA_TEST_LOOP")
+
 # Limits for attempting to start the server, and to connect to the server
 ATTEMPT_MAX = 10
 ATTEMPT_SLEEP = 0.1
@@ -59,6 +65,8 @@ class AppHarness:
 
     def run(self, app: App):
         self.app = app
+        if LOOP is not None:
+            app.loop_factory = LOOP_FACTORIES[LOOP]
 
         # Give service a thread
         self.thread_id = _thread_counter.get()
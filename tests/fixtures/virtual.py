@@ -0,0 +1,53 @@
+"""
+Run tests on a virtual-time loop
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Callable, Coroutine
+
+import pytest
+
+from mara import App
+from mara.app.loop import run, virtual_loop
+from mara.timers import LoopClock, TimerWheel
+
+
+def virtual_time(
+    test: Callable[[App], Coroutine[Any, Any, None]]
+) -> Callable[[], None]:
+    """
+    Decorator to run an async test on a ``VirtualTimeLoop``
+
+    The test is passed an app whose timer wheel has been started on the loop, with a
+    resolution of 1ms. Sleeps and timers finish instantly, and in the same order every
+    time. To simulate a slow callback, call ``asyncio.get_running_loop().advance()``.
+    """
+
+    async def main():
+        app = App()
+        app.scheduler = TimerWheel(resolution=0.001)
+        app.loop = asyncio.get_running_loop()
+        app.scheduler.start(LoopClock(app.loop))
+        try:
+            await test(app)
+        finally:
+            for timer in list(app.timers):
+                timer.stop()
+            app.scheduler.stop()
+
+    def wrapper():
+        run(main(), loop_factory=virtual_loop)
+
+    wrapper.__name__ = test.__name__
+    wrapper.__doc__ = test.__doc__
+    return wrapper
+
+
+@pytest.fixture
+def virtual_app():
+    """
+    App which runs on a ``VirtualTimeLoop``, so ``app.run()`` returns as soon as it
+    is stopped, however much time its timers cover
+    """
+    return App(loop_factory=virtual_loop)
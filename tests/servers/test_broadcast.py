@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from mara import App
+from mara.clients import AbstractClient
+from mara.servers import AbstractServer
+
+
+class CountingClient(AbstractClient[str]):
+    encoded = 0
+
+    @classmethod
+    def encode(cls, data: str, *, end: str = "\r\n") -> bytes:
+        cls.encoded += 1
+        return f"{data}{end}".encode()
+
+
+@pytest.fixture
+async def server():
+    app = App()
+    app.loop = asyncio.get_running_loop()
+    server = AbstractServer()
+    server.app = app
+    server.clients = [CountingClient(server) for _ in range(5)]
+    CountingClient.encoded = 0
+    return server
+
+
+def queued(client):
+    return list(client.write_queue._queue)
+
+
+async def test_broadcast__encodes_once_and_shares_payload(server):
+    reached = server.broadcast("hello", end="\n")
+
+    assert reached == 5
+    assert CountingClient.encoded == 1
+    payloads = [queued(client)[0] for client in server.clients]
+    assert payloads[0] == b"hello\n"
+    assert all(payload is payloads[0] for payload in payloads)
+
+
+async def test_broadcast__where_and_exclude(server):
+    first, second, *rest = server.clients
+    first.session.name = "first"
+    second.session.name = "second"
+
+    reached = server.broadcast(
+        "hello", where=lambda client: "name" in client.session, exclude=first
+    )
+
+    assert reached == 1
+    assert queued(first) == []
+    assert queued(second) == [b"hello\r\n"]
+
+
+async def test_broadcast_to__skips_disconnected(server):
+    first, second, *rest = server.clients
+    second.connected = False
+
+    assert server.broadcast_to({first, second}, "hello") == 1
+    assert queued(second) == []
+
+
+async def test_broadcast_chunked__yields_between_chunks(server):
+    server.clients.append(CountingClient(server))
+    seen = []
+
+    async def watch():
+        while True:
+            seen.append(sum(1 for client in server.clients if queued(client)))
+            await asyncio.sleep(0)
+
+    task = asyncio.create_task(watch())
+    await asyncio.sleep(0)
+    reached = await server.broadcast_chunked(
+        "hello", exclude=server.clients[0], chunk_size=2
+    )
+    task.cancel()
+
+    assert reached == 5
+    assert CountingClient.encoded == 1
+    assert queued(server.clients[0]) == []
+    # The excluded client is in the first chunk
+    assert {1, 3} <= set(seen)
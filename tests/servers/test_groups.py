@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from mara import App
+from mara.clients import AbstractClient
+from mara.servers import AbstractServer
+
+
+class QueueClient(AbstractClient[str]):
+    pass
+
+
+@pytest.fixture
+async def server():
+    app = App()
+    app.loop = asyncio.get_running_loop()
+    server = AbstractServer()
+    server.app = app
+    return server
+
+
+def queued(client):
+    return list(client.write_queue._queue)
+
+
+async def test_join_leave__counts(server):
+    alice, bob = QueueClient(server), QueueClient(server)
+    server.groups.join("lobby", alice)
+    server.groups.join("lobby", bob)
+    server.groups.join("guild", bob)
+    assert server.groups.counts() == {"lobby": 2, "guild": 1}
+    assert [str(group) for group in server.groups.of(bob)] == ["lobby", "guild"]
+
+    server.groups.leave("guild", bob)
+    assert "guild" not in server.groups
+    assert list(server.groups["lobby"]) == [alice, bob]
+    assert len(server.groups["guild"]) == 0
+
+
+async def test_write__only_members(server):
+    alice, bob, carol = QueueClient(server), QueueClient(server), QueueClient(server)
+    server.groups.join("lobby", alice)
+    server.groups.join("lobby", bob)
+
+    reached = server.groups["lobby"].write("hello", exclude=bob)
+    assert reached == 1
+    assert queued(alice) == ["hello"]
+    assert queued(bob) == []
+    assert queued(carol) == []
+
+
+async def test_disconnected__leaves_all_groups(server):
+    alice, bob = QueueClient(server), QueueClient(server)
+    for client in [alice, bob]:
+        server.clients.add(client)
+        server.app.clients.add(client)
+        server.groups.join("lobby", client)
+    server.groups.join("guild", alice)
+
+    await server.disconnected(alice)
+    assert server.groups.counts() == {"lobby": 1}
+    assert server.groups.of(alice) == []
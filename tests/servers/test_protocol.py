@@ -0,0 +1,70 @@
+from mara import App, events
+from mara.servers.protocol import BufferedSocketProtocol
+from mara.servers.socket import SocketServer, TextServer
+
+
+def make_app(server):
+    app = App()
+    server.protocol_class = BufferedSocketProtocol
+    app.add_server(server)
+
+    @app.listen(events.Receive)
+    async def echo(event: events.Receive):
+        event.client.write(event.data)
+
+    return app
+
+
+def test_socket__echo(app_harness, socket_client_factory):
+    app_harness(make_app(SocketServer()))
+    client = socket_client_factory()
+    client.write(b"hello")
+    assert client.read() == b"hello"
+
+
+def test_text__lines_split_across_and_within_reads(
+    app_harness, socket_client_factory
+):
+    server = TextServer()
+    server.read_size = 16
+    app_harness(make_app(server))
+    client = socket_client_factory()
+
+    client.write(b"one\r\ntw")
+    assert client.read_line() == b"one"
+    client.write(b"o\r")
+    client.write(b"\nthree\r\nfour\r\n")
+    assert client.read_line() == b"two"
+    assert client.read_line() == b"three"
+    assert client.read_line() == b"four"
+
+
+def test_text__line_too_long__disconnects(app_harness, socket_client_factory):
+    server = TextServer()
+    server.read_size = 16
+    app_harness(make_app(server))
+    client = socket_client_factory()
+
+    client.write(b"x" * 20)
+    try:
+        data = client.read()
+    except ConnectionResetError:
+        # Server closed with unread data
+        data = b""
+    assert data == b""
+
+
+async def test_text__unread__passed_on():
+    server = TextServer()
+    server.read_size = 16
+    old = BufferedSocketProtocol(server)
+    old.feed_unread(b"one\r\ntwo\r\nthr")
+    assert await old.reader.readframe() == b"one"
+
+    unread = old.take_unread()
+    assert unread == b"two\r\nthr"
+
+    new = BufferedSocketProtocol(server, restored=True)
+    new.feed_unread(unread + b"ee\r\n")
+    assert await new.reader.readframe() == b"two"
+    assert await new.reader.readframe() == b"three"
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from mara.fanout import fan_out
+
+
+async def test_fan_out__chunks_yield_to_loop():
+    seen = []
+    ticks = []
+
+    async def other():
+        # Runs whenever the fan-out yields
+        while True:
+            ticks.append(len(seen))
+            await asyncio.sleep(0)
+
+    task = asyncio.create_task(other())
+    await asyncio.sleep(0)
+    count = await fan_out(range(10), seen.append, chunk_size=4)
+    task.cancel()
+
+    assert count == 10
+    assert seen == list(range(10))
+    # The other task ran between each chunk
+    assert {4, 8} <= set(ticks)
+
+
+async def test_fan_out__items_copied():
+    items = {1, 2, 3}
+
+    def discard(item):
+        items.discard(item)
+
+    assert await fan_out(items, discard, chunk_size=1) == 3
+    assert items == set()
+
+
+async def test_fan_out__spread_over_window():
+    loop = asyncio.get_running_loop()
+    times = []
+    started = loop.time()
+    await fan_out(
+        range(4), lambda item: times.append(loop.time()), chunk_size=1, window=0.08
+    )
+
+    # Chunks start evenly across the window
+    assert times[0] - started < 0.01
+    for index, at in enumerate(times):
+        assert at - started >= index * 0.02 - 0.002
+    assert times[-1] - started < 0.1
+
+
+async def test_fan_out__invalid_chunk_size():
+    with pytest.raises(ValueError):
+        await fan_out([1], print, chunk_size=0)
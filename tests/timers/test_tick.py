@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+
+from mara import App, events
+from mara.clients import AbstractClient
+from mara.servers import AbstractServer
+from mara.timers import LoopClock, TickTimer, TimerWheel
+
+
+class QueueClient(AbstractClient[str]):
+    pass
+
+
+@pytest.fixture
+async def app():
+    app = App()
+    app.scheduler = TimerWheel(resolution=0.001)
+    app.loop = asyncio.get_running_loop()
+    app.scheduler.start(LoopClock(app.loop))
+    yield app
+    for timer in app.timers:
+        timer.stop()
+    app.scheduler.stop()
+
+
+@pytest.fixture
+def server(app):
+    server = AbstractServer()
+    server.app = app
+    return server
+
+
+async def test_tick__input_batched_per_client(app, server):
+    tick = app.add_timer(TickTimer(every=0.02))
+    server.tick = tick
+    first, second = QueueClient(server), QueueClient(server)
+    received = []
+
+    @app.listen(events.Receive)
+    async def receive(event):
+        received.append((event.client, event.data, tick.ticks))
+
+    for client, data in [(first, "a"), (second, "x"), (first, "b"), (first, "c")]:
+        await client._receive(data)
+    assert received == []
+    assert tick.pending(first) == 3
+
+    await asyncio.sleep(0.03)
+    assert received == [
+        (first, "a", 1),
+        (first, "b", 1),
+        (first, "c", 1),
+        (second, "x", 1),
+    ]
+    assert tick.pending(first) == 0
+
+
+async def test_tick__max_input_per_tick(app, server):
+    tick = app.add_timer(TickTimer(every=0.02, max_input_per_tick=2))
+    client = QueueClient(server)
+    received = []
+
+    @app.listen(events.Receive)
+    async def receive(event):
+        received.append((event.data, tick.ticks))
+
+    for data in "abcde":
+        await tick.receive(client, data)
+    await asyncio.sleep(0.07)
+    assert received == [("a", 1), ("b", 1), ("c", 2), ("d", 2), ("e", 3)]
+
+
+async def test_tick__disconnected_input_dropped(app, server):
+    tick = app.add_timer(TickTimer(every=0.01))
+    client = QueueClient(server)
+    received = []
+    app.listen(events.Receive, lambda event: received.append(event.data))
+
+    await tick.receive(client, "a")
+    client.connected = False
+    await asyncio.sleep(0.02)
+    assert received == []
+    assert tick.pending(client) == 0
+
+
+async def test_tick__systems_in_order(app):
+    tick = app.add_timer(TickTimer(every=0.01))
+    called = []
+
+    @tick
+    async def first(tick):
+        called.append("first")
+
+    @tick
+    def second(tick):
+        called.append("second")
+        if len(called) == 4:
+            tick.stop()
+
+    await asyncio.sleep(0.05)
+    assert called == ["first", "second", "first", "second"]
+
+
+async def test_tick__overrun(app):
+    tick = app.add_timer(TickTimer(every=0.01))
+    overruns = []
+
+    @app.listen(events.TickOverrun)
+    async def overrun(event):
+        overruns.append(event.duration)
+
+    @tick
+    async def slow(tick):
+        await asyncio.sleep(0.02)
+        tick.stop()
+
+    await asyncio.sleep(0.05)
+    assert tick.overruns == 1
+    assert len(overruns) == 1
+    assert overruns[0] >= 0.02
+
+
+async def test_tick__backpressure(app):
+    tick = TickTimer(every=0.01)
+    tick.max_pending = 2
+    client = QueueClient(AbstractServer())
+
+    await tick.receive(client, "a")
+    waiting = asyncio.create_task(tick.receive(client, "b"))
+    await asyncio.sleep(0)
+    assert not waiting.done()
+
+    app.add_timer(tick)
+    await asyncio.sleep(0.02)
+    assert waiting.done()
+
+
+def test_tick__percentiles():
+    tick = TickTimer(every=1, history=100)
+    assert tick.percentiles(50, 99) == [0, 0]
+    tick.durations.extend(i / 1000 for i in range(200))
+    assert len(tick.durations) == 100
+    assert tick.percentiles(0, 50, 100) == [0.1, 0.15, 0.199]
+    stats = tick.stats()
+    assert stats["max"] == 0.199
+    assert stats["p99"] == 0.198
@@ -0,0 +1,242 @@
+import asyncio
+import time
+
+import pytest
+
+from mara import App, events
+from mara.app.loop import virtual_loop
+from mara.timers import DelayTimer, MissedPolicy, PeriodicTimer
+
+from ..fixtures import virtual_time
+
+
+@virtual_time
+async def test_timer__without_callback__raises(app):
+    with pytest.raises(ValueError):
+        PeriodicTimer(every=0.01).start(app)
+
+
+@virtual_time
+async def test_periodic__fires_and_stops(app):
+    fired = []
+
+    @app.add_timer(PeriodicTimer(every=0.01))
+    async def tick(timer):
+        fired.append(app.scheduler.time())
+        if len(fired) == 3:
+            timer.stop()
+
+    await asyncio.sleep(0)
+    assert len(app.scheduler) == 1
+    await asyncio.sleep(0.1)
+    assert len(fired) == 3
+    assert all(b - a >= 0.01 - 1e-9 for a, b in zip(fired, fired[1:]))
+    assert len(app.scheduler) == 0
+    assert not app.timers[0].running
+
+
+@virtual_time
+async def test_periodic__plain_function(app):
+    fired = []
+
+    @app.add_timer(PeriodicTimer(every=0.01))
+    def tick(timer):
+        fired.append(1)
+        if len(fired) == 2:
+            timer.stop()
+
+    await asyncio.sleep(0.05)
+    assert fired == [1, 1]
+    assert len(app.tasks) == 0
+
+
+@virtual_time
+async def test_periodic__stop_cancels_scheduled(app):
+    fired = []
+    timer = app.add_timer(PeriodicTimer(every=0.01))
+
+    @timer
+    async def tick(timer):
+        fired.append(1)
+
+    await asyncio.sleep(0)
+    assert timer.running
+    app.remove_timer(timer)
+    await asyncio.sleep(0.03)
+    assert fired == []
+    assert app.timers == []
+    assert len(app.scheduler) == 0
+
+
+@virtual_time
+async def test_delay__fires_once_and_removed(app):
+    fired = []
+    timer = DelayTimer(0.01)
+
+    @timer
+    async def later(timer):
+        fired.append(app.scheduler.time())
+
+    started = app.scheduler.time()
+    app.add_timer(timer)
+    await asyncio.sleep(0.05)
+    assert len(fired) == 1
+    assert fired[0] - started >= 0.01 - 1e-9
+    assert not timer.running
+    assert app.timers == []
+
+
+@virtual_time
+async def test_timer__failing_callback__keeps_running(app):
+    fired = []
+
+    @app.add_timer(PeriodicTimer(every=0.01))
+    async def tick(timer):
+        fired.append(1)
+        if len(fired) == 2:
+            timer.stop()
+        raise ValueError("Failed")
+
+    await asyncio.sleep(0.1)
+    assert len(fired) == 2
+
+
+def test_shutdown__timers_stopped(virtual_app):
+    app = virtual_app
+    timer = PeriodicTimer(every=0.01)
+    fired = []
+
+    @app.add_timer(timer)
+    async def tick(timer):
+        fired.append(1)
+        if len(fired) == 3:
+            timer.app.stop()
+
+    @app.listen(events.PreStop)
+    async def prestop(event):
+        assert timer.running
+
+    app.run()
+    assert len(fired) == 3
+    assert not timer.running
+    assert len(app.scheduler) == 0
+    assert len(app.tasks) == 0
+
+
+def slow_then_stop(calls, stop_after):
+    """
+    Callback which blocks the loop on its first call, and stops the timer
+    """
+
+    def callback(timer):
+        calls.append(timer.app.scheduler.time())
+        if len(calls) == 1:
+            asyncio.get_running_loop().advance(0.05)
+        if len(calls) == stop_after:
+            timer.stop()
+
+    return callback
+
+
+@virtual_time
+async def test_missed__skip(app):
+    calls = []
+    timer = PeriodicTimer(every=0.02, strict=True)
+    timer(slow_then_stop(calls, 2))
+    app.add_timer(timer)
+    await asyncio.sleep(0.15)
+
+    assert timer.fired == 2
+    assert timer.skipped >= 2
+    # Carried on from the next due time after the slow call
+    assert calls[1] - calls[0] >= 0.055
+
+
+@virtual_time
+async def test_missed__burst(app):
+    calls = []
+    timer = PeriodicTimer(every=0.02, strict=True, missed_policy=MissedPolicy.BURST)
+    timer(slow_then_stop(calls, 4))
+    app.add_timer(timer)
+    await asyncio.sleep(0.15)
+
+    assert timer.fired == 4
+    assert timer.skipped == 0
+    # Missed firings are called back to back
+    assert calls[2] - calls[1] < 0.01
+    assert timer.max_lateness >= 0.02
+
+
+@virtual_time
+async def test_missed__coalesce(app):
+    calls = []
+    timer = PeriodicTimer(
+        every=0.02, strict=True, missed_policy=MissedPolicy.COALESCE
+    )
+    timer(slow_then_stop(calls, 3))
+    app.add_timer(timer)
+    await asyncio.sleep(0)
+    first_due = timer.last_due + 0.02
+    await asyncio.sleep(0.15)
+
+    assert timer.fired == 3
+    assert timer.skipped >= 1
+    # Called once straight after the slow call, then back on schedule
+    assert calls[1] - calls[0] >= 0.05
+    steps = (timer.last_due - first_due) / 0.02
+    assert abs(steps - round(steps)) < 1e-6
+
+
+@virtual_time
+async def test_max_concurrent__schedule_not_delayed(app):
+    running = []
+    timer = PeriodicTimer(every=0.01, strict=True, max_concurrent=2)
+
+    @timer
+    async def slow(timer):
+        running.append(timer.active)
+        await asyncio.sleep(0.035)
+
+    app.add_timer(timer)
+    await asyncio.sleep(0.1)
+    timer.stop()
+
+    assert max(running) <= 2
+    assert timer.fired >= 3
+    assert timer.skipped >= 1
+    await asyncio.sleep(0.05)
+    stats = timer.stats()
+    assert stats["active"] == 0
+    assert stats["max_run_time"] >= 0.035
+
+
+def simulate_hour(app):
+    timer = PeriodicTimer(every=1, strict=True)
+    fired = []
+
+    @app.add_timer(timer)
+    async def tick(timer):
+        fired.append(timer.app.scheduler.time())
+        await asyncio.sleep(0.25)
+        if len(fired) == 3600:
+            timer.app.stop()
+
+    app.run()
+    return timer, fired
+
+
+def test_virtual_time__hour_of_ticks(virtual_app):
+    started = time.perf_counter()
+    timer, fired = simulate_hour(virtual_app)
+    assert time.perf_counter() - started < 5
+
+    assert timer.fired == 3600
+    assert timer.skipped == 0
+    assert fired[-1] - fired[0] == pytest.approx(3599, abs=0.02)
+    assert timer.max_run_time == pytest.approx(0.25, abs=0.02)
+
+    # Same result every time
+    _, again = simulate_hour(App(loop_factory=virtual_loop))
+    assert [b - a for a, b in zip(fired, fired[1:])] == [
+        b - a for a, b in zip(again, again[1:])
+    ]
@@ -0,0 +1,133 @@
+from mara.timers import ManualClock, TimerWheel
+
+
+class CheckedClock(ManualClock):
+    """
+    Manual clock which can call wakeups early, like a real loop, and fails instead of
+    hanging if the wheel keeps setting wakeups without making progress
+    """
+
+    max_wakeups = 10_000
+
+    def __init__(self, early=0.0):
+        super().__init__(start=100)
+        self.early = early
+        self.wakeups = []
+
+    def call_at(self, when, callback):
+        if len(self.wakeups) >= self.max_wakeups:
+            raise AssertionError("Timer wheel did not make progress")
+        handle = super().call_at(when - self.early, callback)
+        self.wakeups.append(handle)
+        return handle
+
+
+def make_wheel(resolution=0.01, early=0.0):
+    clock = CheckedClock(early=early)
+    wheel = TimerWheel(resolution=resolution)
+    wheel.start(clock)
+    return clock, wheel
+
+
+def test_wheel__called_in_order():
+    clock, wheel = make_wheel()
+    called = []
+    for delay in [0.5, 0.1, 0.3, 0.1]:
+        wheel.call_later(delay, lambda d: called.append((d, clock.now)), delay)
+    assert len(wheel) == 4
+
+    clock.advance_to(clock.now + 1)
+    assert [delay for delay, _ in called] == [0.1, 0.1, 0.3, 0.5]
+    for delay, at in called:
+        # Never early, and at most one tick late
+        assert 100 + delay <= at + 1e-9 < 100 + delay + 0.02
+    assert len(wheel) == 0
+
+
+def test_wheel__cancel():
+    clock, wheel = make_wheel()
+    called = []
+    keep = wheel.call_later(0.2, called.append, "keep")
+    drop = wheel.call_later(0.2, called.append, "drop")
+    drop.cancel()
+    assert not drop.scheduled
+    assert keep.scheduled
+    assert len(wheel) == 1
+
+    clock.advance_to(clock.now + 1)
+    assert called == ["keep"]
+    assert not keep.scheduled
+
+
+def test_wheel__cancel_from_callback():
+    clock, wheel = make_wheel()
+    called = []
+    later = []
+
+    def first():
+        called.append("first")
+        later[0].cancel()
+
+    wheel.call_later(0.1, first)
+    later.append(wheel.call_later(0.1, called.append, "second"))
+    clock.advance_to(clock.now + 1)
+    assert called == ["first"]
+    assert len(wheel) == 0
+
+
+def test_wheel__long_delays_cascade():
+    clock, wheel = make_wheel(resolution=0.1)
+    called = []
+    # Across every level of the wheel, and beyond the end of the last level
+    delays = [5, 500, 50_000, 5_000_000, 2_000_000_000]
+    for delay in delays:
+        wheel.call_later(delay, called.append, delay)
+
+    for delay in delays:
+        clock.advance_to(100 + delay - 0.05)
+        assert delay not in called
+        clock.advance_to(100 + delay + 0.1)
+        assert called[-1] == delay
+    assert called == delays
+
+
+def test_wheel__early_wakeup():
+    # Woken before the tick, the wheel must still run it rather than re-arm
+    clock, wheel = make_wheel(early=0.001)
+    called = []
+    wheel.call_later(0.1, called.append, 1)
+    clock.advance_to(clock.now + 0.099)
+    assert called == [1]
+
+
+def test_wheel__schedule_from_callback():
+    clock, wheel = make_wheel()
+    called = []
+
+    def repeat(count):
+        called.append(clock.now)
+        if count:
+            wheel.call_later(0.05, repeat, count - 1)
+
+    wheel.call_later(0.05, repeat, 3)
+    clock.advance_to(clock.now + 1)
+    assert len(called) == 4
+    assert all(0.05 - 1e-9 <= b - a < 0.07 for a, b in zip(called, called[1:]))
+
+
+def test_wheel__single_loop_timer():
+    clock, wheel = make_wheel()
+    for i in range(1000):
+        wheel.call_later(1 + i / 100, lambda: None)
+    assert len([w for w in clock.wakeups if not w.cancelled]) == 1
+
+
+def test_wheel__stop():
+    clock, wheel = make_wheel()
+    called = []
+    handle = wheel.call_later(0.1, called.append, 1)
+    wheel.stop()
+    assert not handle.scheduled
+    assert len(wheel) == 0
+    clock.advance_to(clock.now + 1)
+    assert called == []